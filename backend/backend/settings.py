@@ -63,7 +63,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.AsyncWhiteNoiseMiddleware',
     'csp.middleware.CSPMiddleware',
 ]
 
@@ -111,6 +111,69 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Cache: Redis when REDIS_URL is set, otherwise the database, shared by every worker.
+# The database cache's add() is an atomic insert, so get_or_set's cross-process locks
+# hold; create its table with `python manage.py createcachetable`.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_entries',
+            # Culling could evict live stampede locks, so keep it rare
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+
+# Per-namespace TTLs in seconds for core.caching, overriding its defaults
+CACHE_NAMESPACE_TTLS = {}
+
+# Outbound HTTP pool for the async views (core.async_http), per uvicorn worker
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', '500'))
+ASYNC_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_KEEPALIVE_CONNECTIONS', '100'))
+ASYNC_HTTP_TIMEOUT = float(os.getenv('ASYNC_HTTP_TIMEOUT', '30'))
+
+# Unix socket of the host's inference server (manage.py inference_server). When
+# unset, each process loads the CNN backbones itself on first use.
+INFERENCE_SOCKET = os.getenv('INFERENCE_SOCKET')
+# Micro-batching of concurrent embedding requests, in-process and on the inference server
+INFERENCE_BATCHING = os.getenv('INFERENCE_BATCHING', 'true').lower() == 'true'
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv('INFERENCE_MAX_BATCH_SIZE', '32'))
+INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', '5'))
+# Encoder (core.ai.encoders) behind the per-user rating models. The '_face'
+# variants (e.g. mobilenet_v2_face) embed an aligned OpenCV face crop instead
+# of the whole frame; crop boxes are cached in the 'face_crops' namespace.
+PHOTO_ENCODER = os.getenv('PHOTO_ENCODER', 'mobilenet_v2')
+# 'keras' runs the float32 models; 'tflite' runs INT8-quantized exports from
+# BACKBONE_MODEL_DIR (manage.py export_backbones) on BACKBONE_THREADS threads
+BACKBONE_RUNTIME = os.getenv('BACKBONE_RUNTIME', 'keras')
+BACKBONE_MODEL_DIR = os.getenv('BACKBONE_MODEL_DIR', str(BASE_DIR / 'backbone_models'))
+BACKBONE_THREADS = int(os.getenv('BACKBONE_THREADS', str(os.cpu_count() or 1)))
+
+# Password hashing: 'pbkdf2' or 'argon2' (needs argon2-cffi). New hashes use the
+# selected hasher and costs; older hashes are rewritten on the user's next login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '870000'))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', '65536'))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', '1'))
+
+_PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'core.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'core.hashers.TunedArgon2PasswordHasher',
+}
+# The first hasher encodes new passwords; the rest can still verify existing hashes
+PASSWORD_HASHERS = [_PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -123,7 +186,15 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static'
 ]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# STATICFILES_STORAGE is no longer read as of Django 5.1. WhiteNoise already
+# skips compressing images; core.storage also skips hashing calibration photos.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.StaticFilesStorage'},
+}
+# Fall back to unhashed names for files missing from the manifest, e.g. before
+# the first collectstatic, instead of failing the request
+WHITENOISE_MANIFEST_STRICT = False
 
 # Media files
 MEDIA_URL = '/media/'
@@ -134,6 +205,15 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 FILE_UPLOAD_DIRECTORY_PERMISSIONS = 0o755
 
+# User photo uploads (core/uploads.py). They are streamed to disk, checked for
+# a JPEG, PNG or WebP header, and processed in the background.
+USER_PHOTO_MAX_BYTES = int(os.getenv('USER_PHOTO_MAX_BYTES', str(15 * 1024 * 1024)))
+USER_PHOTO_MAX_PIXELS = int(os.getenv('USER_PHOTO_MAX_PIXELS', str(50_000_000)))
+# 'thread' processes uploads in a pool inside each web worker, 'inline' before
+# the upload request returns, 'off' leaves them to manage.py process_user_photos
+PHOTO_PROCESSING = os.getenv('PHOTO_PROCESSING', 'thread')
+PHOTO_PROCESSING_WORKERS = int(os.getenv('PHOTO_PROCESSING_WORKERS', '2'))
+
 # Security Settings
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -205,19 +285,31 @@ AUTHENTICATION_BACKENDS = [
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'core.throttling.AnonRateThrottle',
+        'core.throttling.UserRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',  # Limit anonymous users to 100 requests per day
         'user': '1000/day',  # Limit authenticated users to 1000 requests per day
         'auth': '5/minute',  # Limit auth endpoints (login/register) to 5 requests per minute
+        'pickup_line': '30/hour',  # Each pickup line makes paid Azure and OpenAI calls
     }
 }
 
+# Throttle counter store: 'cache' (atomic only when the default cache is Redis),
+# 'database' (shared through the throttle_counters table) or 'local' (tests only).
+# Defaults to 'cache' with Redis and 'database' without it.
+_THROTTLE_STORES = {
+    'cache': 'core.throttling.CacheThrottleStore',
+    'database': 'core.throttling.DatabaseThrottleStore',
+    'local': 'core.throttling.LocalThrottleStore',
+}
+THROTTLE_STORE = _THROTTLE_STORES[os.getenv('THROTTLE_STORE', 'cache' if REDIS_URL else 'database')]
+THROTTLE_CACHE_ALIAS = 'default'
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -235,6 +327,9 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Seconds each process may reuse a loaded user row for authentication (0 disables)
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '5'))
+
 # Email Settings (development only)
 if DEBUG:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
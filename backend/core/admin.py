@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Photo, Match, UserPreference, PhotoRating
+from .models import User, Photo, Match, UserPhoto, UserPreference, PhotoRating
 
 class CustomUserAdmin(UserAdmin):
     list_display = ('email', 'first_name', 'last_name', 'is_staff', 'calibration_completed')
@@ -40,6 +40,12 @@ class MatchAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     search_fields = ('user__email', 'matched_user__email')
 
+class UserPhotoAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'created_at', 'processed_at')
+    list_filter = ('status',)
+    search_fields = ('user__email',)
+    exclude = ('embedding',)
+
 class PhotoRatingAdmin(admin.ModelAdmin):
     list_display = ('user', 'photo', 'rating', 'created_at')
     list_filter = ('rating',)
@@ -48,4 +54,5 @@ class PhotoRatingAdmin(admin.ModelAdmin):
 admin.site.register(User, CustomUserAdmin)
 admin.site.register(UserPreference, UserPreferenceAdmin)
 admin.site.register(Match, MatchAdmin)
+admin.site.register(UserPhoto, UserPhotoAdmin)
 admin.site.register(PhotoRating, PhotoRatingAdmin)
\ No newline at end of file
@@ -1,21 +1,25 @@
 # ai_model.py for NoSwipe
 
+import asyncio
 import os
 import pickle
+import httpx
 import numpy as np
 from dotenv import load_dotenv
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
 from msrest.authentication import CognitiveServicesCredentials
-from tensorflow.keras.applications import MobileNetV2
-from tensorflow.keras.preprocessing import image as keras_image
-from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
 from sklearn.linear_model import Ridge
 from sklearn.decomposition import PCA
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from core.models import PhotoRating, UserPreference, Photo
-from openai import OpenAI
-import tensorflow as tf
+from core.async_http import get_async_client
+from core.caching import user_model_cache
+from core.ai.backbones import embed_images, embed_pixels, load_pixels
+from core.ai.embeddings import get_photo_embeddings
+from core.ai.encoders import find_encoder, get_encoder, runtime_name
+from openai import AsyncOpenAI, OpenAI
 
 # Load environment variables
 load_dotenv()
@@ -33,18 +37,16 @@ client = OpenAI(
     api_key=api_key
 )
 
-# Load the pre-trained MobileNetV2 model
-mobilenet_model = MobileNetV2(weights="imagenet", include_top=False, pooling="avg", input_shape=(224, 224, 3))
+# Models saved before encoders were versioned were all trained on MobileNetV2
+LEGACY_ENCODER_KEY = "mobilenet_v2@1"
 
 
 def extract_image_features(img_path):
-    """Extract features from an image using MobileNetV2."""
+    """Extract features from an image using the configured photo encoder."""
     try:
-        img = keras_image.load_img(img_path, target_size=(224, 224))
-        x = keras_image.img_to_array(img)
-        x = np.expand_dims(x, axis=0)
-        x = preprocess_input(x)
-        features = mobilenet_model.predict(x)
+        encoder = get_encoder()
+        x = np.expand_dims(load_pixels(img_path, encoder.input_size), axis=0)
+        features = embed_pixels(encoder.name, x)
         return features.flatten()
     except Exception as e:
         print(f"Error extracting features from {img_path}: {e}")
@@ -55,31 +57,29 @@ def train_user_model(user_id):
     """Train a regression model for the user based on their ratings."""
     from core.models import PhotoRating  # Import here to avoid circular imports
     
-    # Get all ratings for the user
-    ratings = PhotoRating.objects.filter(user_id=user_id).select_related('photo')
+    # Get all ratings for the user, oldest first so retraining on the same ratings is reproducible
+    ratings = PhotoRating.objects.filter(user_id=user_id).select_related('photo').order_by('created_at')
     if not ratings:
         print(f"No ratings found for user {user_id}.")
         return
     
-    X, y = [], []
+    photos, targets = [], {}
     for rating in ratings:
-        # Get the full path of the image
-        gender_dir = 'male' if rating.photo.gender == 'M' else 'female'
-        img_path = os.path.join(settings.BASE_DIR, 'static', 'calibration_photos', gender_dir, f"{rating.photo.id:06d}.jpg")
+        img_path = rating.photo.calibration_path
         if not os.path.isfile(img_path):
             print(f"Invalid image file: {img_path}")
             continue
+        photos.append(rating.photo)
+        targets[rating.photo.id] = rating.rating
 
-        features = extract_image_features(img_path)
-        if features is not None:
-            X.append(features)
-            y.append(rating.rating)
-
-    if not X:
+    # Reuses stored calibration embeddings; only unseen photos go through the backbone
+    encoder = get_encoder()
+    X, valid_photos = get_photo_embeddings(photos, encoder)
+    if X is None:
         print(f"No valid features for user {user_id}.")
         return
 
-    X, y = np.array(X), np.array(y)
+    y = np.array([targets[photo.id] for photo in valid_photos])
     print(f"Training model for user {user_id} with {len(y)} samples.")
 
     # Dynamically set the number of PCA components
@@ -99,8 +99,8 @@ def train_user_model(user_id):
     print(f"Model coefficients: {model.coef_}")
     print(f"Model intercept: {model.intercept_}")
 
-    # Save both the PCA and the model
-    model_data = {"pca": pca, "model": model}
+    # Save both the PCA and the model, tagged with the encoder whose embedding space they expect
+    model_data = {"pca": pca, "model": model, "encoder": encoder.key}
     # Ensure the model path is correct and overwrite existing model
     model_dir = os.path.join(settings.BASE_DIR, "user_models")
     os.makedirs(model_dir, exist_ok=True)
@@ -108,6 +108,7 @@ def train_user_model(user_id):
 
     with open(model_path, "wb") as f:
         pickle.dump(model_data, f)
+    user_model_cache.delete(user_id)
     print(f"Model saved for user {user_id} at {model_path}.")
 
 
@@ -118,8 +119,11 @@ def process_images(image_paths, user):
         return {"success": False, "message": "User model not found. Please recalibrate."}
 
     # Load the user-specific model and PCA transformer
-    with open(model_path, "rb") as f:
-        model_data = pickle.load(f)
+    def load_model_data():
+        with open(model_path, "rb") as f:
+            return pickle.load(f)
+
+    model_data = user_model_cache.get_or_set(user.id, load_model_data)
 
     # Check if model_data is a dictionary
     if isinstance(model_data, dict) and 'model' in model_data and 'pca' in model_data:
@@ -130,24 +134,24 @@ def process_images(image_paths, user):
         print("Loaded model data is not in the expected format. Please recalibrate.")
         return {'success': False, 'message': 'Model format error. Please recalibrate.'}
 
-    # Extract features for each uploaded image
-    features = []
-    valid_image_paths = []
+    # Embed with the encoder the model was trained on, even if PHOTO_ENCODER has since moved on
+    encoder = find_encoder(model_data.get('encoder', LEGACY_ENCODER_KEY))
+    if encoder is None:
+        print(f"Model for user {user.id} uses unregistered encoder {model_data.get('encoder')}.")
+        return {'success': False, 'message': 'Model is out of date. Please recalibrate.'}
 
-    for img_path in image_paths:
-        feat = extract_image_features(img_path)
-        if feat is not None:
-            features.append(feat)
-            valid_image_paths.append(img_path)
-        else:
-            print(f"Skipping image due to error: {img_path}")
+    # Extract features for all uploaded images in one request; concurrent
+    # callers share forward passes through the backbone's micro-batcher
+    try:
+        X, valid_image_paths = embed_images(runtime_name(encoder), image_paths)
+    except Exception as e:
+        print(f"Error extracting features: {e}")
+        X = None
 
-    if not features:
+    if X is None:
         print("No valid features extracted.")
         return {"success": False, "message": "No valid features extracted from images."}
 
-    # Convert features to numpy array
-    X = np.array(features)
     # Apply PCA transformation
     X_pca = pca.transform(X)
     # Predict individual ratings based on features
@@ -182,39 +186,36 @@ def describe_image(img_path):
         return "Error generating description."
 
 
-def generate_pickup_line(image_paths, user):
-    """Generate a pickup line based on detailed analysis of uploaded photos."""
-    descriptions = [describe_image(img_path) for img_path in image_paths]
-    background_info = "\n".join(descriptions)
-    print(f"backgorund info: {background_info}")
-    if len(image_paths) > 1:
-        prompt_for_selection = (
-            "Given the following descriptions of photos:\n\n"
-            f"{background_info}\n\n"
-            "Select the most intriguing description that could inspire a catchy pickup line."
-        )
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an AI assistant that selects the best image description for a pickup line."},
-                {"role": "user", "content": prompt_for_selection}
-            ],
-            max_tokens=150,
-            temperature=0.7,
-            top_p=1,
-            frequency_penalty=0,
-            presence_penalty=0.7,
-            stop=['Human:', 'AI:']
-        )
-        selected_description = response.choices[0].message.content.strip()
-    else:
-        selected_description = descriptions[0]
+def selection_request(background_info):
+    """Chat completion arguments asking which photo description to build on."""
+    prompt_for_selection = (
+        "Given the following descriptions of photos:\n\n"
+        f"{background_info}\n\n"
+        "Select the most intriguing description that could inspire a catchy pickup line."
+    )
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are an AI assistant that selects the best image description for a pickup line."},
+            {"role": "user", "content": prompt_for_selection}
+        ],
+        max_tokens=150,
+        temperature=0.7,
+        top_p=1,
+        frequency_penalty=0,
+        presence_penalty=0.7,
+        stop=['Human:', 'AI:']
+    )
+
+
+def pickup_line_request(preference, selected_description):
+    """Chat completion arguments for the pickup line itself."""
     final_prompt = (
-        f"Create a catchy, inviting pickup line for a person interested in a {user.preference} "
+        f"Create a catchy, inviting pickup line for a person interested in a {preference} "
         f"based on the following photo description: '{selected_description}'. "
         "The pickup line must be a maximum of 20 words, preferably shorter."
     )
-    pickup_response = client.chat.completions.create(
+    return dict(
         model="gpt-3.5-turbo",
         messages=[
             {"role": "system", "content": "You are an AI assistant that generates witty pickup lines."},
@@ -227,4 +228,71 @@ def generate_pickup_line(image_paths, user):
         presence_penalty=0.7,
         stop=['Human:', 'AI:']
     )
-    return pickup_response.choices[0].message.content.strip()
\ No newline at end of file
+
+
+def generate_pickup_line(image_paths, user):
+    """Generate a pickup line based on detailed analysis of uploaded photos."""
+    descriptions = [describe_image(img_path) for img_path in image_paths]
+    background_info = "\n".join(descriptions)
+    print(f"backgorund info: {background_info}")
+    if len(image_paths) > 1:
+        response = client.chat.completions.create(**selection_request(background_info))
+        selected_description = response.choices[0].message.content.strip()
+    else:
+        selected_description = descriptions[0]
+    pickup_response = client.chat.completions.create(**pickup_line_request(user.preference, selected_description))
+    return pickup_response.choices[0].message.content.strip()
+
+
+async def adescribe_image(image_bytes):
+    """Async describe_image for raw image bytes, via the Azure REST API."""
+    try:
+        response = await get_async_client().post(
+            f"{azure_endpoint.rstrip('/')}/vision/v3.2/describe",
+            content=image_bytes,
+            headers={
+                "Ocp-Apim-Subscription-Key": azure_api_key,
+                "Content-Type": "application/octet-stream",
+            },
+        )
+        response.raise_for_status()
+        captions = response.json().get("description", {}).get("captions", [])
+        if captions:
+            # Get the most confident caption
+            return max(captions, key=lambda c: c["confidence"])["text"]
+        return "No description available."
+    except httpx.HTTPError as e:
+        print(f"Error describing image: {e}")
+        return "Error generating description."
+
+
+async def agenerate_pickup_line(images, preference):
+    """Async generate_pickup_line for the async views.
+
+    All photos are described concurrently, and every call shares the
+    worker's pooled HTTP client.
+
+    Args:
+        images: Raw bytes of each uploaded photo
+        preference: Gender the user is interested in, used in the prompt
+
+    Returns:
+        The generated pickup line
+
+    Raises:
+        ImproperlyConfigured: If the Azure Computer Vision settings are missing
+        openai.OpenAIError: If a chat completion fails
+    """
+    if not (azure_endpoint and azure_api_key):
+        raise ImproperlyConfigured("AZURE_COMPUTER_VISION_ENDPOINT and AZURE_COMPUTER_VISION_KEY must be set")
+    async_client = AsyncOpenAI(api_key=api_key, http_client=get_async_client())
+    descriptions = await asyncio.gather(*(adescribe_image(image) for image in images))
+    if len(descriptions) > 1:
+        response = await async_client.chat.completions.create(**selection_request("\n".join(descriptions)))
+        selected_description = response.choices[0].message.content.strip()
+    else:
+        selected_description = descriptions[0]
+    pickup_response = await async_client.chat.completions.create(
+        **pickup_line_request(preference, selected_description)
+    )
+    return pickup_response.choices[0].message.content.strip()
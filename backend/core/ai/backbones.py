@@ -0,0 +1,226 @@
+# backend/core/ai/backbones.py
+
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from PIL import Image
+
+from .batching import MicroBatcher
+from .encoders import resolve
+from .faces import load_face_pixels
+
+# Runtimes that can execute a backbone; see settings.BACKBONE_RUNTIME
+RUNTIMES = ("keras", "tflite")
+
+
+def backbone_of(name):
+    """Model that serves an encoder; face-crop variants run on their base encoder's."""
+    try:
+        encoder = resolve(name)
+    except KeyError:
+        return name
+    return encoder.backbone if encoder.face_crop else name
+
+
+def load_backbone(name, runtime=None):
+    """Load a backbone once per process and return its batch embedding function.
+
+    Args:
+        name: Runtime name of the encoder (see encoders.runtime_name)
+        runtime: One of RUNTIMES, defaulting to settings.BACKBONE_RUNTIME
+
+    Returns:
+        Callable mapping uint8 pixels of shape (n, 224, 224, 3) to float32 embeddings of shape (n, 1280)
+    """
+    return _load_backbone(backbone_of(name), runtime or settings.BACKBONE_RUNTIME)
+
+
+@lru_cache(maxsize=None)
+def _load_backbone(name, runtime):
+    encoder = resolve(name)
+    if runtime == "tflite":
+        path = tflite_path(name)
+        if not path.exists():
+            print(f"No exported {encoder.key} model at {path}, exporting it now")
+            export_tflite(name)
+        return tflite_embedder(path, encoder.preprocess_input)
+
+    model = encoder.build()
+
+    def embed(pixels):
+        x = encoder.preprocess_input(pixels.astype("float32"))
+        return np.asarray(model(x, training=False), dtype="float32")
+
+    return embed
+
+
+def tflite_path(name):
+    encoder = resolve(backbone_of(name))
+    return Path(settings.BACKBONE_MODEL_DIR) / f"{encoder.name}.v{encoder.version}.int8.tflite"
+
+
+def convert_to_tflite(model):
+    """Convert a keras model to TFLite with dynamic-range INT8 weight quantization.
+
+    Weights are stored as int8 and activations stay float, so no calibration
+    data is needed. The batch dimension is left dynamic.
+    """
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    @tf.function(autograph=False)
+    def forward(x):
+        return model(x, training=False)
+
+    concrete = forward.get_concrete_function(tf.TensorSpec([None, *model.input_shape[1:]], tf.float32))
+    # Keras 3 models must be frozen before the converter can read their variables
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([convert_variables_to_constants_v2(concrete)])
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    return converter.convert()
+
+
+def export_tflite(name, path=None):
+    """Export the named backbone to a quantized TFLite file and return its path."""
+    path = Path(path or tflite_path(name))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = convert_to_tflite(resolve(backbone_of(name)).build())
+    # Write then rename, so concurrent workers never load a partial file
+    partial = path.with_suffix(f".{os.getpid()}.partial")
+    partial.write_bytes(data)
+    os.replace(partial, path)
+    return path
+
+
+def _tflite_interpreter_class():
+    try:
+        # The standalone runtime avoids importing all of TensorFlow
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def tflite_embedder(path, preprocess_input, num_threads=None):
+    """Return a batch embedding function running a TFLite model.
+
+    The interpreter uses settings.BACKBONE_THREADS threads and is resized
+    whenever the batch size changes. Calls are serialized, since an
+    interpreter can't run two batches at once.
+    """
+    interpreter = _tflite_interpreter_class()(
+        model_path=str(path), num_threads=num_threads or settings.BACKBONE_THREADS
+    )
+    input_index = interpreter.get_input_details()[0]["index"]
+    output_index = interpreter.get_output_details()[0]["index"]
+    lock = threading.Lock()
+    allocated = {"shape": None}
+
+    def embed(pixels):
+        x = preprocess_input(pixels.astype("float32"))
+        with lock:
+            if allocated["shape"] != x.shape:
+                interpreter.resize_tensor_input(input_index, x.shape)
+                interpreter.allocate_tensors()
+                allocated["shape"] = x.shape
+            interpreter.set_tensor(input_index, x)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_index).copy()
+
+    return embed
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(name):
+    """Return this process's MicroBatcher for a backbone, creating it on first use.
+
+    Threads embedding concurrently share forward passes of up to
+    INFERENCE_MAX_BATCH_SIZE images, waiting at most INFERENCE_MAX_WAIT_MS
+    for others to join.
+    """
+    with _batchers_lock:
+        if name not in _batchers:
+            _batchers[name] = MicroBatcher(
+                load_backbone(name),
+                max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+                max_wait=settings.INFERENCE_MAX_WAIT_MS / 1000,
+                name=f"batcher-{name}",
+            )
+        return _batchers[name]
+
+
+def load_pixels(img_path, size=(224, 224)):
+    """Decode an image into uint8 RGB pixels at an encoder's input size.
+
+    Matches keras.preprocessing.image.load_img(target_size=...), which also
+    resizes with nearest-neighbour sampling.
+    """
+    with Image.open(img_path) as img:
+        return np.asarray(img.convert("RGB").resize(size, Image.NEAREST), dtype="uint8")
+
+
+def embed_pixels(name, pixels):
+    """Embed a batch of images with the named backbone.
+
+    Runs on the inference server when settings.INFERENCE_SOCKET is set, so web
+    workers never load the models themselves, otherwise in this process.
+
+    Args:
+        name: Runtime name of the encoder (see encoders.runtime_name)
+        pixels: uint8 array of shape (n, 224, 224, 3)
+
+    Returns:
+        float32 array of shape (n, 1280)
+    """
+    name = backbone_of(name)
+    socket_path = getattr(settings, "INFERENCE_SOCKET", None)
+    if socket_path:
+        from .inference import get_inference_client
+
+        return get_inference_client(socket_path).embed(name, pixels)
+    if settings.INFERENCE_BATCHING:
+        return get_batcher(name)(pixels)
+    return load_backbone(name)(pixels)
+
+
+def embed_images(name, img_paths):
+    """Embed image files in one request, skipping any that can't be decoded.
+
+    Args:
+        name: Runtime name of the encoder (see encoders.runtime_name)
+        img_paths: Paths of the images to embed
+
+    Returns:
+        tuple: (float32 array of shape (n_valid, 1280) or None if nothing decoded, list of valid paths)
+    """
+    encoder = resolve(name)
+    load = load_face_pixels if encoder.face_crop else load_pixels
+    pixels, valid_paths = [], []
+    for img_path in img_paths:
+        try:
+            pixels.append(load(img_path, encoder.input_size))
+            valid_paths.append(img_path)
+        except Exception as e:
+            print(f"Error extracting features from {img_path}: {e}")
+    if not pixels:
+        return None, []
+    return embed_pixels(name, np.stack(pixels)), valid_paths
+
+
+def batching_stats():
+    """Latency and occupancy of the micro-batchers serving this process, by backbone."""
+    socket_path = getattr(settings, "INFERENCE_SOCKET", None)
+    if socket_path:
+        from .inference import get_inference_client
+
+        return get_inference_client(socket_path).stats()
+    with _batchers_lock:
+        return {name: batcher.stats.snapshot() for name, batcher in _batchers.items()}
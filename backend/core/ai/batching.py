@@ -0,0 +1,122 @@
+# backend/core/ai/batching.py
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class _Request:
+    __slots__ = ("items", "future", "submitted_at")
+
+    def __init__(self, items):
+        self.items = items
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+
+
+class BatchStats:
+    """Rolling latency and batch occupancy figures for a MicroBatcher.
+
+    Keeps the most recent ``window`` requests and batches, so percentiles
+    describe current traffic rather than the whole process lifetime.
+    """
+
+    def __init__(self, max_batch_size, window=10000):
+        self.max_batch_size = max_batch_size
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._requests = 0
+        self._batches = 0
+        self._lock = threading.Lock()
+
+    def record(self, batch_size, latencies):
+        with self._lock:
+            self._batches += 1
+            self._requests += len(latencies)
+            self._batch_sizes.append(batch_size)
+            self._latencies.extend(latencies)
+
+    def snapshot(self):
+        """Return counters, p50/p99 request latency in ms and mean batch occupancy."""
+        with self._lock:
+            latencies = np.array(self._latencies)
+            sizes = np.array(self._batch_sizes)
+            requests, batches = self._requests, self._batches
+        if not len(sizes):
+            return {"requests": requests, "batches": batches}
+        return {
+            "requests": requests,
+            "batches": batches,
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+            "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 2),
+            "mean_batch_size": round(float(sizes.mean()), 2),
+            # Share of each forward pass's capacity that was filled
+            "occupancy": round(float(np.minimum(sizes / self.max_batch_size, 1).mean()), 3),
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent calls into one batched forward pass.
+
+    Callers on any thread submit arrays of one or more rows. A single worker
+    thread takes the first pending request, keeps collecting more until
+    ``max_batch_size`` rows are queued or ``max_wait`` seconds have passed,
+    runs ``predict`` once on the concatenated rows and hands each caller its
+    own slice of the output. Latency from submit to result and the size of
+    every batch are recorded in ``stats``.
+    """
+
+    def __init__(self, predict, max_batch_size=32, max_wait=0.005, name="batcher"):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = BatchStats(max_batch_size)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        """Queue ``items`` (shape (n, ...)) and return a Future for the (n, ...) output."""
+        request = _Request(items)
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, items):
+        return self.submit(items).result()
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        size = len(pending[0].items)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(request)
+            size += len(request.items)
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            try:
+                outputs = self.predict(np.concatenate([request.items for request in pending]))
+            except Exception as e:
+                for request in pending:
+                    request.future.set_exception(e)
+                continue
+            offset = 0
+            done_at = time.monotonic()
+            for request in pending:
+                count = len(request.items)
+                request.future.set_result(outputs[offset:offset + count])
+                offset += count
+            self.stats.record(offset, [done_at - request.submitted_at for request in pending])
@@ -0,0 +1,86 @@
+# backend/core/ai/embeddings.py
+
+import numpy as np
+
+from core.models import PhotoEmbedding, User, UserPhoto
+from .backbones import embed_images
+from .encoders import get_encoder, runtime_name
+
+
+def get_photo_embeddings(photos, encoder=None):
+    """Return calibration photo embeddings, computing and storing any that are missing.
+
+    Stored vectors are only reused when they come from the same encoder
+    version, so a model trained on them never mixes embedding spaces. A
+    retired version embeds with its own weights.
+
+    Args:
+        photos: Photo instances to embed
+        encoder: Encoder to use, by default settings.PHOTO_ENCODER
+
+    Returns:
+        tuple: (float32 array of shape (n_valid, dim) or None if nothing could be embedded, list of valid photos)
+    """
+    encoder = encoder or get_encoder()
+    photos = list(photos)
+    stored = {
+        photo_id: np.frombuffer(vector, dtype=np.float32)
+        for photo_id, vector in PhotoEmbedding.objects.filter(
+            photo_id__in=[photo.id for photo in photos],
+            encoder=encoder.name,
+            encoder_version=encoder.version,
+        ).values_list('photo_id', 'vector')
+    }
+
+    missing = [photo for photo in photos if photo.id not in stored]
+    if missing:
+        paths = {photo.calibration_path: photo for photo in missing}
+        vectors, valid_paths = embed_images(runtime_name(encoder), list(paths))
+        if vectors is not None:
+            new_rows = []
+            for path, vector in zip(valid_paths, vectors):
+                photo = paths[path]
+                stored[photo.id] = vector
+                new_rows.append(PhotoEmbedding(
+                    photo=photo,
+                    encoder=encoder.name,
+                    encoder_version=encoder.version,
+                    vector=vector.astype(np.float32).tobytes(),
+                ))
+            # A concurrent request may have stored some of these first
+            PhotoEmbedding.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+    valid = [photo for photo in photos if photo.id in stored]
+    if not valid:
+        return None, []
+    return np.stack([stored[photo.id] for photo in valid]), valid
+
+
+def get_profile_embeddings(user_ids, encoder=None):
+    """Return the stored embeddings of users' profile photos, without embedding anything.
+
+    Uploaded photos are embedded once by the upload pipeline (see
+    core/uploads.py); users whose profile photo has no embedding from this
+    encoder version, yet or any more, are left out.
+
+    Args:
+        user_ids: IDs of the users
+        encoder: Encoder the embeddings must come from, by default settings.PHOTO_ENCODER
+
+    Returns:
+        tuple: (float32 array of shape (n_valid, dim) or None if no user has one, list of valid user IDs)
+    """
+    encoder = encoder or get_encoder()
+    user_ids = list(user_ids)
+    stored = {
+        user_id: np.frombuffer(vector, dtype=np.float32)
+        for user_id, vector in UserPhoto.objects.filter(
+            pk__in=User.objects.filter(pk__in=user_ids).values('primary_photo'),
+            encoder=encoder.key,
+            embedding__isnull=False,
+        ).values_list('user_id', 'embedding')
+    }
+    valid = [user_id for user_id in user_ids if user_id in stored]
+    if not valid:
+        return None, []
+    return np.stack([stored[user_id] for user_id in valid]), valid
@@ -0,0 +1,140 @@
+# backend/core/ai/encoders.py
+
+from django.conf import settings
+
+
+class Encoder:
+    """A photo embedding model and everything that determines its vectors.
+
+    Embeddings from different encoders, or from different versions of one
+    encoder, are not comparable. Everything derived from them (stored
+    embeddings, user models) records ``key``. Bump ``version`` whenever the
+    weights, preprocessing or input size change, move the old definition to
+    RETIRED_ENCODERS, then run ``manage.py reembed_photos`` to rebuild what
+    was derived from it.
+
+    Args:
+        name: Registry name, also used to address the backbone at runtime
+        version: Incremented on any change to the vectors this encoder produces
+        build: Returns the float32 keras model
+        preprocess_input: Maps float32 pixels to model input, in numpy
+        input_size: (width, height) images are resized to
+        dim: Length of each embedding
+        backbone: Encoder whose model weights this one runs, by default itself
+        face_crop: Embed the aligned primary face instead of the whole frame
+    """
+
+    def __init__(self, name, version, build, preprocess_input, input_size=(224, 224), dim=1280,
+                 backbone=None, face_crop=False):
+        self.name = name
+        self.version = version
+        self.build = build
+        self.preprocess_input = preprocess_input
+        self.input_size = input_size
+        self.dim = dim
+        self.backbone = backbone or name
+        self.face_crop = face_crop
+
+    @property
+    def key(self):
+        return f"{self.name}@{self.version}"
+
+    def with_face_crop(self, version=1):
+        """A variant that embeds face crops with this encoder's backbone.
+
+        It shares the loaded model, but its vectors live in their own space,
+        so it has its own name and version.
+        """
+        return Encoder(
+            f"{self.name}_face", version, self.build, self.preprocess_input, self.input_size, self.dim,
+            backbone=self.name, face_crop=True
+        )
+
+    def __repr__(self):
+        return f"<Encoder {self.key} {self.input_size[0]}x{self.input_size[1]}->{self.dim}>"
+
+
+def _mobilenet_v2():
+    from tensorflow.keras.applications import MobileNetV2
+
+    return MobileNetV2(weights="imagenet", include_top=False, pooling="avg", input_shape=(224, 224, 3))
+
+
+def _efficientnet_v2_b0():
+    from tensorflow.keras.applications import EfficientNetV2B0
+
+    return EfficientNetV2B0(weights="imagenet", include_top=False, pooling="avg")
+
+
+def _scale_to_unit_range(x):
+    # keras.applications.mobilenet_v2.preprocess_input, without importing TensorFlow
+    return x / 127.5 - 1.0
+
+
+def _identity(x):
+    # EfficientNetV2 rescales inside the model; its preprocess_input is a no-op
+    return x
+
+
+_FULL_FRAME_ENCODERS = (
+    Encoder("mobilenet_v2", 1, _mobilenet_v2, _scale_to_unit_range),
+    Encoder("efficientnet_v2_b0", 1, _efficientnet_v2_b0, _identity),
+)
+
+# The current version of every encoder. Each backbone also has a face-crop
+# variant (e.g. PHOTO_ENCODER=mobilenet_v2_face).
+ENCODERS = {
+    encoder.name: encoder
+    for base in _FULL_FRAME_ENCODERS
+    for encoder in (base, base.with_face_crop())
+}
+
+# Versions replaced in ENCODERS, with their original definitions. They stay
+# servable, so embeddings and user models tagged with them keep scoring,
+# until reembed_photos --prune has rebuilt everything on the current
+# versions; only then delete them here. Retired encoders are addressed by
+# key at runtime, so a retired face-crop variant sets backbone to its base's
+# key, e.g. backbone="mobilenet_v2@1".
+RETIRED_ENCODERS = ()
+
+
+def runtime_name(encoder):
+    """How the backbones address an encoder: its name while current, its key once retired."""
+    return encoder.name if ENCODERS.get(encoder.name) is encoder else encoder.key
+
+
+def resolve(name):
+    """Return the encoder for a runtime name (see runtime_name); raises KeyError if unknown."""
+    if name in ENCODERS:
+        return ENCODERS[name]
+    encoder = find_encoder(name)
+    if encoder is None:
+        raise KeyError(name)
+    return encoder
+
+
+def runtime_names():
+    """Runtime names of every servable encoder, current and retired."""
+    return set(ENCODERS) | {encoder.key for encoder in RETIRED_ENCODERS}
+
+
+def backbone_names():
+    """Runtime names of the distinct models behind the servable encoders."""
+    return sorted({
+        encoder.backbone if encoder.face_crop else runtime_name(encoder)
+        for encoder in (*ENCODERS.values(), *RETIRED_ENCODERS)
+    })
+
+
+def get_encoder(name=None):
+    """Return a registered encoder, by default settings.PHOTO_ENCODER."""
+    return ENCODERS[name or settings.PHOTO_ENCODER]
+
+
+def find_encoder(key):
+    """Return the current or retired encoder for a stored ``name@version`` key, or None if it is gone."""
+    name, _, version = key.partition("@")
+    encoder = ENCODERS.get(name)
+    if encoder is not None and str(encoder.version) == version:
+        return encoder
+    return next((encoder for encoder in RETIRED_ENCODERS if encoder.key == key), None)
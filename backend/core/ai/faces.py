@@ -0,0 +1,93 @@
+# backend/core/ai/faces.py
+
+import hashlib
+import io
+import math
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+from core.caching import face_crop_cache
+
+# Bump when detection or alignment changes, so cached crop boxes are recomputed
+DETECTOR_VERSION = 1
+# Context kept around the detected face, as a fraction of its size on each side
+FACE_MARGIN = 0.25
+# Detection runs on a copy no larger than this, then boxes are scaled back up
+DETECTION_MAX_SIDE = 640
+
+
+@lru_cache(maxsize=None)
+def _cascades():
+    import cv2
+
+    return (
+        cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml"),
+        cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_eye.xml"),
+    )
+
+
+def detect_face(img):
+    """Find the primary (largest) face in an image with OpenCV's Haar cascades.
+
+    Args:
+        img: PIL image
+
+    Returns:
+        tuple: (x, y, width, height, angle) of the face in original pixels, where
+        ``angle`` in degrees levels the eyes, or None if no face was found
+    """
+    face_cascade, eye_cascade = _cascades()
+    scale = min(1.0, DETECTION_MAX_SIDE / max(img.size))
+    gray = img.convert("L")
+    if scale < 1.0:
+        gray = gray.resize((round(img.width * scale), round(img.height * scale)), Image.BILINEAR)
+    gray = np.asarray(gray)
+
+    min_side = max(min(gray.shape) // 10, 20)
+    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+    if len(faces) == 0:
+        return None
+    x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+
+    # Eyes are searched in the upper half of the face only
+    angle = 0.0
+    eyes = eye_cascade.detectMultiScale(gray[y:y + h // 2, x:x + w], scaleFactor=1.1, minNeighbors=5)
+    if len(eyes) >= 2:
+        eyes = sorted(eyes, key=lambda eye: eye[2] * eye[3], reverse=True)[:2]
+        (x1, y1), (x2, y2) = sorted((ex + ew / 2, ey + eh / 2) for ex, ey, ew, eh in eyes)
+        angle = math.degrees(math.atan2(y2 - y1, x2 - x1))
+
+    return tuple(float(value) / scale for value in (x, y, w, h)) + (angle,)
+
+
+def crop_face(img, box, size):
+    """Rotate the face upright, crop a square around it with FACE_MARGIN and resize."""
+    x, y, w, h, angle = box
+    cx, cy = x + w / 2, y + h / 2
+    if angle:
+        img = img.rotate(angle, resample=Image.BILINEAR, center=(cx, cy))
+    half = max(w, h) * (0.5 + FACE_MARGIN)
+    # Areas outside the frame are padded with black
+    box = (round(cx - half), round(cy - half), round(cx + half), round(cy + half))
+    return img.crop(box).resize(size, Image.BILINEAR)
+
+
+def load_face_pixels(img_path, size=(224, 224)):
+    """Decode an image into uint8 RGB pixels of its aligned primary face.
+
+    The crop box is cached by file content, so scoring the same photo again,
+    or embedding it with another encoder, never re-runs detection. Photos
+    without a detectable face fall back to the whole frame.
+    """
+    with open(img_path, "rb") as f:
+        data = f.read()
+    key = f"opencv@{DETECTOR_VERSION}:{hashlib.md5(data).hexdigest()}"
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        box = face_crop_cache.get_or_set(key, lambda: detect_face(img))
+        if box is None:
+            return np.asarray(img.resize(size, Image.NEAREST), dtype="uint8")
+        return np.asarray(crop_face(img, box, size), dtype="uint8")
@@ -0,0 +1,174 @@
+# backend/core/ai/inference.py
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from .backbones import load_backbone
+from .batching import MicroBatcher
+
+# Every message is a 4-byte big-endian header length, a JSON header and a raw
+# array payload of header["nbytes"] bytes. Requests carry uint8 pixels of
+# shape (n, 224, 224, 3); responses carry float32 embeddings of shape (n, dim).
+_HEADER_LENGTH = struct.Struct(">I")
+
+
+class InferenceError(Exception):
+    """The inference server could not embed a request."""
+
+
+def _recv_exactly(sock, count):
+    buffer = bytearray(count)
+    view = memoryview(buffer)
+    received = 0
+    while received < count:
+        chunk = sock.recv_into(view[received:], count - received)
+        if not chunk:
+            raise ConnectionError("Inference socket closed mid-message")
+        received += chunk
+    return buffer
+
+
+def send_message(sock, header, array=None):
+    payload = b"" if array is None else np.ascontiguousarray(array).tobytes()
+    header = dict(header, nbytes=len(payload))
+    if array is not None:
+        header.update(shape=list(array.shape), dtype=str(array.dtype))
+    encoded = json.dumps(header).encode()
+    sock.sendall(_HEADER_LENGTH.pack(len(encoded)) + encoded + payload)
+
+
+def recv_message(sock):
+    """Read one message and return ``(header, array or None)``."""
+    (length,) = _HEADER_LENGTH.unpack(_recv_exactly(sock, _HEADER_LENGTH.size))
+    header = json.loads(_recv_exactly(sock, length))
+    if not header["nbytes"]:
+        return header, None
+    payload = _recv_exactly(sock, header["nbytes"])
+    return header, np.frombuffer(payload, dtype=header["dtype"]).reshape(header["shape"])
+
+
+class InferenceClient:
+    """Sends embedding requests to the inference server over a Unix socket.
+
+    Each thread keeps its own connection open, so a request costs one round
+    trip. A dropped connection, e.g. after a server restart, is reopened once.
+    """
+
+    def __init__(self, socket_path, timeout=30):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def embed(self, backbone, pixels):
+        """Embed uint8 pixels of shape (n, 224, 224, 3) with ``backbone``.
+
+        Raises:
+            InferenceError: If the server rejected the request
+            OSError: If the server can't be reached
+        """
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                send_message(sock, {"backbone": backbone}, pixels)
+                header, embeddings = recv_message(sock)
+                break
+            except (ConnectionError, BrokenPipeError):
+                self._close()
+                if attempt:
+                    raise
+            except OSError:
+                self._close()
+                raise
+        if "error" in header:
+            raise InferenceError(header["error"])
+        return embeddings
+
+    def stats(self):
+        """Return the server's batching stats by backbone."""
+        sock = getattr(self._local, "sock", None) or self._connect()
+        try:
+            send_message(sock, {"stats": True})
+            header, _ = recv_message(sock)
+        except OSError:
+            self._close()
+            raise
+        return header["stats"]
+
+
+@lru_cache(maxsize=None)
+def get_inference_client(socket_path):
+    return InferenceClient(socket_path)
+
+
+class _InferenceHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                header, pixels = recv_message(self.request)
+            except ConnectionError:
+                return
+            if header.get("stats"):
+                stats = {name: batcher.stats.snapshot() for name, batcher in self.server.batchers.items()}
+                send_message(self.request, {"stats": stats})
+                continue
+            batcher = self.server.batchers.get(header.get("backbone"))
+            if batcher is None:
+                send_message(self.request, {"error": f"Unknown backbone: {header.get('backbone')}"})
+                continue
+            try:
+                embeddings = batcher(pixels)
+            except Exception as e:
+                send_message(self.request, {"error": f"{type(e).__name__}: {e}"})
+                continue
+            send_message(self.request, {}, embeddings)
+
+
+class InferenceServer(socketserver.ThreadingUnixStreamServer):
+    """Owns one copy of each backbone and micro-batches requests from every web worker.
+
+    Each connection is served by its own thread, which hands its pixels to
+    the backbone's MicroBatcher and blocks until its slice of the batch is
+    ready.
+
+    Args:
+        socket_path: Filesystem path of the Unix socket to listen on
+        backbones: Names of the backbones to load and serve
+        max_batch_size: Most images per forward pass
+        max_wait: Seconds a request may wait for others to join its batch
+        loader: Returns the batch embedding function for a backbone name
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, backbones, max_batch_size=32, max_wait=0.005, loader=load_backbone):
+        self.batchers = {
+            name: MicroBatcher(loader(name), max_batch_size, max_wait, name=f"inference-{name}")
+            for name in backbones
+        }
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _InferenceHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
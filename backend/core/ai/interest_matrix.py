@@ -0,0 +1,175 @@
+# backend/core/ai/interest_matrix.py
+
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from core.models import UserInterest
+from .interest_stats import get_population_stats
+from .models.interest_model import top_k
+
+# Rebuild from scratch after this many seconds, to pick up writes made in
+# other processes; writes in this process are applied incrementally
+MAX_AGE = 60 * 60
+
+
+def _normalize_rows(matrix):
+    # sklearn rejects empty matrices; with no entries there is nothing to scale anyway
+    return normalize(matrix) if matrix.nnz else matrix
+
+
+def _standardized_rows(population, triples, rows, n_rows):
+    """L2-normalized sparse rows of (user row, interest id, rating) triples, standardized with population.
+
+    Ratings of interests the population has no statistics for are left out.
+    """
+    columns = np.array(
+        [population.columns.get(interest_id, -1) for interest_id in triples[:, 1].astype(np.int64).tolist()],
+        dtype=np.int64,
+    )
+    known = columns >= 0
+    columns = columns[known]
+    values = (triples[known, 2] - population.mean[columns]) * population.inv_scale[columns]
+    matrix = sparse.csr_matrix(
+        (values.astype(np.float32), (rows[known], columns)), shape=(n_rows, len(population.interest_ids))
+    )
+    return _normalize_rows(matrix)
+
+
+class InterestMatrix:
+    """Every user's standardized interest ratings as L2-normalized rows of a sparse CSR matrix.
+
+    Ratings are standardized with population statistics as InterestModel
+    does. An unrated interest sits at the population mean, which
+    standardizes to zero, so rows stay sparse and cosine similarities are
+    the ones InterestModel computes. Cosine similarity between one user and
+    all others is then a single sparse matrix-vector product. Users whose
+    UserInterest rows change are marked stale (see core/signals.py) and
+    only their rows are re-read and spliced in before the next query.
+    """
+
+    def __init__(self, population, user_ids, matrix):
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._stale = set()
+        self.population = population
+        self.built_at = time.monotonic()
+        self._set_rows(np.asarray(user_ids, dtype=np.int64), matrix)
+
+    def _set_rows(self, user_ids, matrix):
+        # Swapped as one tuple so readers never see ids and rows from different versions
+        self._state = (user_ids, {user_id: row for row, user_id in enumerate(user_ids.tolist())}, matrix)
+
+    @classmethod
+    def build(cls, population):
+        return cls.from_ratings(
+            population, UserInterest.objects.order_by().values_list("user_id", "interest_id", "rating")
+        )
+
+    @classmethod
+    def from_ratings(cls, population, ratings):
+        """Build from (user id, interest id, rating) triples."""
+        triples = np.array(list(ratings), dtype=np.float64).reshape(-1, 3)
+        user_ids, rows = np.unique(triples[:, 0].astype(np.int64), return_inverse=True)
+        return cls(population, user_ids, _standardized_rows(population, triples, rows, len(user_ids)))
+
+    @property
+    def age(self):
+        return time.monotonic() - self.built_at
+
+    @property
+    def shape(self):
+        return self._state[2].shape
+
+    def mark_stale(self, user_id):
+        with self._lock:
+            self._stale.add(user_id)
+
+    def refresh(self):
+        """Re-read the ratings of users marked stale and splice their rows into the matrix."""
+        # One refresh at a time; other readers carry on with the current rows
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                stale, self._stale = self._stale, set()
+            if not stale:
+                return
+            # Read without holding _lock, so writers marking users stale never wait on the database
+            triples = np.array(
+                list(UserInterest.objects.filter(user_id__in=stale).values_list("user_id", "interest_id", "rating")),
+                dtype=np.float64,
+            ).reshape(-1, 3)
+            changed_ids, changed_rows = np.unique(triples[:, 0].astype(np.int64), return_inverse=True)
+            changed = _standardized_rows(self.population, triples, changed_rows, len(changed_ids))
+
+            user_ids, _, matrix = self._state
+            keep = ~np.isin(user_ids, list(stale))
+            self._set_rows(
+                np.concatenate([user_ids[keep], changed_ids]),
+                sparse.vstack([matrix[keep], changed], format="csr"),
+            )
+        finally:
+            self._refreshing.release()
+
+    def similar_users(self, user_id, k=10, candidate_ids=None):
+        """Find the k users whose interest ratings are closest to a user's by cosine similarity.
+
+        Args:
+            user_id: ID of the user
+            k (int): Number of users to return
+            candidate_ids (optional): Only consider these user IDs
+
+        Returns:
+            tuple: (user IDs, similarity scores), best first; empty if the user rated no interests
+        """
+        self.refresh()
+        user_ids, rows, matrix = self._state
+        row = rows.get(user_id)
+        if row is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Clamped at zero, as InterestModel's similarities are
+        if candidate_ids is not None:
+            candidate_rows = np.array([rows[c] for c in candidate_ids if c in rows and c != user_id], dtype=np.int64)
+            scores = np.maximum(np.asarray(matrix[candidate_rows] @ matrix[row].T.toarray()).ravel(), 0.0)
+            best = top_k(scores, k)
+            return user_ids[candidate_rows[best]], scores[best]
+
+        scores = np.maximum(np.asarray(matrix @ matrix[row].T.toarray()).ravel(), 0.0)
+        scores[row] = -np.inf
+        best = top_k(scores, k)
+        best = best[np.isfinite(scores[best])]
+        return user_ids[best], scores[best]
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_interest_matrix(population=None):
+    """This process's InterestMatrix, built on first use and rebuilt once older than MAX_AGE.
+
+    Args:
+        population (PopulationStats, optional): Statistics the rows must be standardized
+            with; a matrix built with another version is rebuilt. By default the current
+            ones (see get_population_stats) whenever the matrix is built.
+    """
+    global _matrix
+    with _matrix_lock:
+        if (
+            _matrix is None
+            or _matrix.age > MAX_AGE
+            or (population is not None and population.version != _matrix.population.version)
+        ):
+            _matrix = InterestMatrix.build(population or get_population_stats())
+        return _matrix
+
+
+def mark_interests_changed(user_id):
+    """Have the next query re-read this user's ratings, if this process has built the matrix."""
+    if _matrix is not None:
+        _matrix.mark_stale(user_id)
@@ -0,0 +1,151 @@
+# backend/core/ai/interest_stats.py
+
+import threading
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+
+from core.caching import interest_stats_cache
+from core.models import Interest, InterestStats, UserInterest
+
+
+class PopulationStats:
+    """Per-interest population mean and inverse standard deviation, as aligned arrays.
+
+    Args:
+        version: Sum of the InterestStats row versions these arrays were read at
+        interest_ids: Interest id of each column
+        mean: Mean rating per interest
+        inv_scale: 1 / standard deviation per interest; 1 where the deviation is 0, as StandardScaler does
+    """
+
+    def __init__(self, version, interest_ids, mean, inv_scale):
+        self.version = version
+        self.interest_ids = interest_ids
+        self.columns = {interest_id: column for column, interest_id in enumerate(interest_ids.tolist())}
+        self.mean = mean
+        self.inv_scale = inv_scale
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (interest id, count, mean, m2, version) rows."""
+        table = np.array(list(rows), dtype=np.float64).reshape(-1, 5)
+        count, m2 = table[:, 1], table[:, 3]
+        variance = np.divide(m2, count, out=np.zeros_like(m2), where=count > 0)
+        std = np.sqrt(variance)
+        inv_scale = np.divide(1.0, std, out=np.ones_like(std), where=std > 0)
+        return cls(int(table[:, 4].sum()), table[:, 0].astype(np.int64), table[:, 2], inv_scale)
+
+    def transform(self, interest_ratings):
+        """Standardize ratings laid out in interest_ids order with one subtract and one multiply."""
+        standardized = np.subtract(interest_ratings, self.mean, dtype=np.float64)
+        standardized *= self.inv_scale
+        return standardized
+
+    def ratings_matrix(self, user_ids):
+        """Users' ratings in interest_ids order, with unrated interests at the population mean.
+
+        Returns:
+            np.array: Array of shape (len(user_ids), number of interests)
+        """
+        return ratings_matrix(user_ids, self.interest_ids, self.mean)
+
+
+def ratings_matrix(user_ids, interest_ids, fill):
+    """Users' ratings laid out in the given interest order, in one query.
+
+    Args:
+        user_ids: IDs of the users, one row each
+        interest_ids: Interest id of each column
+        fill: Value per column for interests a user hasn't rated
+
+    Returns:
+        np.array: Array of shape (len(user_ids), len(interest_ids))
+    """
+    rows = {user_id: row for row, user_id in enumerate(user_ids)}
+    columns = {interest_id: column for column, interest_id in enumerate(np.asarray(interest_ids).tolist())}
+    matrix = np.tile(np.asarray(fill, dtype=np.float64), (len(user_ids), 1))
+    ratings = UserInterest.objects.filter(
+        user_id__in=rows, interest_id__in=columns
+    ).values_list("user_id", "interest_id", "rating")
+    for user_id, interest_id, rating in ratings:
+        matrix[rows[user_id], columns[interest_id]] = rating
+    return matrix
+
+
+def load_population_stats():
+    """Read every interest's statistics from the database as one PopulationStats."""
+    rows = InterestStats.objects.order_by("interest_id").values_list("interest_id", "count", "mean", "m2", "version")
+    return PopulationStats.from_rows(rows)
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_population_stats():
+    """This process's PopulationStats, re-read only when the shared version has moved on.
+
+    The current version lives in the shared cache, so a worker whose arrays
+    are current pays one cache read and no database query.
+    """
+    global _stats
+    version = interest_stats_cache.get("version")
+    with _stats_lock:
+        if _stats is None or _stats.version != version:
+            _stats = load_population_stats()
+            interest_stats_cache.set("version", _stats.version)
+        return _stats
+
+
+def record_rating_change(interest_id, old=None, new=None):
+    """Apply a Welford update for one UserInterest write to its interest's statistics.
+
+    Args:
+        interest_id: ID of the rated interest
+        old: Rating being replaced or deleted, None for a new rating
+        new: Rating being stored, None for a deletion
+    """
+    with transaction.atomic():
+        InterestStats.objects.get_or_create(interest_id=interest_id)
+        # Locked so concurrent writes to one interest apply one after the other
+        stats = InterestStats.objects.select_for_update().get(interest_id=interest_id)
+        if old is not None:
+            stats.remove(old)
+        if new is not None:
+            stats.add(new)
+        stats.version += 1
+        stats.save()
+        transaction.on_commit(lambda: interest_stats_cache.delete("version"))
+
+
+def rebuild_interest_stats():
+    """Recompute every interest's statistics from scratch, e.g. after bulk writes that skip signals.
+
+    Returns:
+        int: Number of interests
+    """
+    by_interest = {interest_id: [] for interest_id in Interest.objects.values_list("id", flat=True)}
+    for interest_id, rating in UserInterest.objects.values_list("interest_id", "rating").iterator():
+        by_interest[interest_id].append(rating)
+
+    rows = []
+    for interest_id, ratings in by_interest.items():
+        ratings = np.array(ratings, dtype=np.float64)
+        rows.append(InterestStats(
+            interest_id=interest_id,
+            count=len(ratings),
+            mean=ratings.mean() if len(ratings) else 0.0,
+            m2=((ratings - ratings.mean()) ** 2).sum() if len(ratings) else 0.0,
+        ))
+    with transaction.atomic():
+        # Past every current version, so the summed version moves on for every worker
+        version = InterestStats.objects.aggregate(top=Max("version"))["top"] or 0
+        for stats in rows:
+            stats.version = version + 1
+        InterestStats.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["interest"], update_fields=["count", "mean", "m2", "version"]
+        )
+        transaction.on_commit(lambda: interest_stats_cache.delete("version"))
+    return len(rows)
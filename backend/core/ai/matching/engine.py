@@ -1,11 +1,20 @@
 import numpy as np
 from datetime import datetime, timedelta
+from ..embeddings import get_profile_embeddings
+from ..encoders import find_encoder
+from ..interest_matrix import get_interest_matrix
+from ..interest_stats import get_population_stats, ratings_matrix
 from ..models.composite_model import CompositeModel
 
 class MatchingEngine:
-    def __init__(self):
-        """Initialize the matching engine."""
-        self.model = CompositeModel()
+    def __init__(self, population=None):
+        """Initialize the matching engine.
+
+        Args:
+            population (PopulationStats, optional): Interest statistics the model
+                standardizes with; by default this process's current ones
+        """
+        self.model = CompositeModel(population or get_population_stats())
         self.batch_config = {
             'free_user': {
                 'batches_per_week': 7,
@@ -65,17 +74,13 @@ class MatchingEngine:
             batch_size = config['prospects_per_batch']
             
         # Calculate compatibility scores
-        scores = []
-        for candidate in candidates:
+        candidates = {
+            c.pk: c for c in candidates
             # Skip if in cooldown period
-            if self._is_in_cooldown(user, candidate):
-                continue
-                
-            score = self.model.calculate_mutual_compatibility(
-                user.photos, user.interests,
-                candidate.photos, candidate.interests
-            )
-            scores.append((candidate, score))
+            if not self._is_in_cooldown(user, c)
+        }
+        scores = self.score_candidates(user, list(candidates))
+        scores = [(candidates[pk], score) for pk, score in scores]
             
         # Sort by score
         scores.sort(key=lambda x: x[1], reverse=True)
@@ -91,6 +96,56 @@ class MatchingEngine:
         valid_matches = [(c, s) for c, s in scores if s >= min_score]
         return valid_matches[:batch_size]
         
+    def score_candidates(self, user, candidate_ids):
+        """Score candidates against a user from stored profile photo embeddings.
+
+        Embeddings are read from the upload pipeline's results, so scoring
+        never runs the CNN; candidates without one are left out. Interest
+        ratings are laid out in the columns the model was fitted on, with
+        unrated interests at the fitted mean.
+
+        Args:
+            user: User object
+            candidate_ids: IDs of the candidates
+
+        Returns:
+            list: (candidate ID, score) tuples
+        """
+        if not candidate_ids:
+            return []
+        self.model.check_fitted()
+        if self.model.interest_ids is None:
+            raise ValueError("Model was fitted without interest ids; refit it with interest_ids")
+
+        features, user_ids = get_profile_embeddings(
+            [user.pk] + list(candidate_ids), find_encoder(self.model.encoder_key)
+        )
+        if not user_ids or user_ids[0] != user.pk:
+            return []
+        ratings = ratings_matrix(user_ids, self.model.interest_ids, self.model.interest_model.mean_)
+        scores = self.model.batch_mutual_compatibility(features[0], ratings[0], features[1:], ratings[1:])
+        return list(zip(user_ids[1:], scores.tolist()))
+
+    def similar_by_interests(self, user, k=50, candidate_ids=None):
+        """Shortlist the users whose interest ratings are most similar to a user's.
+
+        Reads this process's interest matrix standardized with the model's
+        population statistics, so the scores are the model's own interest
+        similarities.
+
+        Args:
+            user: User object
+            k (int): Number of users to return
+            candidate_ids (optional): Only consider these user IDs
+
+        Returns:
+            tuple: (user IDs, similarity scores), best first
+        """
+        population = self.model.interest_model.population
+        if population is None:
+            raise ValueError("Model standardizes with a fitted scaler; the interest matrix needs population stats")
+        return get_interest_matrix(population).similar_users(user.pk, k, candidate_ids)
+
     def _is_in_cooldown(self, user1, user2, cooldown_days=14):
         """Check if a pair of users is in cooldown period after rejection.
         
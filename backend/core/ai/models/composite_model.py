@@ -1,13 +1,19 @@
 import numpy as np
 from sklearn.ensemble import GradientBoostingRegressor
 from .photo_model import PhotoModel
+from ..encoders import find_encoder
 from .interest_model import InterestModel
 
 class CompositeModel:
-    def __init__(self):
-        """Initialize composite model components."""
+    def __init__(self, population=None):
+        """Initialize composite model components.
+
+        Args:
+            population (PopulationStats, optional): Interest statistics to standardize
+                with instead of fitting a scaler (see core/ai/interest_stats.py)
+        """
         self.photo_model = PhotoModel()
-        self.interest_model = InterestModel()
+        self.interest_model = InterestModel(population)
         self.preference_model = GradientBoostingRegressor(
             n_estimators=100,
             learning_rate=0.1,
@@ -15,8 +21,12 @@ class CompositeModel:
             random_state=42
         )
         self.is_fitted = False
+        # Encoder version the preference model was fitted on, set by fit()
+        self.encoder_key = None
+        # Interest id of each interest_ratings column the model was fitted on, set by fit()
+        self.interest_ids = None
         
-    def fit(self, photo_paths, interest_ratings, target_ratings, sample_weights=None):
+    def fit(self, photo_paths, interest_ratings, target_ratings, sample_weights=None, interest_ids=None):
         """Fit the composite model using both photo and interest data.
         
         Args:
@@ -24,14 +34,44 @@ class CompositeModel:
             interest_ratings (np.array): User interest ratings
             target_ratings (np.array): Target preference ratings
             sample_weights (np.array, optional): Weights for training samples
+            interest_ids (list, optional): Interest id of each interest_ratings column
         """
-        # Extract photo features
-        photo_features, valid_paths = self.photo_model.batch_extract_features(photo_paths)
-        if photo_features is None:
-            raise ValueError("No valid photo features extracted")
-            
-        # Process interest ratings
-        self.interest_model.fit(interest_ratings)
+        self.fit_features(
+            self._extract_features(photo_paths), interest_ratings, target_ratings, sample_weights,
+            encoder_key=self.photo_model.encoder_key, interest_ids=interest_ids
+        )
+
+    def fit_features(self, photo_features, interest_ratings, target_ratings, sample_weights=None,
+                     encoder_key=None, interest_ids=None):
+        """Fit the composite model on precomputed photo embeddings.
+        
+        The interest columns are part of the fitted model: prediction must lay
+        ratings out in interest_ids order and standardize them with the scaler
+        fitted here.
+        
+        Args:
+            photo_features (np.array): Photo embeddings of shape (n_samples, dim)
+            interest_ratings (np.array): User interest ratings
+            target_ratings (np.array): Target preference ratings
+            sample_weights (np.array, optional): Weights for training samples
+            encoder_key (str, optional): Encoder the embeddings came from, by default the photo model's
+            interest_ids (list, optional): Interest id of each interest_ratings column, by default the
+                loaded population statistics' order, which it must match when given; needed to score
+                users from the database
+        """
+        # Process interest ratings; population statistics, when loaded, need no fit
+        population = self.interest_model.population
+        if population is None:
+            self.interest_model.fit(interest_ratings)
+            interest_ids = None if interest_ids is None else np.asarray(interest_ids, dtype=np.int64)
+        elif interest_ids is None:
+            interest_ids = population.interest_ids
+        elif not np.array_equal(interest_ids, population.interest_ids):
+            raise ValueError("interest_ids must be in the population statistics' column order")
+        else:
+            interest_ids = population.interest_ids
+        if interest_ids is not None and len(interest_ids) != np.shape(interest_ratings)[1]:
+            raise ValueError(f"Got {len(interest_ids)} interest ids for {np.shape(interest_ratings)[1]} columns")
         interest_features = self.interest_model.transform(interest_ratings)
         
         # Combine features
@@ -44,6 +84,8 @@ class CompositeModel:
             sample_weight=sample_weights
         )
         self.is_fitted = True
+        self.encoder_key = encoder_key or self.photo_model.encoder_key
+        self.interest_ids = interest_ids
         
     def predict(self, photo_paths, interest_ratings):
         """Predict preference scores for new users.
@@ -55,25 +97,41 @@ class CompositeModel:
         Returns:
             np.array: Predicted preference scores
         """
+        self.check_fitted()
+        return self.predict_features(self._extract_features(photo_paths), interest_ratings)
+
+    def predict_features(self, photo_features, interest_ratings):
+        """Predict preference scores from precomputed photo embeddings, in one batch.
+        
+        Args:
+            photo_features (np.array): Embeddings from the encoder in encoder_key, shape (n_samples, dim)
+            interest_ratings (np.array): User interest ratings, shape (n_samples, n_interests)
+            
+        Returns:
+            np.array: Predicted preference scores
+        """
+        self.check_fitted()
+        combined_features = np.hstack([
+            np.atleast_2d(photo_features),
+            self.interest_model.transform(np.atleast_2d(interest_ratings)),
+        ])
+        return self.preference_model.predict(combined_features)
+
+    def check_fitted(self):
+        """Raise ValueError unless the model is fitted on a current or retired, still servable, encoder version."""
         if not self.is_fitted:
             raise ValueError("Model must be fitted before prediction")
-            
-        # Extract photo features
+        if find_encoder(self.encoder_key) is None:
+            raise ValueError(f"Model was fitted on unregistered encoder {self.encoder_key}; refit it")
+
+    def _extract_features(self, photo_paths):
         photo_features, valid_paths = self.photo_model.batch_extract_features(photo_paths)
         if photo_features is None:
             raise ValueError("No valid photo features extracted")
-            
-        # Process interest ratings
-        interest_features = self.interest_model.transform(interest_ratings)
-        
-        # Combine features
-        combined_features = np.hstack([photo_features, interest_features])
-        
-        # Predict preferences
-        return self.preference_model.predict(combined_features)
+        return photo_features
         
     def calculate_mutual_compatibility(self, user1_photos, user1_interests,
-                                    user2_photos, user2_interests):
+                                       user2_photos, user2_interests):
         """Calculate mutual compatibility between two users.
         
         Args:
@@ -85,23 +143,65 @@ class CompositeModel:
         Returns:
             float: Mutual compatibility score between 0 and 1
         """
-        # Get preference predictions in both directions
-        pref1_to_2 = self.predict([user2_photos[0]], user2_interests)[0]  # User1's preference for User2
-        pref2_to_1 = self.predict([user1_photos[0]], user1_interests)[0]  # User2's preference for User1
+        # Both first photos go through the CNN in one batch
+        photo_features, valid_paths = self.photo_model.batch_extract_features([user1_photos[0], user2_photos[0]])
+        if photo_features is None or len(valid_paths) != 2:
+            raise ValueError("No valid photo features extracted")
+        return self.calculate_mutual_compatibility_features(
+            photo_features[0], user1_interests, photo_features[1], user2_interests
+        )
+
+    def calculate_mutual_compatibility_features(self, user1_features, user1_interests,
+                                                user2_features, user2_interests):
+        """Calculate mutual compatibility between two users from precomputed photo embeddings.
+        
+        Args:
+            user1_features (np.array): First user's profile photo embedding
+            user1_interests (np.array): First user's interest ratings
+            user2_features (np.array): Second user's profile photo embedding
+            user2_interests (np.array): Second user's interest ratings
+            
+        Returns:
+            float: Mutual compatibility score between 0 and 1
+        """
+        return float(self.batch_mutual_compatibility(
+            user1_features, user1_interests,
+            np.reshape(user2_features, (1, -1)), np.reshape(user2_interests, (1, -1))
+        )[0])
+
+    def batch_mutual_compatibility(self, user_features, user_interests,
+                                   candidate_features, candidate_interests):
+        """Calculate mutual compatibility between one user and many candidates.
+        
+        Both directions of every pair come from a single predict call: one row
+        for the user and one per candidate.
+        
+        Args:
+            user_features (np.array): The user's profile photo embedding
+            user_interests (np.array): The user's interest ratings
+            candidate_features (np.array): Candidates' embeddings, shape (n_candidates, dim)
+            candidate_interests (np.array): Candidates' interest ratings, shape (n_candidates, n_interests)
+            
+        Returns:
+            np.array: Mutual compatibility scores, one per candidate
+        """
+        preferences = self.predict_features(
+            np.vstack([np.reshape(user_features, (1, -1)), candidate_features]),
+            np.vstack([np.reshape(user_interests, (1, -1)), candidate_interests]),
+        )
+        pref_for_user, pref_for_candidates = preferences[0], preferences[1:]
         
         # Calculate interest similarity
-        interest_similarity = self.interest_model.calculate_similarity(
-            user1_interests,
-            user2_interests
+        interest_similarity = self.interest_model.batch_calculate_similarity(
+            user_interests,
+            candidate_interests
         )
         
         # Combine scores with weights
         photo_weight = 0.7  # Higher weight for photo-based preferences
         interest_weight = 0.3  # Lower weight for interest similarity
         
-        mutual_score = (
-            photo_weight * (pref1_to_2 + pref2_to_1) / 2 +
+        return (
+            photo_weight * (pref_for_candidates + pref_for_user) / 2 +
             interest_weight * interest_similarity
         )
-        
-        return mutual_score 
\ No newline at end of file
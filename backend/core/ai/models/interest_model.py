@@ -1,12 +1,48 @@
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from scipy.spatial.distance import cosine
+
+
+def l2_normalize(vectors):
+    """Scale each row to unit length; all-zero rows stay zero."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def top_k(scores, k):
+    """Indices of the k highest scores, best first.
+
+    argpartition finds them in linear time, so only those k get sorted.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind="stable")]
+
 
 class InterestModel:
-    def __init__(self):
-        """Initialize the interest model."""
+    def __init__(self, population=None):
+        """Initialize the interest model.
+
+        Args:
+            population (PopulationStats, optional): Shared population statistics to
+                standardize with instead of fitting (see core/ai/interest_stats.py)
+        """
         self.scaler = StandardScaler()
+        self.population = None
         self.is_fitted = False
+        if population is not None:
+            self.use_population(population)
+
+    def use_population(self, population):
+        """Standardize with shared population statistics; fit() is then unnecessary.
+
+        Args:
+            population (PopulationStats): Statistics whose interest_ids give the column order
+        """
+        self.population = population
+        self.mean_, self.inv_scale_ = population.mean, population.inv_scale
+        self.is_fitted = True
         
     def fit(self, interest_ratings):
         """Fit the scaler to interest ratings.
@@ -15,6 +51,8 @@ class InterestModel:
             interest_ratings (np.array): Array of shape (n_samples, n_interests)
         """
         self.scaler.fit(interest_ratings)
+        self.population = None
+        self.mean_, self.inv_scale_ = self.scaler.mean_, 1.0 / self.scaler.scale_
         self.is_fitted = True
         
     def transform(self, interest_ratings):
@@ -28,7 +66,13 @@ class InterestModel:
         """
         if not self.is_fitted:
             raise ValueError("Model must be fitted before transform")
-        return self.scaler.transform(interest_ratings)
+        return self._standardize(interest_ratings)
+
+    def _standardize(self, interest_ratings):
+        """A fused subtract-and-multiply, without sklearn's per-call input checks."""
+        standardized = np.subtract(interest_ratings, self.mean_, dtype=np.float64)
+        standardized *= self.inv_scale_
+        return standardized
         
     def calculate_similarity(self, user_interests1, user_interests2):
         """Calculate cosine similarity between two users' interests.
@@ -43,13 +87,11 @@ class InterestModel:
         if not self.is_fitted:
             raise ValueError("Model must be fitted before calculating similarity")
             
-        # Transform both interest vectors
-        interests1_norm = self.transform(user_interests1.reshape(1, -1))
-        interests2_norm = self.transform(user_interests2.reshape(1, -1))
-        
-        # Calculate cosine similarity
-        similarity = 1 - cosine(interests1_norm.flatten(), interests2_norm.flatten())
-        return max(0, similarity)  # Ensure non-negative similarity
+        # Standardize and normalize both vectors in one pass; cosine is then a dot product
+        interests1_norm, interests2_norm = l2_normalize(
+            self._standardize(np.vstack([np.ravel(user_interests1), np.ravel(user_interests2)]))
+        )
+        return max(0.0, float(interests1_norm @ interests2_norm))  # Ensure non-negative similarity
         
     def batch_calculate_similarity(self, user_interests, other_users_interests):
         """Calculate similarities between one user and many others.
@@ -64,14 +106,23 @@ class InterestModel:
         if not self.is_fitted:
             raise ValueError("Model must be fitted before calculating similarity")
             
-        # Transform all interest vectors
-        user_interests_norm = self.transform(user_interests.reshape(1, -1))
-        others_interests_norm = self.transform(other_users_interests)
-        
-        # Calculate similarities
-        similarities = []
-        for other_interests in others_interests_norm:
-            similarity = 1 - cosine(user_interests_norm.flatten(), other_interests)
-            similarities.append(max(0, similarity))
-            
-        return np.array(similarities) 
\ No newline at end of file
+        user_interests_norm = l2_normalize(self._standardize(np.reshape(user_interests, (1, -1))))[0]
+        others_interests_norm = l2_normalize(self._standardize(other_users_interests))
+
+        # One matrix-vector product for all cosines
+        return np.maximum(others_interests_norm @ user_interests_norm, 0.0)
+
+    def top_matches(self, user_interests, other_users_interests, k=10):
+        """Find the k others whose interests are most similar to a user's.
+
+        Args:
+            user_interests (np.array): Single user's interest ratings (1D array)
+            other_users_interests (np.array): Matrix of other users' ratings
+            k (int): Number of matches to return
+
+        Returns:
+            tuple: (row indices into other_users_interests, their similarity scores), best first
+        """
+        similarities = self.batch_calculate_similarity(user_interests, other_users_interests)
+        best = top_k(similarities, k)
+        return best, similarities[best]
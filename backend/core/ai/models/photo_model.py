@@ -1,18 +1,21 @@
-import os
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.applications import EfficientNetV2B0
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.applications.efficientnet_v2 import preprocess_input
+from ..backbones import embed_images, embed_pixels, load_pixels
+from ..encoders import get_encoder
 
 class PhotoModel:
-    def __init__(self):
-        """Initialize the photo model with EfficientNetV2B0."""
-        self.model = EfficientNetV2B0(
-            weights='imagenet',
-            include_top=False,
-            pooling='avg'
-        )
+    def __init__(self, backbone='efficientnet_v2_b0'):
+        """Initialize the photo model with EfficientNetV2B0.
+
+        The backbone itself is loaded on first use, or served by the inference
+        server when settings.INFERENCE_SOCKET is set.
+        """
+        self.encoder = get_encoder(backbone)
+        self.backbone = backbone
+
+    @property
+    def encoder_key(self):
+        """Version tag of the embedding space this model's features live in."""
+        return self.encoder.key
         
     def extract_features(self, img_path):
         """Extract features from an image using EfficientNetV2.
@@ -24,14 +27,11 @@ class PhotoModel:
             np.array: Feature vector of shape (1280,) or None if error
         """
         try:
-            # Load and preprocess image
-            img = image.load_img(img_path, target_size=(224, 224))
-            x = image.img_to_array(img)
-            x = np.expand_dims(x, axis=0)
-            x = preprocess_input(x)
+            # Load image
+            x = np.expand_dims(load_pixels(img_path, self.encoder.input_size), axis=0)
             
             # Extract features
-            features = self.model.predict(x, verbose=0)
+            features = embed_pixels(self.backbone, x)
             return features.flatten()
             
         except Exception as e:
@@ -47,16 +47,5 @@ class PhotoModel:
         Returns:
             np.array: Feature matrix of shape (n_images, 1280)
         """
-        features_list = []
-        valid_paths = []
-        
-        for img_path in img_paths:
-            features = self.extract_features(img_path)
-            if features is not None:
-                features_list.append(features)
-                valid_paths.append(img_path)
-                
-        if not features_list:
-            return None, []
-            
-        return np.vstack(features_list), valid_paths
\ No newline at end of file
+        # One request for all images, so they share a forward pass
+        return embed_images(self.backbone, img_paths)
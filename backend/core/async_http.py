@@ -0,0 +1,49 @@
+# backend/core/async_http.py
+
+import asyncio
+import contextlib
+import weakref
+
+import httpx
+from django.conf import settings
+
+# One pooled client per event loop; a uvicorn worker runs a single loop for its lifetime
+_clients = weakref.WeakKeyDictionary()
+
+
+async def _close_with_loop(client):
+    """Suspend until the event loop shuts down its async generators, then close ``client``.
+
+    asyncio.run and asgiref's per-request loops under WSGI both finalize
+    async generators before closing the loop, so a loop's client never
+    outlives it.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+def get_async_client():
+    """Return the pooled ``httpx.AsyncClient`` for the running event loop.
+
+    Connections to Nominatim, Azure and OpenAI are kept alive and shared by
+    every request the worker is serving, up to ASYNC_HTTP_MAX_CONNECTIONS
+    concurrent outbound calls. The client is closed when its loop ends.
+    """
+    loop = asyncio.get_running_loop()
+    client, closer = _clients.get(loop, (None, None))
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ASYNC_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=settings.ASYNC_HTTP_TIMEOUT,
+        )
+        # Step to the yield; starting it registers the generator with the loop
+        closer = _close_with_loop(client)
+        with contextlib.suppress(StopIteration):
+            closer.asend(None).send(None)
+        _clients[loop] = (client, closer)
+    return client
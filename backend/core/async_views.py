@@ -0,0 +1,112 @@
+# backend/core/async_views.py
+
+import math
+from functools import partial, wraps
+
+import httpx
+import openai
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+
+from .ai.ai_models import agenerate_pickup_line
+from .authentication import TokenUserAuthentication
+from .geocoding import asearch_locations
+from .models import UserPreference
+from .throttling import PickupLineRateThrottle
+
+# Views that spend their time waiting on Nominatim, Azure or OpenAI. They run
+# as coroutines under uvicorn workers, so one worker can hold hundreds of
+# outbound calls open instead of blocking a sync worker on each.
+
+MAX_PICKUP_LINE_PHOTOS = 6
+
+
+def token_required(view=None, throttle_classes=()):
+    """Authenticate and throttle an async view from its JWT without touching the database.
+
+    DRF's APIView is sync-only, so this does what its authentication and
+    throttling steps would with TokenUserAuthentication, sets
+    ``request.user`` and applies the default throttles plus
+    ``throttle_classes``, counted in the same shared store as the DRF views.
+    """
+    if view is None:
+        return partial(token_required, throttle_classes=throttle_classes)
+
+    @csrf_exempt
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        try:
+            result = TokenUserAuthentication().authenticate(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({'detail': str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+        if result is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        request.user = result[0]
+
+        for throttle_class in [*api_settings.DEFAULT_THROTTLE_CLASSES, *throttle_classes]:
+            throttle = throttle_class()
+            if not await sync_to_async(throttle.allow_request)(request, None):
+                response = JsonResponse({'detail': 'Request was throttled.'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+                response['Retry-After'] = str(math.ceil(throttle.wait()))
+                return response
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+@require_GET
+@token_required
+async def location_search(request):
+    query = request.GET.get('query', '')
+    if not query:
+        return JsonResponse([], safe=False)
+
+    try:
+        return JsonResponse(await asearch_locations(query), safe=False)
+    except httpx.HTTPError as e:
+        print(f"ERROR - Failed to fetch locations: {str(e)}")
+        return JsonResponse(
+            {'detail': 'Failed to search locations. Please try again.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+@require_POST
+@token_required(throttle_classes=[PickupLineRateThrottle])
+async def pickup_line(request):
+    photos = request.FILES.getlist('photos')
+    if not photos:
+        return JsonResponse({'detail': 'No photos provided'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(photos) > MAX_PICKUP_LINE_PHOTOS:
+        return JsonResponse(
+            {'detail': f'At most {MAX_PICKUP_LINE_PHOTOS} photos are allowed'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    preference = await UserPreference.objects.filter(
+        user_id=request.user.id
+    ).values_list('preferred_gender', flat=True).afirst()
+
+    try:
+        line = await agenerate_pickup_line([photo.read() for photo in photos], preference)
+    except ImproperlyConfigured as e:
+        print(f"ERROR - Pickup lines are not configured: {str(e)}")
+        return JsonResponse(
+            {'detail': 'Pickup lines are not available right now.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    except openai.OpenAIError as e:
+        print(f"ERROR - Failed to generate pickup line: {str(e)}")
+        return JsonResponse(
+            {'detail': 'Failed to generate a pickup line. Please try again.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    return JsonResponse({'pickup_line': line})
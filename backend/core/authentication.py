@@ -0,0 +1,92 @@
+# backend/core/authentication.py
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+
+class UserCache:
+    """Short-lived, per-process cache of user rows keyed by primary key.
+
+    Entries live for ``settings.AUTH_USER_CACHE_TTL`` seconds (0 disables the
+    cache). Writes in this process evict immediately through the model
+    signals; other processes may serve a row that is up to one TTL old.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AUTH_USER_CACHE_TTL', 0)
+
+    def get(self, user_id):
+        """Return a private copy of the user, loading it on a miss.
+
+        Raises:
+            User.DoesNotExist: If no user has this primary key
+        """
+        ttl = self.ttl
+        if ttl <= 0:
+            return User.objects.get(pk=user_id)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= now:
+            user = User.objects.get(pk=user_id)
+            with self._lock:
+                self._entries[user_id] = (now + ttl, user)
+        else:
+            user = entry[1]
+        # Views mutate and save request.user, so never hand out the shared instance or its JSON fields
+        return copy.deepcopy(user)
+
+    def evict(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that reads the user row through the per-process user cache."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        try:
+            user = user_cache.get(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
+
+class TokenUserAuthentication(JWTStatelessUserAuthentication):
+    """Authenticate from the token claims alone, without touching the database.
+
+    ``request.user`` is a lightweight ``TokenUser`` exposing ``id``/``pk``, so
+    this is only for endpoints that never need the user row. A deactivated
+    user keeps access until their access token expires.
+    """
@@ -0,0 +1,164 @@
+# backend/core/caching.py
+
+import asyncio
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Default time-to-live per namespace, in seconds. Override with settings.CACHE_NAMESPACE_TTLS.
+DEFAULT_TTLS = {
+    'calibration': 60 * 60 * 24,  # Catalog only changes through load_calibration_photos
+    'face_crops': 60 * 60 * 24 * 30,  # Keyed by file content and detector version
+    'geocode': 60 * 60 * 24 * 7,  # Place names practically never move
+    'interest_stats': 60,  # Only the version key; bounds how long a racing reader can pin an old one
+    'onboarding': 60 * 10,  # Keyed by data_version, so the TTL only bounds memory
+    'user_models': 60 * 60,  # Deleted whenever the model is retrained
+}
+
+_MISSING = object()
+
+
+class CacheNamespace:
+    """A named slice of the shared cache with its own TTL and stampede protection."""
+
+    def __init__(self, name, alias='default'):
+        self.name = name
+        self.alias = alias
+        # Computations running in this process's threads, one Event per key; guarded by _pending_lock,
+        # which is never held while computing or waiting
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        # Pending async computations per event loop, keyed like the cache
+        self._inflight = weakref.WeakKeyDictionary()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'CACHE_NAMESPACE_TTLS', {}).get(self.name, DEFAULT_TTLS.get(self.name, 300))
+
+    def make_key(self, key):
+        return f'{self.name}:{key}'
+
+    def get(self, key, default=None):
+        return self.cache.get(self.make_key(key), default)
+
+    def set(self, key, value, ttl=None):
+        self.cache.set(self.make_key(key), value, timeout=self.ttl if ttl is None else ttl)
+
+    def delete(self, key):
+        self.cache.delete(self.make_key(key))
+
+    def get_or_set(self, key, compute, ttl=None, lock_timeout=30, wait=5.0):
+        """Return the cached value, computing it at most once across concurrent callers.
+
+        Threads in one process wait for the thread already computing the key.
+        Processes race for a short-lived lock key in the shared cache; losers
+        poll for the winner's value for up to ``wait`` seconds before
+        computing it themselves. No lock is held while computing or waiting,
+        so ``compute`` may itself use the cache.
+
+        Args:
+            key: Key within this namespace
+            compute: Zero-argument callable producing the value on a miss
+            ttl: Override for the namespace TTL
+            lock_timeout: Seconds before an abandoned cross-process lock expires
+            wait: Seconds to wait for another thread's or process's result
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._pending_lock:
+            done = self._pending.get(key)
+            leader = done is None
+            if leader:
+                done = self._pending[key] = threading.Event()
+        if not leader:
+            done.wait(wait)
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            # The other thread failed or is too slow
+            return self._compute(key, compute, ttl, lock_timeout, wait)
+
+        try:
+            # Another thread may have stored the value between the first read and taking the lead
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            return self._compute(key, compute, ttl, lock_timeout, wait)
+        finally:
+            with self._pending_lock:
+                del self._pending[key]
+            done.set()
+
+    def _compute(self, key, compute, ttl, lock_timeout, wait):
+        """Compute and store the value, unless another process holding the lock key stores it within ``wait``."""
+        lock_key = self.make_key(f'{key}:lock')
+        acquired = self.cache.add(lock_key, 1, timeout=lock_timeout)
+        if not acquired:
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = self.get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+        try:
+            value = compute()
+            self.set(key, value, ttl)
+        finally:
+            if acquired:
+                self.cache.delete(lock_key)
+        return value
+
+    async def aget_or_set(self, key, compute, ttl=None):
+        """Async counterpart of get_or_set for the async views.
+
+        Concurrent misses on one event loop await a single ``compute()``.
+        Workers don't coordinate with each other, so a cold key costs at most
+        one computation per worker.
+
+        Args:
+            key: Key within this namespace
+            compute: Zero-argument coroutine function producing the value on a miss
+            ttl: Override for the namespace TTL
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value = await self.cache.aget(self.make_key(key), _MISSING)
+        if value is not _MISSING:
+            return value
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.setdefault(loop, {})
+        task = pending.get(key)
+        if task is None:
+            async def run():
+                try:
+                    result = await compute()
+                    await self.cache.aset(self.make_key(key), result, timeout=self.ttl if ttl is None else ttl)
+                    return result
+                finally:
+                    pending.pop(key, None)
+
+            task = pending[key] = loop.create_task(run())
+        # A disconnecting client must not cancel the computation others are waiting on
+        return await asyncio.shield(task)
+
+
+calibration_cache = CacheNamespace('calibration')
+face_crop_cache = CacheNamespace('face_crops')
+geocode_cache = CacheNamespace('geocode')
+interest_stats_cache = CacheNamespace('interest_stats')
+onboarding_cache = CacheNamespace('onboarding')
+user_model_cache = CacheNamespace('user_models')
@@ -0,0 +1,184 @@
+# backend/core/calibration.py
+
+import csv
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from PIL import Image
+
+from .caching import calibration_cache
+from .renditions import RESPONSIVE_FORMATS, RESPONSIVE_VERSION, responsive_name, responsive_widths
+
+GENDER_DIRS = {'M': 'male', 'F': 'female'}
+# renditions is the RESPONSIVE_VERSION built for the photo, if any
+MANIFEST_FIELDS = ('id', 'gender', 'sha256', 'size', 'mtime', 'width', 'height', 'renditions')
+PHOTO_FILENAME = re.compile(r'^(\d{6})\.jpg$')
+# Hashing and copying are I/O bound, so use a few threads per core
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def source_dir(gender):
+    return os.path.join(settings.BASE_DIR, 'static', 'calibration_photos', GENDER_DIRS[gender])
+
+
+def target_dir(gender):
+    return os.path.join(settings.STATIC_ROOT, 'calibration_photos', GENDER_DIRS[gender])
+
+
+def manifest_path(extension='json'):
+    """Manifest of the calibration photos copied into STATIC_ROOT."""
+    return os.path.join(settings.STATIC_ROOT, 'calibration_photos', f'manifest.{extension}')
+
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_sources():
+    """List calibration source files.
+
+    Returns:
+        tuple: (list of (photo_id, gender, path, os.stat_result), list of issue strings)
+    """
+    found, issues = [], []
+    for gender in GENDER_DIRS:
+        directory = source_dir(gender)
+        if not os.path.isdir(directory):
+            issues.append(f'Missing directory: {directory}')
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                match = PHOTO_FILENAME.match(entry.name)
+                if not match:
+                    issues.append(f'Invalid filename: {entry.path} (should be 6 digits and .jpg)')
+                    continue
+                stat = entry.stat()
+                if not stat.st_size:
+                    issues.append(f'Empty file: {entry.path}')
+                    continue
+                found.append((int(match.group(1)), gender, entry.path, stat))
+    return found, issues
+
+
+def build_manifest(sources, previous=None, workers=None):
+    """Hash source files in a thread pool and return manifest entries sorted by id.
+
+    Files whose size and mtime match their ``previous`` entry keep its hash,
+    dimensions and renditions instead of being read again.
+
+    Args:
+        sources: (photo_id, gender, path, os.stat_result) tuples from scan_sources
+        previous: Earlier manifest entries keyed by id
+        workers: Hashing threads, by default IO_WORKERS
+    """
+    previous = previous or {}
+
+    def entry(source):
+        photo_id, gender, path, stat = source
+        known = previous.get(photo_id)
+        entry = {'id': photo_id, 'gender': gender, 'size': stat.st_size, 'mtime': stat.st_mtime}
+        if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime and known.get('width'):
+            return {**known, **entry}
+        try:
+            with Image.open(path) as img:
+                # Only the header is parsed
+                width, height = img.size
+        except (OSError, Image.DecompressionBombError):
+            width = height = None
+        return {**entry, 'sha256': hash_file(path), 'width': width, 'height': height, 'renditions': None}
+
+    with ThreadPoolExecutor(max_workers=workers or IO_WORKERS) as pool:
+        return sorted(pool.map(entry, sources), key=lambda item: item['id'])
+
+
+def read_manifest(path=None):
+    """Load a JSON or CSV manifest as entries keyed by photo id; empty if missing."""
+    path = path or manifest_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            entries = [
+                {
+                    'id': int(row['id']),
+                    'gender': row['gender'],
+                    'sha256': row['sha256'],
+                    'size': int(row['size']),
+                    'mtime': float(row['mtime']),
+                    'width': int(row['width']) if row.get('width') else None,
+                    'height': int(row['height']) if row.get('height') else None,
+                    'renditions': int(row['renditions']) if row.get('renditions') else None,
+                }
+                for row in csv.DictReader(f)
+            ]
+        else:
+            entries = json.load(f)['photos']
+    return {item['id']: item for item in entries}
+
+
+def write_manifest(entries, path=None):
+    """Atomically write manifest entries as JSON, or CSV when ``path`` ends in .csv."""
+    path = path or manifest_path()
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            if path.endswith('.csv'):
+                writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+                writer.writeheader()
+                writer.writerows(entries)
+            else:
+                json.dump({'version': 1, 'photos': list(entries)}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def rendition_jobs(entry):
+    """Output paths of every responsive rendition of a manifest entry, for renditions.render_responsive."""
+    name = os.path.join('calibration_photos', GENDER_DIRS[entry['gender']], f"{entry['id']:06d}.jpg")
+    outputs = {}
+    for width in responsive_widths(entry['width']):
+        for extension in RESPONSIVE_FORMATS:
+            rendition = responsive_name(name, width, extension, entry['width'])
+            if rendition != name:
+                outputs[(width, extension)] = os.path.join(settings.STATIC_ROOT, rendition)
+    return {'source': os.path.join(settings.STATIC_ROOT, name), 'outputs': outputs}
+
+
+def _rendered_widths():
+    return {
+        photo_id: entry['width']
+        for photo_id, entry in read_manifest().items()
+        if entry.get('renditions') == RESPONSIVE_VERSION
+    }
+
+
+def srcsets(image_url, photo_id):
+    """``srcset`` values for a calibration photo URL by content type, preferred format first.
+
+    Empty when its renditions have not been built, so clients fall back to ``image_url``.
+    """
+    width = calibration_cache.get_or_set('rendered_widths', _rendered_widths).get(photo_id)
+    if not width:
+        return {}
+    return {
+        content_type: ', '.join(
+            f'{responsive_name(image_url, candidate, extension, width)} {candidate}w'
+            for candidate in responsive_widths(width)
+        )
+        for extension, (_, _, content_type) in RESPONSIVE_FORMATS.items()
+    }
@@ -0,0 +1,79 @@
+# backend/core/conditional.py
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .models import Match
+
+
+def make_etag(request, *parts):
+    """Build an opaque ETag from version parts, scoped to the requested URL."""
+    raw = ':'.join(str(part) for part in (request.get_full_path(), *parts))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def conditional_get(state_func):
+    """Answer GET/HEAD with 304 Not Modified while the client's copy is current.
+
+    ``state_func(view, request)`` returns an ``(etag, last_modified)`` pair. It
+    must only read version counters, never serialize, so a matching
+    ``If-None-Match`` or ``If-Modified-Since`` is answered before the wrapped
+    handler does any serializer work.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def inner(view, request, *args, **kwargs):
+            etag, last_modified = state_func(view, request)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = handler(view, request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+                if timestamp is not None:
+                    response.headers.setdefault('Last-Modified', http_date(timestamp))
+                # Payloads are per-user: let clients keep them, but always revalidate
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ('Authorization',))
+            return response
+        return inner
+    return decorator
+
+
+def user_state(view, request):
+    """Validators for resources derived from the requesting user's own rows."""
+    user = request.user
+    etag = make_etag(request, view.__class__.__name__, user.pk, user.data_version, user.data_updated_at.timestamp())
+    return etag, user.data_updated_at
+
+
+def match_state(view, request):
+    """Validators for the match list, including changes to matched users' profiles.
+
+    Everything is read in one aggregate query, so this works with token-only
+    users that carry no version fields of their own.
+    """
+    user_id = request.user.id
+    stats = Match.objects.filter(user_id=user_id).aggregate(
+        count=Count('id'),
+        version=Max('user__data_version'),
+        user_updated_at=Max('user__data_updated_at'),
+        updated_at=Max('updated_at'),
+        peers_updated_at=Max('matched_user__data_updated_at'),
+    )
+    timestamps = [
+        ts for ts in (stats['user_updated_at'], stats['updated_at'], stats['peers_updated_at']) if ts is not None
+    ]
+    last_modified = max(timestamps) if timestamps else None
+    etag = make_etag(
+        request, view.__class__.__name__, user_id, stats['version'], stats['count'],
+        last_modified.timestamp() if last_modified else None
+    )
+    return etag, last_modified
@@ -0,0 +1,93 @@
+# backend/core/geocoding.py
+
+import hashlib
+
+import requests
+
+from .async_http import get_async_client
+from .caching import geocode_cache
+
+NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+NOMINATIM_HEADERS = {
+    'User-Agent': 'NoSwipe Dating App/1.0'
+}
+NOMINATIM_TIMEOUT = 10  # seconds
+
+
+def build_params(query):
+    """Nominatim query parameters for a city search."""
+    return {
+        'q': query,
+        'format': 'json',
+        'addressdetails': 1,
+        'limit': 5,
+        'featuretype': 'city'  # Prioritize city results
+    }
+
+
+def format_results(results):
+    """Reduce raw Nominatim results to the city records the clients use."""
+    formatted_results = []
+    for result in results:
+        address = result.get('address', {})
+
+        # Extract city name with fallbacks
+        city = (
+            address.get('city') or
+            address.get('town') or
+            address.get('village') or
+            address.get('municipality')
+        )
+
+        # Only include results that have a city
+        if not city:
+            continue
+
+        formatted_results.append({
+            'id': result['place_id'],
+            'type': 'city',
+            'city': city,
+            'region': address.get('state') or address.get('region'),
+            'country': address.get('country'),
+            'latitude': float(result['lat']),
+            'longitude': float(result['lon']),
+            'display_name': f"{city}, {address.get('country', '')}"
+        })
+    return formatted_results
+
+
+def cache_key(query):
+    """Cache key for a query, insensitive to case and surrounding whitespace."""
+    return hashlib.md5(query.strip().lower().encode()).hexdigest()
+
+
+def search_locations(query):
+    """Search cities matching ``query``, answering repeats from the geocode cache.
+
+    Raises:
+        requests.RequestException: If Nominatim can't be reached or errors
+    """
+    def fetch():
+        response = requests.get(
+            NOMINATIM_URL, params=build_params(query), headers=NOMINATIM_HEADERS, timeout=NOMINATIM_TIMEOUT
+        )
+        response.raise_for_status()
+        return format_results(response.json())
+
+    return geocode_cache.get_or_set(cache_key(query), fetch)
+
+
+async def asearch_locations(query):
+    """Async search_locations over the worker's pooled HTTP client.
+
+    Raises:
+        httpx.HTTPError: If Nominatim can't be reached or errors
+    """
+    async def fetch():
+        response = await get_async_client().get(
+            NOMINATIM_URL, params=build_params(query), headers=NOMINATIM_HEADERS, timeout=NOMINATIM_TIMEOUT
+        )
+        response.raise_for_status()
+        return format_results(response.json())
+
+    return await geocode_cache.aget_or_set(cache_key(query), fetch)
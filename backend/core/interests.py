@@ -0,0 +1,114 @@
+# backend/core/interests.py
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Interest, ProfileInterest
+
+# Profile field -> ProfileInterest.kind
+KINDS = {'likes': 'L', 'dislikes': 'D'}
+MAX_NAME_LENGTH = Interest._meta.get_field('name').max_length
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def normalize_names(names):
+    """Collapse whitespace in interest names and drop blanks and duplicates, keeping their order."""
+    names = (' '.join(name.split()) for name in names)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def interest_ids(names):
+    """Map interest names to Interest ids, creating the ones not seen before."""
+    Interest.objects.bulk_create([Interest(name=name, category='') for name in names], ignore_conflicts=True)
+    return dict(Interest.objects.filter(name__in=names).values_list('name', 'id'))
+
+
+def set_profile_interests(user, likes=None, dislikes=None):
+    """Replace a user's liked and/or disliked interests.
+
+    A list left as None keeps its current names, minus any that moved to the
+    other list. The user's likes and dislikes name lists are updated to
+    match but not saved; call this in the transaction that saves the user.
+
+    Args:
+        user: User whose profile is being edited
+        likes (list, optional): Interest names the user likes
+        dislikes (list, optional): Interest names the user dislikes
+
+    Raises:
+        ValueError: If a name is both liked and disliked
+    """
+    likes = normalize_names(likes) if likes is not None else None
+    dislikes = normalize_names(dislikes) if dislikes is not None else None
+    if likes is not None and dislikes is not None and set(likes) & set(dislikes):
+        raise ValueError('An interest cannot be both liked and disliked.')
+    if likes is None:
+        likes = [name for name in user.likes if name not in dislikes]
+    if dislikes is None:
+        dislikes = [name for name in user.dislikes if name not in likes]
+
+    ids = interest_ids(likes + dislikes)
+    rows = [ProfileInterest(user=user, interest_id=ids[name], kind='L') for name in likes]
+    rows += [ProfileInterest(user=user, interest_id=ids[name], kind='D') for name in dislikes]
+    with transaction.atomic():
+        ProfileInterest.objects.filter(user=user).exclude(interest_id__in=ids.values()).delete()
+        ProfileInterest.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['user', 'interest'], update_fields=['kind']
+        )
+    user.likes, user.dislikes = likes, dislikes
+
+
+def users_sharing_interests(user, min_shared=1, kind='L'):
+    """Users who listed at least min_shared of the same interests as the user, most shared first.
+
+    Only the inverted index entries of the user's own interests are read, so
+    the cost follows how popular those interests are, not how many users
+    there are.
+
+    Returns:
+        QuerySet: Dicts of {'user': user id, 'shared': number of shared interests}
+    """
+    own = ProfileInterest.objects.filter(user=user, kind=kind).values('interest_id')
+    return ProfileInterest.objects.filter(kind=kind, interest_id__in=own).exclude(user=user).values(
+        'user'
+    ).annotate(shared=Count('interest')).filter(shared__gte=min_shared).order_by('-shared', 'user')
+
+
+class InterestIndex:
+    """In-memory inverted index from interest id to the sorted ids of the users who listed it.
+
+    For scoring many users at once without a query per user: counting shared
+    interests is a concatenation of postings lists and one np.unique.
+    """
+
+    def __init__(self, postings):
+        self.postings = postings
+
+    @classmethod
+    def build(cls, kind='L'):
+        pairs = ProfileInterest.objects.filter(kind=kind).order_by('interest_id', 'user_id')
+        rows = np.array(list(pairs.values_list('interest_id', 'user_id')), dtype=np.int64).reshape(-1, 2)
+        interests, starts = np.unique(rows[:, 0], return_index=True)
+        return cls(dict(zip(interests.tolist(), np.split(rows[:, 1], starts[1:]))))
+
+    def users(self, interest_id):
+        return self.postings.get(interest_id, EMPTY)
+
+    def shared_counts(self, interest_ids, min_shared=1):
+        """Count how many of the given interests each user listed.
+
+        Returns:
+            tuple: (user ids, counts), both sorted by user id
+        """
+        postings = [self.postings[interest_id] for interest_id in interest_ids if interest_id in self.postings]
+        if not postings:
+            return EMPTY, EMPTY
+        users, counts = np.unique(np.concatenate(postings), return_counts=True)
+        keep = counts >= min_shared
+        return users[keep], counts[keep]
+
+    @staticmethod
+    def overlap(a, b):
+        """Ids in both of two sorted, duplicate-free id arrays."""
+        return np.intersect1d(a, b, assume_unique=True)
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from core import geocoding
+from core.models import User
+
+# One Nominatim-shaped result, so the views do their usual formatting work
+UPSTREAM_BODY = json.dumps([{
+    'place_id': 1,
+    'lat': '45.4642',
+    'lon': '9.1900',
+    'address': {'city': 'Milan', 'state': 'Lombardy', 'country': 'Italy'},
+}]).encode()
+
+
+def make_upstream_handler(latency):
+    class SlowUpstream(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(UPSTREAM_BODY)))
+            self.end_headers()
+            self.wfile.write(UPSTREAM_BODY)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SlowUpstream
+
+
+class UpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for every in-flight connection, otherwise the listen backlog is the bottleneck
+    request_queue_size = 1024
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Compare sync and async location search throughput against a slow local upstream'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=400,
+            help='Requests per scenario',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=200,
+            help='Simulated upstream latency in milliseconds',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Concurrent sync workers, like gunicorn sync workers times threads',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=400,
+            help='Requests in flight on the single async event loop',
+        )
+
+    def report(self, name, latencies, elapsed):
+        self.stdout.write(
+            f'{name:<34} {len(latencies) / elapsed:8.1f} req/s '
+            f'p50 {percentile(latencies, 0.5) * 1000:7.1f} ms '
+            f'p99 {percentile(latencies, 0.99) * 1000:7.1f} ms'
+        )
+
+    def run_sync(self, token, count, workers):
+        """Drive the sync view from a fixed pool of threads, each one a blocked worker."""
+        url = reverse('location-search-sync')
+        client = Client()
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def call(i):
+            start = time.perf_counter()
+            response = client.get(url, {'query': f'sync {i}'}, headers=headers, secure=True)
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            latencies = list(pool.map(call, range(count)))
+        self.report(f'sync ({workers} workers)', latencies, time.perf_counter() - start)
+
+    async def run_async(self, token, count, concurrency):
+        """Drive the async view from one event loop, as a single uvicorn worker would."""
+        url = reverse('location-search')
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {token}'}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(i):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, {'query': f'async {i}'}, headers=headers, secure=True)
+                assert response.status_code == 200, response.content
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(call(i) for i in range(count)))
+        self.report(f'async (1 worker, {concurrency} in flight)', latencies, time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        server = UpstreamServer(('127.0.0.1', 0), make_upstream_handler(options['latency'] / 1000))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        original_url = geocoding.NOMINATIM_URL
+        geocoding.NOMINATIM_URL = f'http://127.0.0.1:{server.server_port}/search'
+
+        # Tokens are verified statelessly, so the benchmark user never has to exist
+        token = AccessToken.for_user(User(id=1))
+        # Every query is unique and the cache is private, so each request reaches the upstream
+        test_settings = override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        )
+        try:
+            with test_settings:
+                self.stdout.write(
+                    f"{options['requests']} location searches per scenario, "
+                    f"{options['latency']:.0f} ms upstream latency"
+                )
+                self.run_sync(token, options['requests'], options['workers'])
+                asyncio.run(self.run_async(token, options['requests'], options['concurrency']))
+        finally:
+            geocoding.NOMINATIM_URL = original_url
+            server.shutdown()
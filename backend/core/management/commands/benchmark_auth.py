@@ -0,0 +1,108 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from core.models import User
+
+BENCH_EMAIL = 'benchmark-login@example.com'
+BENCH_PASSWORD = 'benchmark-password-123'
+
+
+def hash_batch(algorithm, count):
+    """Encode the benchmark password ``count`` times and return the elapsed seconds."""
+    hasher = get_hasher(algorithm)
+    salt = hasher.salt()
+    start = time.perf_counter()
+    for _ in range(count):
+        hasher.encode(BENCH_PASSWORD, salt)
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput through the configured authentication backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Login attempts per scenario',
+        )
+        parser.add_argument(
+            '--hashers',
+            action='store_true',
+            help='Also report hashes per second per core for each configured password hasher',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Processes used for the multi-core hasher measurement',
+        )
+
+    def run_scenario(self, name, email, password, iterations):
+        """Time repeated authenticate() calls and report latency, throughput and queries."""
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                authenticate(email=email, password=password)
+            elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f'{name:<16} {elapsed / iterations * 1000:8.2f} ms/login '
+            f'{iterations / elapsed:8.1f} logins/s '
+            f'{len(queries) / iterations:5.1f} queries/login'
+        )
+        return elapsed / iterations
+
+    def benchmark_hashers(self, iterations, workers):
+        """Report single-core and all-core hashing throughput to size the auth tier."""
+        self.stdout.write(f'\nHasher throughput ({workers} workers, {iterations} hashes per worker):')
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            # Start every worker up front so process startup isn't timed
+            list(pool.map(hash_batch, ['default'] * workers, [0] * workers))
+            for hasher in get_hashers():
+                try:
+                    if hasher.library:
+                        hasher._load_library()
+                except ValueError:
+                    self.stdout.write(f'{hasher.algorithm:<16} skipped, {hasher.library} is not installed')
+                    continue
+                single = iterations / hash_batch(hasher.algorithm, iterations)
+                # Wall clock across all workers, so per-core figures include contention
+                start = time.perf_counter()
+                list(pool.map(hash_batch, [hasher.algorithm] * workers, [iterations] * workers))
+                total = workers * iterations / (time.perf_counter() - start)
+                self.stdout.write(
+                    f'{hasher.algorithm:<16} {single:8.1f} hashes/s single core '
+                    f'{total:8.1f} hashes/s total {total / workers:8.1f} hashes/s per core'
+                )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Everything runs in a transaction that is rolled back, so no benchmark user is left behind
+        with transaction.atomic():
+            User.objects.create_user(email=BENCH_EMAIL, password=BENCH_PASSWORD)
+
+            self.stdout.write(f'Authenticating {iterations} times per scenario...')
+            success = self.run_scenario('success', BENCH_EMAIL, BENCH_PASSWORD, iterations)
+            self.run_scenario('mixed case', BENCH_EMAIL.upper(), BENCH_PASSWORD, iterations)
+            wrong = self.run_scenario('wrong password', BENCH_EMAIL, 'not-the-password', iterations)
+            unknown = self.run_scenario('unknown email', 'nobody@example.com', BENCH_PASSWORD, iterations)
+
+            # A miss should cost about as much as a hit, otherwise timing reveals which emails exist
+            self.stdout.write(
+                f'Unknown/wrong-password timing ratio: {unknown / wrong:.2f} '
+                f'(success: {success / wrong:.2f})'
+            )
+            transaction.set_rollback(True)
+
+        if options['hashers']:
+            self.benchmark_hashers(iterations, options['workers'])
@@ -0,0 +1,92 @@
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.ai.backbones import RUNTIMES, load_backbone
+from core.ai.encoders import runtime_names
+
+
+def run_runtime(runtime, name, batch_sizes, iterations, threads):
+    """Load one backbone runtime in this fresh process and time it.
+
+    Returns:
+        tuple: ({batch size: images per second}, RSS growth in MiB, embeddings of a fixed batch)
+    """
+    settings.BACKBONE_THREADS = threads
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    embed = load_backbone(name, runtime)
+
+    throughput = {}
+    for batch_size in batch_sizes:
+        pixels = np.random.default_rng(batch_size).integers(0, 256, (batch_size, 224, 224, 3), dtype='uint8')
+        embed(pixels)  # Warm up and size the graph for this batch
+        start = time.perf_counter()
+        for _ in range(iterations):
+            embed(pixels)
+        throughput[batch_size] = batch_size * iterations / (time.perf_counter() - start)
+
+    reference = np.random.default_rng(0).integers(0, 256, (8, 224, 224, 3), dtype='uint8')
+    embeddings = embed(reference)
+    # ru_maxrss is in KiB on Linux
+    rss = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+    return throughput, rss, embeddings
+
+
+class Command(BaseCommand):
+    help = 'Compare backbone runtimes: throughput, memory and embedding parity with the float model'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backbones',
+            default='mobilenet_v2',
+            help='Comma-separated backbones to measure',
+        )
+        parser.add_argument(
+            '--batch-sizes',
+            default='1,16',
+            help='Comma-separated batch sizes',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='Timed batches per batch size',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.BACKBONE_THREADS,
+            help='Interpreter threads for the tflite runtime',
+        )
+
+    def handle(self, *args, **options):
+        batch_sizes = [int(size) for size in options['batch_sizes'].split(',')]
+        context = multiprocessing.get_context('spawn')
+
+        for name in options['backbones'].split(','):
+            if name not in runtime_names():
+                self.stderr.write(f'Unknown backbone: {name}')
+                continue
+            self.stdout.write(f'\n{name}:')
+            results = {}
+            for runtime in RUNTIMES:
+                # Each runtime gets a fresh process, so its memory is measured on its own
+                with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=django.setup) as pool:
+                    results[runtime] = pool.submit(
+                        run_runtime, runtime, name, batch_sizes, options['iterations'], options['threads']
+                    ).result()
+
+            float_embeddings = results['keras'][2]
+            for runtime, (throughput, rss, embeddings) in results.items():
+                cosine = np.sum(embeddings * float_embeddings, axis=1) / (
+                    np.linalg.norm(embeddings, axis=1) * np.linalg.norm(float_embeddings, axis=1)
+                )
+                speed = ' '.join(f'batch {size}: {rate:7.1f} img/s' for size, rate in throughput.items())
+                self.stdout.write(
+                    f'  {runtime:<7} {speed}  +{rss:6.0f} MiB RSS  min cosine vs keras {cosine.min():.4f}'
+                )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.ai.backbones import export_tflite
+from core.ai.encoders import backbone_names, runtime_names
+
+
+class Command(BaseCommand):
+    help = 'Export the CNN backbones to INT8-quantized TFLite files for BACKBONE_RUNTIME=tflite'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backbones',
+            default=','.join(backbone_names()),
+            help='Comma-separated backbones to export',
+        )
+
+    def handle(self, *args, **options):
+        backbones = [name for name in options['backbones'].split(',') if name]
+        unknown = set(backbones) - runtime_names()
+        if unknown:
+            raise CommandError(f"Unknown backbones: {', '.join(sorted(unknown))}")
+
+        for name in backbones:
+            path = export_tflite(name)
+            self.stdout.write(self.style.SUCCESS(f'{name}: {path} ({path.stat().st_size / 2**20:.1f} MiB)'))
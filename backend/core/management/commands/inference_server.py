@@ -0,0 +1,57 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.ai.encoders import backbone_names, runtime_names
+from core.ai.inference import InferenceServer
+
+
+class Command(BaseCommand):
+    help = 'Serve CNN photo embeddings to every web worker on this host over a Unix socket'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--socket',
+            default=settings.INFERENCE_SOCKET or '/tmp/noswipe-inference.sock',
+            help='Unix socket to listen on; point INFERENCE_SOCKET at the same path',
+        )
+        parser.add_argument(
+            '--backbones',
+            default=','.join(backbone_names()),
+            help='Comma-separated backbones to load',
+        )
+        parser.add_argument(
+            '--max-batch-size',
+            type=int,
+            default=settings.INFERENCE_MAX_BATCH_SIZE,
+            help='Most images per forward pass',
+        )
+        parser.add_argument(
+            '--max-wait-ms',
+            type=float,
+            default=settings.INFERENCE_MAX_WAIT_MS,
+            help='How long a request may wait for others to join its batch',
+        )
+
+    def handle(self, *args, **options):
+        backbones = [name for name in options['backbones'].split(',') if name]
+        unknown = set(backbones) - runtime_names()
+        if unknown:
+            raise CommandError(f"Unknown backbones: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(f"Loading {', '.join(backbones)}...")
+        server = InferenceServer(
+            options['socket'],
+            backbones,
+            max_batch_size=options['max_batch_size'],
+            max_wait=options['max_wait_ms'] / 1000,
+        )
+        # Treat SIGTERM like Ctrl-C so the socket file is removed on a clean stop
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        self.stdout.write(self.style.SUCCESS(f"Serving embeddings on {options['socket']}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -1,156 +1,173 @@
 import os
-import re
 import shutil
-import filecmp
+from concurrent.futures import ThreadPoolExecutor
+
 from django.core.management.base import BaseCommand
-from django.core.cache import cache
-from django.conf import settings
-from core.models import Photo
+from core import calibration
+from core.caching import calibration_cache
+from core.models import Photo, PhotoEmbedding
+from core.renditions import RESPONSIVE_VERSION, render_responsive, run_jobs
+
 
 class Command(BaseCommand):
-    help = 'Load and validate calibration photos into the database'
+    help = (
+        'Load and validate calibration photos into the database and build their responsive renditions. '
+        'Idempotent: only files whose content changed since the last run are copied and rendered, '
+        'and only new or changed photos are embedded.'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Force reload all photos',
+            help='Rehash and recopy every photo, ignoring the previous manifest',
+        )
+        parser.add_argument(
+            '--manifest',
+            help='Manifest to compare against and rewrite, by default STATIC_ROOT/calibration_photos/manifest.json; '
+                 'written as CSV if the path ends in .csv',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Threads used to hash and copy files',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count(),
+            help='Worker processes used to build responsive renditions',
+        )
+        parser.add_argument(
+            '--skip-renditions',
+            action='store_true',
+            help='Do not build responsive sizes and WebP variants; clients then only get the original',
+        )
+        parser.add_argument(
+            '--skip-embeddings',
+            action='store_true',
+            help='Do not compute embeddings for new or changed photos (reembed_photos can do it later)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=64,
+            help='Photos embedded per request to the backbone',
         )
 
-    def validate_photo_filename(self, filename):
-        """Validate photo filename matches the 6-digit format."""
-        if not filename.endswith('.jpg'):
-            return False
-        basename = os.path.splitext(filename)[0]
-        return bool(re.match(r'^\d{6}$', basename))
-
-    def process_directory(self, directory, gender):
-        """Process photos in a directory and report issues."""
-        valid_photos = []
-        issues = []
-        
-        if not os.path.exists(directory):
-            self.stdout.write(self.style.ERROR(f'{gender} directory not found at: {directory}'))
-            return [], [f'Missing directory: {directory}']
-
-        self.stdout.write(f'Scanning directory: {directory}')
-        
-        for filename in os.listdir(directory):
-            if filename.startswith('.'):
-                self.stdout.write(f'Skipping hidden file: {filename}')
-                continue
-
-            if not filename.endswith('.jpg'):
-                issues.append(f'Invalid file type: {filename}')
-                continue
-
-            if not self.validate_photo_filename(filename):
-                issues.append(f'Invalid filename format: {filename} (should be 6 digits)')
-                continue
-
-            file_path = os.path.join(directory, filename)
-            if not os.path.getsize(file_path):
-                issues.append(f'Empty file: {filename}')
-                continue
-
-            self.stdout.write(f'Found valid photo: {filename}')
-            valid_photos.append(filename)
+    def needs_copy(self, entry, previous, force):
+        target = os.path.join(calibration.target_dir(entry['gender']), f"{entry['id']:06d}.jpg")
+        if force or previous is None or previous['sha256'] != entry['sha256'] or previous['gender'] != entry['gender']:
+            return True
+        try:
+            return os.path.getsize(target) != entry['size']
+        except OSError:
+            return True
+
+    def copy_files(self, entries, workers):
+        for gender in calibration.GENDER_DIRS:
+            os.makedirs(calibration.target_dir(gender), exist_ok=True)
+
+        def copy(entry):
+            filename = f"{entry['id']:06d}.jpg"
+            shutil.copy2(
+                os.path.join(calibration.source_dir(entry['gender']), filename),
+                os.path.join(calibration.target_dir(entry['gender']), filename),
+            )
 
-        self.stdout.write(f'Found {len(valid_photos)} valid photos in {directory}')
-        return valid_photos, issues
+        with ThreadPoolExecutor(max_workers=workers or calibration.IO_WORKERS) as pool:
+            list(pool.map(copy, entries))
+
+    def render(self, entries, processes):
+        """Build responsive renditions and record which entries have them."""
+        jobs = [calibration.rendition_jobs(entry) for entry in entries]
+        failed = 0
+        for entry, result in zip(entries, run_jobs(render_responsive, jobs, processes)):
+            if 'error' in result:
+                self.stdout.write(self.style.WARNING(f"  {result['source']}: {result['error']}"))
+                entry['renditions'] = None
+                failed += 1
+            else:
+                entry['renditions'] = RESPONSIVE_VERSION
+        return len(entries) - failed
+
+    def embed(self, photo_ids, batch_size):
+        from core.ai.embeddings import get_photo_embeddings
+
+        embedded = 0
+        for start in range(0, len(photo_ids), batch_size):
+            _, valid = get_photo_embeddings(Photo.objects.filter(id__in=photo_ids[start:start + batch_size]))
+            embedded += len(valid)
+        return embedded
 
     def handle(self, *args, **options):
-        force_reload = options['force']
-        
-        # Clear cache if force reload
-        if force_reload:
-            cache.delete('calibration_photos_m')
-            cache.delete('calibration_photos_f')
-            self.stdout.write('Cleared photo cache')
-            
-            # Clean up old records
-            Photo.objects.filter(image__isnull=True).delete()
-            self.stdout.write('Cleaned up old photo records')
-
-        # Source directories
-        source_male = os.path.join(settings.BASE_DIR, 'static', 'calibration_photos', 'male')
-        source_female = os.path.join(settings.BASE_DIR, 'static', 'calibration_photos', 'female')
-
-        # Target directories in staticfiles
-        target_male = os.path.join(settings.STATIC_ROOT, 'calibration_photos', 'male')
-        target_female = os.path.join(settings.STATIC_ROOT, 'calibration_photos', 'female')
-
-        # Create target directories if they don't exist
-        os.makedirs(target_male, exist_ok=True)
-        os.makedirs(target_female, exist_ok=True)
-
-        # Process male photos
-        self.stdout.write('Processing male photos...')
-        male_photos, male_issues = self.process_directory(source_male, 'Male')
-        
-        # Process female photos
-        self.stdout.write('Processing female photos...')
-        female_photos, female_issues = self.process_directory(source_female, 'Female')
-
-        # Report issues
-        all_issues = male_issues + female_issues
-        if all_issues:
+        force = options['force']
+        manifest = options['manifest'] or calibration.manifest_path()
+        previous = {} if force else calibration.read_manifest(manifest)
+
+        sources, issues = calibration.scan_sources()
+        if issues:
             self.stdout.write(self.style.WARNING('Issues found:'))
-            for issue in all_issues:
+            for issue in issues:
                 self.stdout.write(f'  - {issue}')
 
-        # Process male photos
-        for filename in male_photos:
-            if filename.startswith('.'):
+        # An id can only be upserted once per statement
+        by_id = {}
+        for source in sources:
+            if source[0] in by_id:
+                self.stdout.write(self.style.WARNING(f'Skipping {source[2]}: id already used by {by_id[source[0]][2]}'))
                 continue
-                
-            source = os.path.join(source_male, filename)
-            target = os.path.join(target_male, filename)
-            
-            # Copy file if it doesn't exist or is different
-            if not os.path.exists(target) or not filecmp.cmp(source, target, shallow=False):
-                shutil.copy2(source, target)
-                self.stdout.write(f'Copied {filename} to staticfiles')
-            
-            # Create or update database record
-            photo_id = int(os.path.splitext(filename)[0])
-            Photo.objects.update_or_create(
-                id=photo_id,
-                defaults={
-                    'gender': 'M',
-                    'image': None
-                }
-            )
-            self.stdout.write(f'Created/updated database record for {filename}')
-
-        # Process female photos
-        for filename in female_photos:
-            if filename.startswith('.'):
-                continue
-                
-            source = os.path.join(source_female, filename)
-            target = os.path.join(target_female, filename)
-            
-            # Copy file if it doesn't exist or is different
-            if not os.path.exists(target) or not filecmp.cmp(source, target, shallow=False):
-                shutil.copy2(source, target)
-                self.stdout.write(f'Copied {filename} to staticfiles')
-            
-            # Create or update database record
-            photo_id = int(os.path.splitext(filename)[0])
-            Photo.objects.update_or_create(
-                id=photo_id,
-                defaults={
-                    'gender': 'F',
-                    'image': None
-                }
-            )
-            self.stdout.write(f'Created/updated database record for {filename}')
-
-        # Report results
-        male_count = Photo.objects.filter(gender='M', image__isnull=True).count()
-        female_count = Photo.objects.filter(gender='F', image__isnull=True).count()
-        
-        self.stdout.write(self.style.SUCCESS(f'Successfully processed:'))
-        self.stdout.write(f'  - {male_count} male photos')
-        self.stdout.write(f'  - {female_count} female photos') 
\ No newline at end of file
+            by_id[source[0]] = source
+
+        entries = calibration.build_manifest(by_id.values(), previous, options['workers'])
+        for entry in entries:
+            if not entry['width']:
+                self.stdout.write(self.style.WARNING(f"Unreadable image: {entry['id']:06d}.jpg"))
+
+        to_copy = [entry for entry in entries if self.needs_copy(entry, previous.get(entry['id']), force)]
+        self.copy_files(to_copy, options['workers'])
+
+        rendered = 0
+        if not options['skip_renditions']:
+            copied = {entry['id'] for entry in to_copy}
+            to_render = [
+                entry for entry in entries
+                if entry['width'] and (entry['id'] in copied or entry['renditions'] != RESPONSIVE_VERSION)
+            ]
+            rendered = self.render(to_render, options['processes'])
+
+        ids = [entry['id'] for entry in entries]
+        existing = set(Photo.objects.filter(id__in=ids).values_list('id', flat=True))
+        new_ids = [photo_id for photo_id in ids if photo_id not in existing]
+        changed_ids = [
+            entry['id'] for entry in entries
+            if entry['id'] in previous and previous[entry['id']]['sha256'] != entry['sha256']
+        ]
+
+        Photo.objects.bulk_create(
+            [Photo(id=entry['id'], gender=entry['gender'], image=None) for entry in entries],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['id'],
+            update_fields=['gender', 'image'],
+        )
+        calibration.write_manifest(entries, manifest)
+
+        if to_copy or new_ids or rendered or force:
+            calibration_cache.delete('m')
+            calibration_cache.delete('f')
+            calibration_cache.delete('rendered_widths')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(entries)} photos: {len(new_ids)} new, {len(changed_ids)} changed, {len(to_copy)} copied, '
+            f'{rendered} rendered'
+        ))
+
+        if changed_ids:
+            # Their stored vectors describe the old image
+            PhotoEmbedding.objects.filter(photo_id__in=changed_ids).delete()
+        to_embed = sorted(set(new_ids) | set(changed_ids))
+        if to_embed and not options['skip_embeddings']:
+            embedded = self.embed(to_embed, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Embedded {embedded} of {len(to_embed)} new or changed photos'))
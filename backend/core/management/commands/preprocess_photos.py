@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.renditions import RAW_EXTENSIONS, process_photo, run_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Render raw photos into every size we serve or embed (800px display, 160px thumbnail, '
+        '224px model input) in one decode per photo, fanned out over a process pool. '
+        'Inputs whose content is unchanged since the last run are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input',
+            default=os.path.join(settings.BASE_DIR.parent, 'raw_photos'),
+            help='Directory with one subdirectory of raw photos per gender (male, female)',
+        )
+        parser.add_argument(
+            '--state',
+            default=os.path.join(settings.BASE_DIR, 'cache', 'preprocess_photos.json'),
+            help='Where input hashes from the previous run are kept',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Worker processes; 1 renders in this process',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Render every input even if unchanged',
+        )
+
+    def outputs(self, gender_dir, stem):
+        static_dir = os.path.join(settings.BASE_DIR, 'static', 'calibration_photos')
+        return {
+            # The display rendition is the calibration source load_calibration_photos picks up
+            'display': os.path.join(static_dir, gender_dir, f'{stem}.jpg'),
+            'thumbnail': os.path.join(static_dir, 'thumbnails', gender_dir, f'{stem}.jpg'),
+            'model': os.path.join(settings.BASE_DIR, 'model_inputs', gender_dir, f'{stem}.jpg'),
+        }
+
+    def find_inputs(self, input_dir):
+        inputs = []
+        for gender_dir in ('male', 'female'):
+            directory = os.path.join(input_dir, gender_dir)
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    stem, extension = os.path.splitext(entry.name)
+                    if entry.is_file() and not entry.name.startswith('.') and extension.lower() in RAW_EXTENSIONS:
+                        inputs.append((entry.path, self.outputs(gender_dir, stem)))
+        return sorted(inputs)
+
+    def read_state(self, path):
+        try:
+            with open(path) as f:
+                return {item['input']: item for item in json.load(f)['photos']}
+        except FileNotFoundError:
+            return {}
+
+    def write_state(self, path, results):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'photos': results}, f)
+        os.replace(tmp_path, path)
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['input']):
+            raise CommandError(f"Input directory not found: {options['input']}")
+
+        previous = {} if options['force'] else self.read_state(options['state'])
+        jobs = [
+            {'input': path, 'outputs': outputs, 'previous': previous.get(path)}
+            for path, outputs in self.find_inputs(options['input'])
+        ]
+        self.stdout.write(f"Processing {len(jobs)} photos with {options['workers']} workers")
+
+        started = time.perf_counter()
+        results = run_jobs(process_photo, jobs, options['workers'])
+        elapsed = time.perf_counter() - started
+
+        failed = [result for result in results if 'error' in result]
+        done = [result for result in results if 'error' not in result]
+        rendered = sum(result['rendered'] for result in done)
+        # Failed inputs keep no state, so they are retried next time
+        self.write_state(options['state'], done)
+
+        for result in failed:
+            self.stdout.write(self.style.WARNING(f"  {result['input']}: {result['error']}"))
+        rate = f', {rendered / elapsed:.1f} photos/s' if rendered and elapsed else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {rendered}, skipped {len(done) - rendered} unchanged, failed {len(failed)} '
+            f'in {elapsed:.2f}s{rate}'
+        ))
@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from core.models import UserPhoto
+from core.uploads import process_user_photo, requeue_stalled
+
+
+class Command(BaseCommand):
+    help = (
+        'Process queued user photo uploads. Run it as a worker when PHOTO_PROCESSING=off, '
+        'or occasionally to recover uploads whose web worker died mid-processing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new uploads instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds between polls with --loop',
+        )
+        parser.add_argument(
+            '--stalled-after',
+            type=int,
+            default=10,
+            help='Minutes after which a photo still marked processing is queued again',
+        )
+
+    def drain(self):
+        processed = 0
+        while True:
+            photo_ids = list(
+                UserPhoto.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True)[:100]
+            )
+            if not photo_ids:
+                return processed
+            processed += sum(process_user_photo(photo_id) for photo_id in photo_ids)
+
+    def handle(self, *args, **options):
+        stalled_after = timedelta(minutes=options['stalled_after'])
+        while True:
+            requeued = requeue_stalled(stalled_after)
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stalled photos'))
+            processed = self.drain()
+            if processed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Processed {processed} photos'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from core.ai.interest_stats import rebuild_interest_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the population mean and variance of every interest from all UserInterest rows. '
+        'Only needed after writes that skip model signals, such as bulk_create or raw SQL.'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_interest_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {count} interests'))
@@ -0,0 +1,95 @@
+import os
+import pickle
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from core.ai.ai_models import LEGACY_ENCODER_KEY, train_user_model
+from core.ai.embeddings import get_photo_embeddings
+from core.ai.encoders import ENCODERS, get_encoder
+from core.models import Photo, PhotoEmbedding
+
+
+class Command(BaseCommand):
+    help = (
+        'Bring stored embeddings and user models up to the current encoder versions. '
+        'Safe to run in the background: scoring keeps using the old versions until replacements exist.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--encoders',
+            default=settings.PHOTO_ENCODER,
+            help='Comma-separated encoders to embed calibration photos with',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=64,
+            help='Photos embedded per request to the backbone',
+        )
+        parser.add_argument(
+            '--skip-retrain',
+            action='store_true',
+            help='Do not retrain user models tagged with another encoder than PHOTO_ENCODER',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Afterwards delete embeddings from retired encoder versions, which can then leave RETIRED_ENCODERS',
+        )
+
+    def embed_missing(self, encoder, batch_size):
+        done = PhotoEmbedding.objects.filter(encoder=encoder.name, encoder_version=encoder.version)
+        photo_ids = list(Photo.objects.exclude(id__in=done.values('photo_id')).values_list('id', flat=True))
+        self.stdout.write(f'{encoder.key}: {len(photo_ids)} photos to embed')
+
+        embedded = 0
+        for start in range(0, len(photo_ids), batch_size):
+            chunk = Photo.objects.filter(id__in=photo_ids[start:start + batch_size])
+            _, valid = get_photo_embeddings(chunk, encoder)
+            embedded += len(valid)
+            self.stdout.write(f'  {min(start + batch_size, len(photo_ids))}/{len(photo_ids)}')
+        skipped = len(photo_ids) - embedded
+        self.stdout.write(self.style.SUCCESS(
+            f'{encoder.key}: embedded {embedded}' + (f', skipped {skipped} unreadable' if skipped else '')
+        ))
+
+    def retrain_stale_models(self):
+        current = get_encoder().key
+        model_dir = os.path.join(settings.BASE_DIR, 'user_models')
+        if not os.path.isdir(model_dir):
+            return
+
+        retrained = 0
+        for filename in sorted(os.listdir(model_dir)):
+            stem, extension = os.path.splitext(filename)
+            if extension != '.pkl' or not stem.startswith('model_'):
+                continue
+            with open(os.path.join(model_dir, filename), 'rb') as f:
+                model_data = pickle.load(f)
+            encoder_key = model_data.get('encoder', LEGACY_ENCODER_KEY) if isinstance(model_data, dict) else None
+            if encoder_key != current:
+                # Training reads the embeddings stored above, so no photo is embedded twice
+                train_user_model(int(stem[len('model_'):]))
+                retrained += 1
+        self.stdout.write(self.style.SUCCESS(f'Retrained {retrained} user models on {current}'))
+
+    def handle(self, *args, **options):
+        names = [name for name in options['encoders'].split(',') if name]
+        unknown = set(names) - set(ENCODERS)
+        if unknown:
+            raise CommandError(f"Unknown encoders: {', '.join(sorted(unknown))}")
+
+        for name in names:
+            self.embed_missing(ENCODERS[name], options['batch_size'])
+
+        if not options['skip_retrain']:
+            self.retrain_stale_models()
+
+        if options['prune']:
+            current = Q()
+            for encoder in ENCODERS.values():
+                current |= Q(encoder=encoder.name, encoder_version=encoder.version)
+            deleted, _ = PhotoEmbedding.objects.exclude(current).delete()
+            self.stdout.write(f'Pruned {deleted} embeddings from retired encoder versions')
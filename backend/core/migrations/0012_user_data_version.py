@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0011_remove_photo_image_url_photo_image_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="data_updated_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="data_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0012_user_data_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="matches_user_created_idx"
+            ),
+        ),
+    ]
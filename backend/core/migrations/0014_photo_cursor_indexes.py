@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0013_match_cursor_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="photos_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(
+                fields=["gender", "-created_at", "-id"],
+                name="photos_gender_created_idx",
+            ),
+        ),
+    ]
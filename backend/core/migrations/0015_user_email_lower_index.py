@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0014_photo_cursor_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="auth_user_email_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-19 18:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0016_throttle_counter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PhotoEmbedding",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("encoder", models.CharField(max_length=64)),
+                ("encoder_version", models.PositiveSmallIntegerField()),
+                ("vector", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "photo",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="embeddings",
+                        to="core.photo",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "photo_embeddings",
+                "indexes": [
+                    models.Index(
+                        fields=["encoder", "encoder_version"],
+                        name="photo_embedding_encoder_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("photo", "encoder", "encoder_version"),
+                        name="photo_embedding_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0017_photo_embedding"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserPhoto",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "original",
+                    models.FileField(blank=True, upload_to="user_photos/originals/"),
+                ),
+                ("image", models.ImageField(blank=True, upload_to="user_photos/")),
+                ("thumbnail", models.ImageField(blank=True, upload_to="user_photos/")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("ready", "Ready"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("error", models.CharField(blank=True, max_length=255)),
+                ("embedding", models.BinaryField(blank=True, null=True)),
+                ("encoder", models.CharField(blank=True, max_length=64)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="photos",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "user_photos",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "created_at"], name="user_photos_user_idx"
+                    ),
+                    models.Index(
+                        condition=models.Q(("status__in", ["pending", "processing"])),
+                        fields=["status", "started_at"],
+                        name="user_photos_queue_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def number_photos(apps, schema_editor):
+    # Existing photos keep their upload order, and the one already serving as
+    # a user's profile photo becomes their primary photo
+    UserPhoto = apps.get_model("core", "UserPhoto")
+    User = apps.get_model("core", "User")
+    positions = {}
+    photos = list(UserPhoto.objects.order_by("user_id", "created_at", "id"))
+    for photo in photos:
+        photo.position = positions[photo.user_id] = positions.get(photo.user_id, -1) + 1
+    UserPhoto.objects.bulk_update(photos, ["position"], batch_size=500)
+    for photo in photos:
+        if photo.image:
+            User.objects.filter(
+                pk=photo.user_id, profile_photo__endswith=photo.image.name
+            ).update(primary_photo=photo)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0018_user_photo"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="userphoto",
+            options={"ordering": ["position", "id"]},
+        ),
+        migrations.RemoveIndex(
+            model_name="userphoto",
+            name="user_photos_user_idx",
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="primary_photo",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="core.userphoto",
+            ),
+        ),
+        migrations.AddField(
+            model_name="userphoto",
+            name="position",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(number_photos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="userphoto",
+            index=models.Index(
+                fields=["user", "position"], name="user_photos_position_idx"
+            ),
+        ),
+    ]
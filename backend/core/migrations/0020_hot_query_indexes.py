@@ -0,0 +1,141 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0019_user_photo_position"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="interaction",
+            index=models.Index(
+                fields=["target", "interaction_type", "created_at"],
+                name="interactions_target_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="interaction",
+            index=models.Index(
+                fields=["user", "-created_at"], name="interactions_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["matched_user", "status"], name="matches_matched_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="photorating",
+            index=models.Index(
+                fields=["user", "created_at"], name="photo_ratings_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["gender", "birth_date"], name="auth_user_gender_birth_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="interaction",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("user", models.F("target")), _negated=True),
+                name="interactions_not_self",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("user", models.F("matched_user")), _negated=True),
+                name="matches_not_self",
+            ),
+        ),
+        # Foreign key indexes made redundant by the composite ones, dropped once those exist
+        migrations.AlterField(
+            model_name="interaction",
+            name="target",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="interactions_received",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="interaction",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="interactions_sent",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="match",
+            name="matched_user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="matches_as_matched",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="match",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="matches_as_user",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="photoembedding",
+            name="photo",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="embeddings",
+                to="core.photo",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="photorating",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="photo_ratings",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userinterest",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="interest_ratings",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="userphoto",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="photos",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_json_interests(apps, schema_editor):
+    # Same normalization as core.interests, frozen here; a name both liked
+    # and disliked stays a like
+    Interest = apps.get_model("core", "Interest")
+    ProfileInterest = apps.get_model("core", "ProfileInterest")
+    User = apps.get_model("core", "User")
+
+    def normalize(names):
+        names = (" ".join(str(name).split())[:100] for name in names or [])
+        return list(dict.fromkeys(name for name in names if name))
+
+    users = (
+        User.objects.exclude(likes=[], dislikes=[])
+        .only("likes", "dislikes")
+        .iterator(chunk_size=500)
+    )
+    for user in users:
+        likes = normalize(user.likes)
+        dislikes = [name for name in normalize(user.dislikes) if name not in likes]
+        names = likes + dislikes
+        if not names:
+            continue
+        Interest.objects.bulk_create(
+            [Interest(name=name, category="") for name in names], ignore_conflicts=True
+        )
+        ids = dict(Interest.objects.filter(name__in=names).values_list("name", "id"))
+        ProfileInterest.objects.bulk_create(
+            [
+                ProfileInterest(user=user, interest_id=ids[name], kind="L")
+                for name in likes
+            ]
+            + [
+                ProfileInterest(user=user, interest_id=ids[name], kind="D")
+                for name in dislikes
+            ]
+        )
+        User.objects.filter(pk=user.pk).update(likes=likes, dislikes=dislikes)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0020_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfileInterest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("L", "Like"), ("D", "Dislike")], max_length=1
+                    ),
+                ),
+                (
+                    "interest",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="profile_interests",
+                        to="core.interest",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="profile_interests",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "profile_interests",
+            },
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="interests",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="users",
+                through="core.ProfileInterest",
+                to="core.interest",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profileinterest",
+            index=models.Index(
+                fields=["interest", "kind", "user"],
+                name="profile_interests_inverted_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="profileinterest",
+            constraint=models.UniqueConstraint(
+                fields=("user", "interest"), name="profile_interest_unique"
+            ),
+        ),
+        migrations.RunPython(copy_json_interests, migrations.RunPython.noop),
+    ]
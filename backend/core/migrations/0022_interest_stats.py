@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-19 19:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def compute_stats(apps, schema_editor):
+    # Frozen copy of core.ai.interest_stats.rebuild_interest_stats
+    Interest = apps.get_model("core", "Interest")
+    InterestStats = apps.get_model("core", "InterestStats")
+    UserInterest = apps.get_model("core", "UserInterest")
+
+    by_interest = {pk: [] for pk in Interest.objects.values_list("id", flat=True)}
+    for interest_id, rating in UserInterest.objects.values_list(
+        "interest_id", "rating"
+    ):
+        by_interest[interest_id].append(rating)
+    rows = []
+    for interest_id, ratings in by_interest.items():
+        mean = sum(ratings) / len(ratings) if ratings else 0.0
+        m2 = sum((rating - mean) ** 2 for rating in ratings)
+        rows.append(
+            InterestStats(
+                interest_id=interest_id, count=len(ratings), mean=mean, m2=m2, version=1
+            )
+        )
+    InterestStats.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0021_profile_interests"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InterestStats",
+            fields=[
+                (
+                    "interest",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="core.interest",
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("mean", models.FloatField(default=0.0)),
+                ("m2", models.FloatField(default=0.0)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "interest_stats",
+            },
+        ),
+        migrations.RunPython(compute_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0022_interest_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="throttlecounter",
+            name="expires",
+            field=models.BigIntegerField(db_index=True, default=0),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-19 20:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0023_throttle_counter_expires"),
+    ]
+
+    operations = [
+        # Restore the foreign key indexes before dropping the composites that led with them
+        migrations.AlterField(
+            model_name="interaction",
+            name="target",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="interactions_received",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="match",
+            name="matched_user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="matches_as_matched",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="interaction",
+            name="interactions_target_type_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="interaction",
+            name="interactions_user_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="match",
+            name="matches_matched_status_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="auth_user_gender_birth_idx",
+        ),
+    ]
@@ -2,11 +2,12 @@
 
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.validators import MinValueValidator, MaxValueValidator
 import numpy as np
 from django.utils import timezone
 from datetime import date
-from django.core.cache import cache
+from .caching import calibration_cache
 import random
 import os
 
@@ -58,9 +59,22 @@ class User(AbstractUser):
     location = models.TextField(max_length=500, null=True, blank=True)
     bio = models.TextField(max_length=500, blank=True)
     profile_photo = models.URLField(max_length=255, null=True, blank=True)
+    # The UserPhoto behind profile_photo; the URL is kept on the row so cards
+    # and profiles render without a join (see uploads.sync_profile_photo)
+    primary_photo = models.ForeignKey(
+        'core.UserPhoto', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     calibration_completed = models.BooleanField(default=False)
+    # Queried through ProfileInterest; these name lists are kept in step with it
+    # by interests.set_profile_interests so profiles render without a join
     likes = models.JSONField(default=list, blank=True)
     dislikes = models.JSONField(default=list, blank=True)
+    interests = models.ManyToManyField(
+        'core.Interest', through='core.ProfileInterest', related_name='users', blank=True
+    )
+    # Bumped on every write to the user's profile, preferences or matches (see core/signals.py)
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+    data_updated_at = models.DateTimeField(default=timezone.now, editable=False)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []  # Remove username from required fields
@@ -71,6 +85,10 @@ class User(AbstractUser):
         db_table = 'auth_user'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Case-insensitive email lookups in EmailBackend.authenticate
+            models.Index(Lower('email'), name='auth_user_email_lower_idx'),
+        ]
 
     def __str__(self):
         return self.email
@@ -83,6 +101,14 @@ class User(AbstractUser):
         today = date.today()
         return today.year - self.birth_date.year - ((today.month, today.day) < (self.birth_date.month, self.birth_date.day))
 
+    @classmethod
+    def bump_data_version(cls, *user_ids):
+        """Advance the data version of the given users so their ETags stop matching."""
+        cls.objects.filter(pk__in=user_ids).update(
+            data_version=models.F('data_version') + 1,
+            data_updated_at=timezone.now()
+        )
+
 class UserPreference(models.Model):
     """User preferences for matching."""
     GENDER_CHOICES = [
@@ -119,6 +145,19 @@ class Photo(models.Model):
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, null=True, default='M')
     age = models.IntegerField(null=True, blank=True, default=25)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def calibration_url(self):
+        """Static URL of this calibration photo."""
+        gender_dir = 'male' if self.gender == 'M' else 'female'
+        return f'/static/calibration_photos/{gender_dir}/{self.id:06d}.jpg'
+
+    @property
+    def calibration_path(self):
+        """Source file of this calibration photo, as read by the encoders."""
+        from django.conf import settings
+        gender_dir = 'male' if self.gender == 'M' else 'female'
+        return os.path.join(settings.BASE_DIR, 'static', 'calibration_photos', gender_dir, f'{self.id:06d}.jpg')
     
     @classmethod
     def get_calibration_photos(cls, gender, count=10):
@@ -137,27 +176,20 @@ class Photo(models.Model):
             
             return male_photos + female_photos
             
-        cache_key = f'calibration_photos_{gender.lower()}'
-        valid_photos = cache.get(cache_key)
-        
-        if valid_photos is None:
-            # Get all photos from database
-            photos = list(cls.objects.filter(gender=gender.upper()))
-            
-            # Filter to only include photos that exist in the filesystem
+        def find_valid_photos():
+            # Only include photos whose files exist in both static directories
             gender_dir = 'male' if gender == 'M' else 'female'
             valid_photos = []
-            
-            for photo in photos:
-                photo_path = f'calibration_photos/{gender_dir}/{photo.id:06d}.jpg'
+            for photo_id in cls.objects.filter(gender=gender.upper()).values_list('id', flat=True):
+                photo_path = f'calibration_photos/{gender_dir}/{photo_id:06d}.jpg'
                 source_path = os.path.join(settings.BASE_DIR, 'static', photo_path)
                 target_path = os.path.join(settings.STATIC_ROOT, photo_path)
                 
                 if os.path.exists(source_path) and os.path.exists(target_path):
                     valid_photos.append(f'/static/{photo_path}')
-            
-            # Cache the valid photos
-            cache.set(cache_key, valid_photos, timeout=None)
+            return valid_photos
+        
+        valid_photos = calibration_cache.get_or_set(gender.lower(), find_valid_photos)
         
         # Select random photos
         return random.sample(valid_photos, min(count, len(valid_photos)))
@@ -170,23 +202,96 @@ class Photo(models.Model):
             return (cls.is_valid_calibration_photo('M', filename) or 
                    cls.is_valid_calibration_photo('F', filename))
             
-        cache_key = f'calibration_photos_{gender.lower()}'
-        valid_photos = cache.get(cache_key)
+        valid_photos = calibration_cache.get(gender.lower())
         
         if valid_photos is None:
             # If cache is empty, check database
-            gender_dir = 'male' if gender == 'M' else 'female'
-            photo_path = f'calibration_photos/{gender_dir}/{filename}'
             return cls.objects.filter(
                 gender=gender.upper(),
                 id=int(os.path.splitext(filename)[0])
             ).exists()
             
-        return filename in valid_photos
+        return any(os.path.basename(url) == filename for url in valid_photos)
 
     class Meta:
         db_table = 'photos'
         ordering = ['-created_at']
+        indexes = [
+            # Serve PhotoViewSet's cursor pagination, with and without the gender filter
+            models.Index(fields=['-created_at', '-id'], name='photos_created_idx'),
+            models.Index(fields=['gender', '-created_at', '-id'], name='photos_gender_created_idx'),
+        ]
+
+class PhotoEmbedding(models.Model):
+    """A photo's embedding under one version of one encoder (see core/ai/encoders.py).
+
+    Rows for retired encoder versions are left in place until reembed_photos
+    has written their replacements, so scoring never waits on a recompute.
+    """
+    # Leads photo_embedding_unique, so needs no index of its own
+    photo = models.ForeignKey(Photo, on_delete=models.CASCADE, related_name='embeddings', db_index=False)
+    encoder = models.CharField(max_length=64)
+    encoder_version = models.PositiveSmallIntegerField()
+    vector = models.BinaryField()  # float32, native byte order
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'photo_embeddings'
+        constraints = [
+            models.UniqueConstraint(fields=['photo', 'encoder', 'encoder_version'], name='photo_embedding_unique'),
+        ]
+        indexes = [
+            # Find what still needs embedding, or pruning, for an encoder version
+            models.Index(fields=['encoder', 'encoder_version'], name='photo_embedding_encoder_idx'),
+        ]
+
+    @property
+    def array(self):
+        return np.frombuffer(self.vector, dtype=np.float32)
+
+class UserPhoto(models.Model):
+    """A photo a user uploaded to their profile (see core/uploads.py).
+
+    The upload request only stores ``original``; a background job turns it
+    into the served renditions and an embedding, then deletes it. Photos are
+    shown in ``position`` order and the first ready one is the profile photo.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    # Leads user_photos_position_idx, so needs no index of its own
+    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='photos', db_index=False)
+    original = models.FileField(upload_to='user_photos/originals/', blank=True)
+    image = models.ImageField(upload_to='user_photos/', blank=True)
+    thumbnail = models.ImageField(upload_to='user_photos/', blank=True)
+    position = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
+    error = models.CharField(max_length=255, blank=True)
+    embedding = models.BinaryField(null=True, blank=True)  # float32, native byte order
+    encoder = models.CharField(max_length=64, blank=True)  # Encoder key of the embedding
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)  # When a worker claimed it
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'user_photos'
+        ordering = ['position', 'id']
+        indexes = [
+            # Serves every per-user listing in display order, prefetches included
+            models.Index(fields=['user', 'position'], name='user_photos_position_idx'),
+            # process_user_photos picks up queued and stalled jobs
+            models.Index(
+                fields=['status', 'started_at'], name='user_photos_queue_idx',
+                condition=models.Q(status__in=['pending', 'processing']),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Photo {self.pk} of user {self.user_id} ({self.status})"
 
 class Interest(models.Model):
     """Available interests that users can rate."""
@@ -196,9 +301,37 @@ class Interest(models.Model):
     class Meta:
         db_table = 'interests'
 
+class ProfileInterest(models.Model):
+    """An interest a user lists on their profile as a like or a dislike."""
+    KIND_CHOICES = [
+        ('L', 'Like'),
+        ('D', 'Dislike'),
+    ]
+
+    # Leads profile_interest_unique, so needs no index of its own
+    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='profile_interests', db_index=False)
+    # Leads the inverted index, so needs no index of its own
+    interest = models.ForeignKey(Interest, on_delete=models.CASCADE, related_name='profile_interests', db_index=False)
+    kind = models.CharField(max_length=1, choices=KIND_CHOICES)
+
+    class Meta:
+        db_table = 'profile_interests'
+        constraints = [
+            # An interest is either liked or disliked, never both
+            models.UniqueConstraint(fields=['user', 'interest'], name='profile_interest_unique'),
+        ]
+        indexes = [
+            # Inverted index: the users listing an interest, read without touching the table
+            models.Index(fields=['interest', 'kind', 'user'], name='profile_interests_inverted_idx'),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} {self.get_kind_display().lower()}s interest {self.interest_id}"
+
 class UserInterest(models.Model):
     """User ratings for interests."""
-    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='interest_ratings')
+    # Leads the unique_together index, so needs no index of its own
+    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='interest_ratings', db_index=False)
     interest = models.ForeignKey(Interest, on_delete=models.CASCADE)
     rating = models.FloatField(
         validators=[MinValueValidator(0.0), MaxValueValidator(1.0)]
@@ -208,6 +341,42 @@ class UserInterest(models.Model):
         db_table = 'user_interests'
         unique_together = ['user', 'interest']
 
+class InterestStats(models.Model):
+    """Running mean and variance of one interest's ratings across all users.
+
+    Kept current by Welford updates as UserInterest rows are written (see
+    core/signals.py), so standardizing ratings never needs a fit over the
+    whole table. ``version`` counts the updates applied to the row.
+    """
+    interest = models.OneToOneField(Interest, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    count = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)  # Sum of squared deviations from the mean
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'interest_stats'
+
+    def add(self, rating):
+        self.count += 1
+        delta = rating - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (rating - self.mean)
+
+    def remove(self, rating):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = rating - self.mean
+        self.mean -= delta / self.count
+        # Rounding can leave a hair below zero once only equal ratings remain
+        self.m2 = max(0.0, self.m2 - delta * (rating - self.mean))
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
 class Match(models.Model):
     """Matches between users."""
     STATUS_CHOICES = [
@@ -216,7 +385,8 @@ class Match(models.Model):
         ('R', 'Rejected'),
     ]
     
-    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='matches_as_user')
+    # Leads matches_user_created_idx, so needs no index of its own
+    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='matches_as_user', db_index=False)
     matched_user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='matches_as_matched')
     status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='P')
     compatibility_score = models.FloatField()
@@ -226,6 +396,13 @@ class Match(models.Model):
     class Meta:
         db_table = 'matches'
         unique_together = ['user', 'matched_user']
+        indexes = [
+            # Serves the per-user cursor pagination in MatchViewSet
+            models.Index(fields=['user', '-created_at', '-id'], name='matches_user_created_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=~models.Q(user=models.F('matched_user')), name='matches_not_self'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.matched_user.email} ({self.get_status_display()})"
@@ -238,7 +415,8 @@ class Interaction(models.Model):
         ('B', 'Block')
     ]
     
-    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='interactions_sent')
+    # Leads the unique_together index, so needs no index of its own
+    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='interactions_sent', db_index=False)
     target = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='interactions_received')
     interaction_type = models.CharField(max_length=1, choices=INTERACTION_TYPES)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -246,6 +424,9 @@ class Interaction(models.Model):
     class Meta:
         db_table = 'interactions'
         unique_together = ['user', 'target']
+        constraints = [
+            models.CheckConstraint(condition=~models.Q(user=models.F('target')), name='interactions_not_self'),
+        ]
 
 class UserModel(models.Model):
     """AI model parameters for user preferences."""
@@ -259,7 +440,8 @@ class UserModel(models.Model):
 
 class PhotoRating(models.Model):
     """User ratings for calibration photos."""
-    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='photo_ratings')
+    # Leads the unique_together index, so needs no index of its own
+    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='photo_ratings', db_index=False)
     photo = models.ForeignKey(Photo, on_delete=models.CASCADE, related_name='ratings')
     rating = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)]
@@ -269,6 +451,22 @@ class PhotoRating(models.Model):
     class Meta:
         db_table = 'photo_ratings'
         unique_together = ['user', 'photo']  # Each user can rate a photo only once
+        indexes = [
+            # A user's ratings in the order they were given, for train_user_model
+            models.Index(fields=['user', 'created_at'], name='photo_ratings_user_created_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.user.email} rated photo {self.photo.id}: {self.rating}"
\ No newline at end of file
+        return f"{self.user.email} rated photo {self.photo.id}: {self.rating}"
+
+class ThrottleCounter(models.Model):
+    """Request count for one throttle key in one fixed time window."""
+    key = models.CharField(max_length=255)
+    window = models.BigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    # Unix time the window ends, so expired rows of every key can be deleted together
+    expires = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        db_table = 'throttle_counters'
+        unique_together = ['key', 'window']
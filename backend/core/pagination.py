@@ -0,0 +1,71 @@
+# backend/core/pagination.py
+
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class MatchCursorPagination(CursorPagination):
+    """Keyset pagination over a user's matches, newest first."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class PhotoCursorPagination(CursorPagination):
+    """Keyset pagination over the photo catalog, newest first."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class StreamingListMixin:
+    """Let staff export a full list as one streamed JSON array with ?stream=1.
+
+    Rows are read with ``QuerySet.iterator(chunk_size=...)`` and serialized one
+    at a time, so memory stays flat however large the table gets. Under ASGI
+    the rows are handed to the server through an async generator, one chunk
+    per thread hop; Django would otherwise drain a sync iterator into a list
+    before sending the first byte.
+    """
+    stream_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('stream') == '1' and request.user.is_staff:
+            return self.stream_list(request)
+        return super().list(request, *args, **kwargs)
+
+    def stream_list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = getattr(self.pagination_class, 'ordering', None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+
+        def rows():
+            yield '['
+            for index, obj in enumerate(queryset.iterator(chunk_size=self.stream_chunk_size)):
+                data = serializer_class(obj, context=context).data
+                yield (',' if index else '') + json.dumps(data, cls=JSONEncoder)
+            yield ']'
+
+        content = rows()
+        if isinstance(request._request, ASGIRequest):
+            content = in_batches(content, self.stream_chunk_size)
+        return StreamingHttpResponse(content, content_type='application/json')
+
+
+async def in_batches(iterator, size):
+    """Yield from a sync iterator on the event loop, pulling ``size`` items per thread hop."""
+    next_batch = sync_to_async(lambda: list(islice(iterator, size)))
+    while batch := await next_batch():
+        for item in batch:
+            yield item
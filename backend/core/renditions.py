@@ -0,0 +1,176 @@
+# backend/core/renditions.py
+
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+# Bump when any rendition's size, fit or encoding changes, so every input is redone
+RENDITIONS_VERSION = 2
+
+# name: (size, fit, quality). 'contain' fits within size keeping the aspect ratio
+# and never upscales; 'stretch' resizes to exactly size, as the encoders do.
+RENDITIONS = {
+    'display': ((800, 800), 'contain', 85),
+    'thumbnail': ((160, 160), 'contain', 80),
+    'model': ((224, 224), 'stretch', 95),
+}
+
+RAW_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Responsive calibration renditions, built by load_calibration_photos next to
+# each copied original. Widths at or above the original's are left out, and the
+# original itself is the widest JPEG. Bump the version to rebuild them all.
+RESPONSIVE_VERSION = 1
+RESPONSIVE_WIDTHS = (160, 320, 480)
+# extension: (PIL format, quality, content type)
+RESPONSIVE_FORMATS = {
+    'webp': ('WEBP', 80, 'image/webp'),
+    'jpg': ('JPEG', 85, 'image/jpeg'),
+}
+
+
+def downscale(img, size):
+    """Shrink with an integer box-filter Image.reduce first, then an exact LANCZOS resize.
+
+    reduce() averages whole pixel blocks, which is far cheaper than resampling
+    the full-resolution image and keeps the final resize's input small.
+    """
+    factor = min(img.width // size[0], img.height // size[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+    if img.size != size:
+        img = img.resize(size, Image.LANCZOS)
+    return img
+
+
+def contain_size(image_size, box):
+    scale = min(box[0] / image_size[0], box[1] / image_size[1], 1.0)
+    return max(1, round(image_size[0] * scale)), max(1, round(image_size[1] * scale))
+
+
+def _save(img, path, image_format, quality):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # optimize only affects JPEG; WebP ignores it
+            img.save(f, image_format, quality=quality, optimize=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render(data, outputs):
+    """Decode one image and write every rendition in a single pass.
+
+    JPEGs are decoded with draft(), so libjpeg scales by 1/2, 1/4 or 1/8
+    while decoding and never materialises the full-resolution frame. Smaller
+    renditions are cut from the display one rather than from the original.
+    Photos are turned upright from their EXIF orientation, and re-encoding
+    drops all other metadata (GPS position, camera serials and the like).
+
+    Args:
+        data: Encoded image bytes
+        outputs: {rendition name: output path}
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        largest = max(RENDITIONS[name][0] for name in outputs)
+        img.draft('RGB', largest)
+        img = ImageOps.exif_transpose(img).convert('RGB')
+
+        base = downscale(img, contain_size(img.size, largest))
+        for name, path in outputs.items():
+            size, fit, quality = RENDITIONS[name]
+            target = contain_size(base.size, size) if fit == 'contain' else size
+            _save(downscale(base, target), path, 'JPEG', quality)
+
+
+def process_photo(job):
+    """Render one input unless it is unchanged since ``job['previous']``. Safe to run in a worker process.
+
+    Returns:
+        dict: State to record for the input: path, size, mtime, sha256, version and whether it was
+        rendered, or just the path and an ``error`` if it could not be read
+    """
+    try:
+        return _process_photo(job)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return {'input': job['input'], 'error': str(e)}
+
+
+def _process_photo(job):
+    stat = os.stat(job['input'])
+    previous = job.get('previous') or {}
+    outputs_exist = all(os.path.exists(path) for path in job['outputs'].values())
+    state = {'input': job['input'], 'size': stat.st_size, 'mtime': stat.st_mtime, 'version': RENDITIONS_VERSION}
+
+    unchanged = outputs_exist and previous.get('version') == RENDITIONS_VERSION
+    if unchanged and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime:
+        return {**state, 'sha256': previous['sha256'], 'rendered': False}
+
+    with open(job['input'], 'rb') as f:
+        data = f.read()
+    sha256 = hashlib.sha256(data).hexdigest()
+    if unchanged and previous.get('sha256') == sha256:
+        # Touched but identical, e.g. after a fresh checkout
+        return {**state, 'sha256': sha256, 'rendered': False}
+
+    render(data, job['outputs'])
+    return {**state, 'sha256': sha256, 'rendered': True}
+
+
+def responsive_widths(width):
+    """Widths a photo ``width`` pixels wide is offered in, narrowest first."""
+    return [candidate for candidate in RESPONSIVE_WIDTHS if candidate < width] + [width]
+
+
+def responsive_name(name, width, extension, original_width):
+    """Path of one rendition of ``name`` (e.g. calibration_photos/male/000123.jpg), in the same form.
+
+    Renditions live in a per-width subdirectory next to the original, which
+    doubles as its own full-width JPEG.
+    """
+    if width == original_width and extension == 'jpg':
+        return name
+    directory, filename = os.path.split(name)
+    return os.path.join(directory, f'{width}w', f'{os.path.splitext(filename)[0]}.{extension}')
+
+
+def render_responsive(job):
+    """Write every responsive rendition of one image. Safe to run in a worker process.
+
+    Args:
+        job: {'source': path of the original, 'outputs': {(width, extension): path}}
+
+    Returns:
+        dict: The job's source, plus an ``error`` if it could not be rendered
+    """
+    try:
+        with Image.open(job['source']) as img:
+            widest = max(width for width, _ in job['outputs'])
+            img.draft('RGB', contain_size(img.size, (widest, img.height)))
+            img = img.convert('RGB')
+            for (width, extension), path in job['outputs'].items():
+                image_format, quality, _ = RESPONSIVE_FORMATS[extension]
+                _save(downscale(img, contain_size(img.size, (width, img.height))), path, image_format, quality)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return {'source': job['source'], 'error': str(e)}
+    return {'source': job['source']}
+
+
+def run_jobs(fn, jobs, processes):
+    """Map ``fn`` over ``jobs`` in spawned worker processes, or in this one if processes <= 1.
+
+    Workers only import this module and PIL, not Django.
+    """
+    if processes <= 1 or len(jobs) <= 1:
+        return [fn(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(fn, jobs, chunksize=max(1, len(jobs) // (processes * 8))))
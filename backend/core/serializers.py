@@ -2,15 +2,34 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
-from .models import Photo, Match, UserPreference
+from django.db import transaction
+from .interests import MAX_NAME_LENGTH, normalize_names, set_profile_interests
+from .models import Photo, Match, UserPhoto, UserPreference
 
 User = get_user_model()
 
 class PhotoSerializer(serializers.ModelSerializer):
+    image_url = serializers.CharField(source='calibration_url', read_only=True)
+
     class Meta:
         model = Photo
-        fields = ['id', 'image_url', 'is_profile_photo', 'uploaded_at']
-        read_only_fields = ['id', 'uploaded_at']
+        fields = ['id', 'image_url', 'gender', 'age', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+class UserPhotoSerializer(serializers.ModelSerializer):
+    image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserPhoto
+        fields = ['id', 'position', 'status', 'error', 'image_url', 'thumbnail_url', 'created_at', 'processed_at']
+        read_only_fields = fields
+
+    def get_image_url(self, obj):
+        return obj.image.url if obj.image else None
+
+    def get_thumbnail_url(self, obj):
+        return obj.thumbnail.url if obj.thumbnail else None
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -66,8 +85,6 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(required=True, write_only=True)
 
     def validate(self, attrs):
-        print(f"DEBUG - LoginSerializer validate - received email: {attrs.get('email')}")
-        
         # Authenticate using EmailBackend
         user = authenticate(
             request=self.context.get('request'),
@@ -76,11 +93,9 @@ class LoginSerializer(serializers.Serializer):
         )
         
         if user:
-            print(f"DEBUG - Successfully authenticated user: {user.email}")
             attrs['user'] = user
             return attrs
         
-        print("DEBUG - Authentication failed")
         raise serializers.ValidationError({
             'non_field_errors': ['Invalid email or password.']
         })
@@ -88,9 +103,11 @@ class LoginSerializer(serializers.Serializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     location = serializers.JSONField(required=False)
     age = serializers.IntegerField(read_only=True)
-    likes = serializers.ListField(child=serializers.CharField(), required=False, default=list)
-    dislikes = serializers.ListField(child=serializers.CharField(), required=False, default=list)
-    photos = PhotoSerializer(many=True, read_only=True)
+    likes = serializers.ListField(child=serializers.CharField(max_length=MAX_NAME_LENGTH), required=False, default=list)
+    dislikes = serializers.ListField(
+        child=serializers.CharField(max_length=MAX_NAME_LENGTH), required=False, default=list
+    )
+    photos = UserPhotoSerializer(many=True, read_only=True)
     
     class Meta:
         model = User
@@ -110,14 +127,20 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'dislikes': {'required': False},
         }
 
+    def validate(self, attrs):
+        likes, dislikes = attrs.get('likes'), attrs.get('dislikes')
+        if likes is not None and dislikes is not None and set(normalize_names(likes)) & set(normalize_names(dislikes)):
+            raise serializers.ValidationError({'dislikes': ['An interest cannot be both liked and disliked.']})
+        return attrs
+
     def update(self, instance, validated_data):
-        # Handle likes and dislikes
-        if 'likes' in validated_data:
-            validated_data['likes'] = list(set(validated_data['likes']))  # Remove duplicates
-        if 'dislikes' in validated_data:
-            validated_data['dislikes'] = list(set(validated_data['dislikes']))  # Remove duplicates
-            
-        return super().update(instance, validated_data)
+        if 'likes' not in validated_data and 'dislikes' not in validated_data:
+            return super().update(instance, validated_data)
+
+        # Likes and dislikes live in ProfileInterest; the name lists saved with the user mirror it
+        with transaction.atomic():
+            set_profile_interests(instance, validated_data.pop('likes', None), validated_data.pop('dislikes', None))
+            return super().update(instance, validated_data)
 
 class MatchSerializer(serializers.ModelSerializer):
     user = UserProfileSerializer(read_only=True)
@@ -128,6 +151,36 @@ class MatchSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'matched_user', 'status', 'created_at', 'compatibility_score']
         read_only_fields = ['user', 'matched_user', 'compatibility_score']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load both nested profiles with the match rows instead of per match."""
+        return queryset.select_related('user', 'matched_user').prefetch_related('user__photos', 'matched_user__photos')
+
+class MatchCardSerializer(serializers.ModelSerializer):
+    """Flat, compact representation of a match for list views."""
+    matched_user_id = serializers.IntegerField(read_only=True)
+    first_name = serializers.CharField(source='matched_user.first_name', read_only=True)
+    age = serializers.IntegerField(source='matched_user.age', read_only=True)
+    gender = serializers.CharField(source='matched_user.gender', read_only=True)
+    profile_photo = serializers.URLField(source='matched_user.profile_photo', read_only=True)
+
+    class Meta:
+        model = Match
+        fields = [
+            'id', 'matched_user_id', 'first_name', 'age', 'gender', 'profile_photo',
+            'status', 'created_at', 'compatibility_score'
+        ]
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Cards only read the matched user, so only that row is joined."""
+        return queryset.select_related('matched_user').only(
+            'id', 'status', 'created_at', 'compatibility_score', 'matched_user_id',
+            'matched_user__first_name', 'matched_user__birth_date',
+            'matched_user__gender', 'matched_user__profile_photo'
+        )
+
 class UserPreferenceSerializer(serializers.ModelSerializer):
     preferred_location = serializers.JSONField()
     
@@ -0,0 +1,87 @@
+# backend/core/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import Match, User, UserInterest, UserPhoto, UserPreference
+
+# Fields that never appear in API payloads, so writing them must not invalidate ETags
+UNVERSIONED_USER_FIELDS = {'last_login', 'password', 'data_version', 'data_updated_at'}
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Bump the version of a user whose profile was written."""
+    user_cache.evict(instance.pk)
+    if created or raw:
+        return
+    if update_fields and set(update_fields) <= UNVERSIONED_USER_FIELDS:
+        return
+    User.bump_data_version(instance.pk)
+    # Keep the in-memory instance current so a later save() doesn't roll the counter back
+    instance.refresh_from_db(fields=['data_version', 'data_updated_at'])
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    user_cache.evict(instance.pk)
+
+
+@receiver(post_save, sender=UserPreference)
+@receiver(post_delete, sender=UserPreference)
+def preferences_changed(sender, instance, raw=False, **kwargs):
+    """Bump the owner's version when their preferences change."""
+    if not raw:
+        User.bump_data_version(instance.user_id)
+        user_cache.evict(instance.user_id)
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def match_changed(sender, instance, raw=False, **kwargs):
+    """Bump the version of the user whose match list changed."""
+    if not raw:
+        User.bump_data_version(instance.user_id)
+        user_cache.evict(instance.user_id)
+
+
+@receiver(post_delete, sender=UserPhoto)
+def user_photo_deleted(sender, instance, **kwargs):
+    """Bump the owner's version; other photo writes go through core/uploads.py, which bumps it itself."""
+    User.bump_data_version(instance.user_id)
+    user_cache.evict(instance.user_id)
+
+
+@receiver(pre_save, sender=UserInterest)
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    """Note the stored rating an update replaces, for the Welford update after it."""
+    instance._previous_rating = None
+    if not raw and not instance._state.adding:
+        instance._previous_rating = UserInterest.objects.filter(pk=instance.pk).values_list(
+            'interest_id', 'rating'
+        ).first()
+
+
+@receiver(post_save, sender=UserInterest)
+@receiver(post_delete, sender=UserInterest)
+def interest_rating_changed(sender, instance, raw=False, signal=None, **kwargs):
+    """Keep the interest's population statistics and this process's interest matrix in step with a rating."""
+    # Imported here so scipy and sklearn only load once interests are rated
+    from .ai.interest_matrix import mark_interests_changed
+    from .ai.interest_stats import record_rating_change
+
+    if raw:
+        return
+    if signal is post_delete:
+        record_rating_change(instance.interest_id, old=instance.rating)
+    else:
+        previous = getattr(instance, '_previous_rating', None)
+        if previous and previous[0] != instance.interest_id:
+            record_rating_change(previous[0], old=previous[1])
+            previous = None
+        record_rating_change(instance.interest_id, old=previous[1] if previous else None, new=instance.rating)
+    # Only once committed, or a concurrent refresh could re-read the old rows and clear the mark
+    user_id = instance.user_id
+    transaction.on_commit(lambda: mark_interests_changed(user_id))
@@ -0,0 +1,22 @@
+# backend/core/storage.py
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """WhiteNoise's hashed, compressed storage, minus post-processing of photo trees.
+
+    Calibration photos and their renditions are addressed by plain URLs built
+    in code, never through {% static %}, and are already compressed. Hashing
+    them would read every image and write a renamed duplicate of it at
+    collectstatic for no benefit, so they are only copied.
+    """
+
+    unhashed_prefixes = ('calibration_photos/',)
+
+    def post_process(self, paths, dry_run=False, **options):
+        paths = {
+            name: source for name, source in paths.items()
+            if not name.replace('\\', '/').startswith(self.unhashed_prefixes)
+        }
+        yield from super().post_process(paths, dry_run=dry_run, **options)
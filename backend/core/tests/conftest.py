@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+from django.core.cache import cache
+
+from core.authentication import user_cache
+from core.throttling import get_throttle_store
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    # Rolled-back test transactions can reuse primary keys, so never share cached rows between tests
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def local_throttle_store(settings):
+    """Count throttled requests in memory, starting from zero in every test."""
+    settings.THROTTLE_STORE = 'core.throttling.LocalThrottleStore'
+    store = get_throttle_store()
+    store.clear()
+    yield store
+    store.clear()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """Give every test an empty per-process cache instead of the shared database cache."""
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+class FakeEmbedder:
+    """Replaces embed_images: a photo's 'embedding' is derived from its file name."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, name, img_paths):
+        self.calls.append(list(img_paths))
+        vectors = [np.full(4, int(os.path.basename(path)[:6]), dtype=np.float32) for path in img_paths]
+        return np.stack(vectors), list(img_paths)
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    from core.ai import ai_models, embeddings
+
+    fake = FakeEmbedder()
+    monkeypatch.setattr(embeddings, 'embed_images', fake)
+    monkeypatch.setattr(ai_models, 'embed_images', fake)
+    return fake
@@ -0,0 +1,131 @@
+import asyncio
+import json
+from unittest import mock
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.async_http import get_async_client
+from core.models import User, UserPreference
+from core.throttling import PickupLineRateThrottle
+
+NOMINATIM_RESULTS = [{
+    'place_id': 1, 'lat': '45.46', 'lon': '9.19',
+    'address': {'city': 'Milan', 'country': 'Italy'},
+}]
+
+
+def chat_completion(content):
+    return {
+        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-3.5-turbo',
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+    }
+
+
+@pytest.fixture
+def upstream():
+    """Route the async views' outbound calls to an in-memory transport."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if 'nominatim' in request.url.host:
+            return httpx.Response(200, json=NOMINATIM_RESULTS)
+        if request.url.path.endswith('/describe'):
+            captions = [{'text': f'photo {len(calls)}', 'confidence': 0.9}]
+            return httpx.Response(200, json={'description': {'captions': captions}})
+        if request.url.path.endswith('/chat/completions'):
+            prompt = json.loads(request.content)['messages'][-1]['content']
+            return httpx.Response(200, json=chat_completion(f'line for: {prompt}'))
+        return httpx.Response(404)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with mock.patch('core.geocoding.get_async_client', return_value=client), \
+            mock.patch('core.ai.ai_models.get_async_client', return_value=client), \
+            mock.patch('core.ai.ai_models.azure_endpoint', 'https://vision.example.com/'), \
+            mock.patch('core.ai.ai_models.azure_api_key', 'test-key'):
+        yield calls
+
+
+def test_client_is_closed_with_its_loop():
+    async def pooled():
+        client = get_async_client()
+        assert get_async_client() is client
+        return client
+
+    assert asyncio.run(pooled()).is_closed
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(email='async@example.com', password='testpassword123')
+
+    @pytest.fixture
+    def headers(self, user):
+        return {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def get(self, url, **kwargs):
+        return async_to_sync(AsyncClient().get)(url, secure=True, **kwargs)
+
+    def post(self, url, **kwargs):
+        return async_to_sync(AsyncClient().post)(url, secure=True, **kwargs)
+
+    def test_requires_token(self, upstream):
+        response = self.get(reverse('location-search'), data={'query': 'Milan'})
+        assert response.status_code == 401
+        assert upstream == []
+
+    def test_location_search_is_cached(self, upstream, headers):
+        url = reverse('location-search')
+        first = self.get(url, data={'query': 'Milan'}, headers=headers).json()
+        second = self.get(url, data={'query': 'MILAN'}, headers=headers).json()
+        assert first == second
+        assert first[0]['display_name'] == 'Milan, Italy'
+        assert len(upstream) == 1
+
+    def test_upstream_failure_is_503(self, headers):
+        failing = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(502)))
+        with mock.patch('core.geocoding.get_async_client', return_value=failing):
+            response = self.get(reverse('location-search'), data={'query': 'Rome'}, headers=headers)
+        assert response.status_code == 503
+
+    def test_pickup_line_describes_every_photo(self, upstream, headers, user):
+        UserPreference.objects.create(user=user, preferred_gender='F')
+        photos = [SimpleUploadedFile(f'{i}.jpg', b'jpeg-bytes', content_type='image/jpeg') for i in range(3)]
+        response = self.post(reverse('pickup-line'), data={'photos': photos}, headers=headers)
+
+        assert response.status_code == 200
+        assert 'interested in a F' in response.json()['pickup_line']
+        paths = [request.url.path for request in upstream]
+        assert paths.count('/vision/v3.2/describe') == 3
+        # One completion to pick a description, one for the line itself
+        assert sum(path.endswith('/chat/completions') for path in paths) == 2
+
+    def test_pickup_line_requires_photos(self, upstream, headers):
+        response = self.post(reverse('pickup-line'), headers=headers)
+        assert response.status_code == 400
+        assert upstream == []
+
+    def test_pickup_line_is_throttled(self, upstream, headers):
+        photo = SimpleUploadedFile('0.jpg', b'jpeg-bytes', content_type='image/jpeg')
+        with mock.patch.dict(PickupLineRateThrottle.THROTTLE_RATES, {'pickup_line': '1/hour'}):
+            assert self.post(reverse('pickup-line'), data={'photos': [photo]}, headers=headers).status_code == 200
+            photo.seek(0)
+            response = self.post(reverse('pickup-line'), data={'photos': [photo]}, headers=headers)
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+        assert len([request for request in upstream if request.url.path.endswith('/describe')]) == 1
+
+    def test_pickup_line_without_azure_settings_is_503(self, upstream, headers):
+        photo = SimpleUploadedFile('0.jpg', b'jpeg-bytes', content_type='image/jpeg')
+        with mock.patch('core.ai.ai_models.azure_endpoint', None):
+            response = self.post(reverse('pickup-line'), data={'photos': [photo]}, headers=headers)
+        assert response.status_code == 503
+        assert upstream == []
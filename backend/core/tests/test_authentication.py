@@ -0,0 +1,81 @@
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.authentication import user_cache
+from core.models import Photo, PhotoRating, User
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email='auth@example.com', password='testpassword123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestTokenUserAuthentication:
+    def test_rating_skips_user_lookup(self, client, user, django_assert_num_queries):
+        photo = Photo.objects.create(id=1, gender='F')
+        # Photo lookup plus get_or_create's select, savepoint, insert and release; no user query
+        with django_assert_num_queries(5):
+            response = client.post(reverse('photo-rating'), {'photo_id': photo.id, 'rating': 4}, secure=True)
+        assert response.status_code == status.HTTP_200_OK
+        assert PhotoRating.objects.get(user=user, photo=photo).rating == 4
+
+    def test_invalid_token_rejected(self, db):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        assert client.get(reverse('match-list'), secure=True).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_user_row_reused_within_ttl(self, client, django_assert_num_queries):
+        url = reverse('calibration-photos')
+        client.get(url, secure=True)
+        # Only the preferences lookup remains once the user row is cached
+        with django_assert_num_queries(1):
+            client.get(url, secure=True)
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_writes_evict_cached_row(self, client, user):
+        client.get(reverse('calibration-photos'), secure=True)
+        assert user.pk in user_cache._entries
+        User.objects.get(pk=user.pk).save()
+        assert user.pk not in user_cache._entries
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_inactive_user_rejected(self, client, user):
+        user.is_active = False
+        user.save()
+        assert client.get(reverse('calibration-photos'), secure=True).status_code == status.HTTP_401_UNAUTHORIZED
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_cached_copies_share_no_json_fields(self, user):
+        first = user_cache.get(user.pk)
+        first.likes.append('hiking')
+        assert user_cache.get(user.pk).likes == []
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_calibration_writes_only_its_own_field(self, client, user):
+        client.get(reverse('calibration-photos'), secure=True)
+        # Queryset updates send no signals, so the cached row is now stale
+        User.objects.filter(pk=user.pk).update(location='Lisbon')
+        with mock.patch('core.views.train_user_model'):
+            response = client.post(reverse('calibrate'), secure=True)
+        assert response.status_code == status.HTTP_200_OK
+        user.refresh_from_db()
+        assert user.calibration_completed
+        assert user.location == 'Lisbon'
@@ -0,0 +1,60 @@
+import pytest
+from django.contrib.auth import authenticate
+from django.test import override_settings
+
+from core.models import User
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email='Login@Example.com', password='testpassword123')
+
+
+@pytest.mark.django_db
+class TestEmailBackend:
+    def test_case_insensitive_login_in_one_query(self, user, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert authenticate(email='login@example.COM', password='testpassword123') == user
+
+    def test_unknown_email_is_single_query_and_hashes(self, user, django_assert_num_queries, monkeypatch):
+        hashed = []
+        original = User.set_password
+        monkeypatch.setattr(User, 'set_password', lambda self, raw: hashed.append(raw) or original(self, raw))
+        with django_assert_num_queries(1):
+            assert authenticate(email='nobody@example.com', password='testpassword123') is None
+        assert hashed == ['testpassword123']
+
+    def test_wrong_password_and_inactive(self, user):
+        assert authenticate(email=user.email, password='wrong') is None
+        user.is_active = False
+        user.save()
+        assert authenticate(email=user.email, password='testpassword123') is None
+
+    def test_admin_username_field(self, user):
+        assert authenticate(username='login@example.com', password='testpassword123') == user
+
+
+@pytest.mark.django_db
+class TestPasswordRehash:
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_pbkdf2_cost_change_rehashes_on_login(self):
+        user = User.objects.create_user(email='rehash@example.com', password='testpassword123')
+        assert user.password.startswith('pbkdf2_sha256$1000$')
+
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            assert authenticate(email='rehash@example.com', password='testpassword123') == user
+        user.refresh_from_db()
+        assert user.password.startswith('pbkdf2_sha256$2000$')
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_switching_to_argon2_migrates_on_login(self):
+        pytest.importorskip('argon2')
+        user = User.objects.create_user(email='argon@example.com', password='testpassword123')
+        hashers = ['core.hashers.TunedArgon2PasswordHasher', 'core.hashers.TunedPBKDF2PasswordHasher']
+        with override_settings(
+            PASSWORD_HASHERS=hashers, PASSWORD_ARGON2_MEMORY_COST=1024, PASSWORD_ARGON2_TIME_COST=1
+        ):
+            assert authenticate(email='argon@example.com', password='testpassword123') == user
+            user.refresh_from_db()
+            assert user.password.startswith('argon2$argon2id$')
+            assert authenticate(email='argon@example.com', password='testpassword123') == user
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from core.ai.backbones import convert_to_tflite, tflite_embedder
+from core.ai.encoders import ENCODERS
+
+tf = pytest.importorskip('tensorflow')
+
+
+def test_int8_tflite_matches_float_embeddings(tmp_path):
+    """The quantized export must stay interchangeable with the float model's embeddings."""
+    from tensorflow.keras.applications import MobileNetV2
+
+    # Same architecture as the served backbone, but small and without downloading weights
+    tf.keras.utils.set_random_seed(0)
+    model = MobileNetV2(weights=None, include_top=False, pooling='avg', input_shape=(96, 96, 3), alpha=0.35)
+    path = tmp_path / 'mobilenet_v2.int8.tflite'
+    path.write_bytes(convert_to_tflite(model))
+
+    preprocess_input = ENCODERS['mobilenet_v2'].preprocess_input
+    pixels = np.random.default_rng(0).integers(0, 256, (4, 96, 96, 3), dtype='uint8')
+    expected = model(preprocess_input(pixels.astype('float32')), training=False).numpy()
+
+    embed = tflite_embedder(path, preprocess_input, num_threads=1)
+    for batch in (pixels, pixels[:1]):  # The interpreter is resized between batch sizes
+        actual = embed(batch)
+        reference = expected[:len(batch)]
+        cosine = np.sum(actual * reference, axis=1) / (
+            np.linalg.norm(actual, axis=1) * np.linalg.norm(reference, axis=1)
+        )
+        assert actual.shape == reference.shape
+        assert cosine.min() > 0.99
@@ -0,0 +1,135 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.caching import CacheNamespace
+from core.models import User, UserPreference
+
+
+def in_threads(count, target):
+    """Run target in count threads at once and return their results."""
+    results = []
+
+    def run():
+        try:
+            results.append(target())
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def slow_compute(calls):
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+    return compute
+
+
+@pytest.fixture
+def database_cache(settings, transactional_db):
+    """The DatabaseCache the settings use without Redis, in place of the local cache every other test gets."""
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_entries'}
+    }
+    call_command('createcachetable', verbosity=0)
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+class TestCacheNamespace:
+    def test_concurrent_misses_compute_once(self):
+        namespace = CacheNamespace('test')
+        calls = []
+        assert in_threads(8, lambda: namespace.get_or_set('key', slow_compute(calls))) == ['value'] * 8
+        assert len(calls) == 1
+
+    def test_compute_can_use_the_namespace(self):
+        namespace = CacheNamespace('test')
+
+        def total():
+            return sum(namespace.get_or_set(f'part{i}', lambda i=i: i) for i in range(100))
+
+        assert in_threads(4, lambda: namespace.get_or_set('total', total)) == [4950] * 4
+
+    def test_database_cache(self, database_cache):
+        namespace = CacheNamespace('test')
+        assert isinstance(namespace.cache, DatabaseCache)
+        calls = []
+        assert in_threads(8, lambda: namespace.get_or_set('key', slow_compute(calls))) == ['value'] * 8
+        assert len(calls) == 1
+        assert namespace.get('key') == 'value'
+
+        def other_process():
+            namespace.set('other', 'from-other-process')
+            connections.close_all()
+
+        namespace.cache.add(namespace.make_key('other:lock'), 1)
+        threading.Timer(0.1, other_process).start()
+        assert namespace.get_or_set('other', lambda: 'recomputed', wait=2) == 'from-other-process'
+
+    def test_waits_for_another_process_holding_the_lock(self):
+        namespace = CacheNamespace('test')
+        namespace.cache.add(namespace.make_key('key:lock'), 1)
+        threading.Timer(0.1, lambda: namespace.set('key', 'from-other-process')).start()
+        assert namespace.get_or_set('key', lambda: 'recomputed', wait=2) == 'from-other-process'
+
+    def test_namespace_ttl_from_settings(self, settings):
+        settings.CACHE_NAMESPACE_TTLS = {'geocode': 5}
+        assert CacheNamespace('geocode').ttl == 5
+
+
+@pytest.mark.django_db
+class TestCachedEndpoints:
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(email='cache@example.com', password='testpassword123')
+
+    @pytest.fixture
+    def client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_location_search_hits_nominatim_once(self, client):
+        upstream = mock.Mock()
+        upstream.json.return_value = [{
+            'place_id': 1, 'lat': '45.46', 'lon': '9.19',
+            'address': {'city': 'Milan', 'country': 'Italy'},
+        }]
+        with mock.patch('core.geocoding.requests.get', return_value=upstream) as get:
+            first = client.get(reverse('location-search-sync'), {'query': 'Milan'}, secure=True).json()
+            second = client.get(reverse('location-search-sync'), {'query': ' milan '}, secure=True).json()
+        assert first == second
+        assert first[0]['display_name'] == 'Milan, Italy'
+        assert get.call_count == 1
+
+    def test_onboarding_status_refreshes_after_writes(self, client, user):
+        url = reverse('onboarding-status')
+        assert client.get(url, secure=True).json()['current_step'] == 'details'
+        assert client.get(url, secure=True).json()['current_step'] == 'details'
+
+        user.gender, user.location = 'F', 'Milan'
+        user.birth_date = '1995-01-01'
+        user.save()
+        assert client.get(url, secure=True).json()['current_step'] == 'preferences'
+
+        UserPreference.objects.filter(user=user).update(preferred_gender='M')
+        # Queryset updates skip signals, so the cached status is still served
+        assert client.get(url, secure=True).json()['current_step'] == 'preferences'
@@ -0,0 +1,143 @@
+import io
+import json
+import os
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from core import calibration
+from core.models import Photo, PhotoEmbedding, User, UserPreference
+
+
+@pytest.fixture
+def catalog(settings, tmp_path):
+    """Three source photos under a throwaway BASE_DIR and STATIC_ROOT."""
+    settings.BASE_DIR = tmp_path
+    settings.STATIC_ROOT = tmp_path / 'staticfiles'
+    settings.PHOTO_ENCODER = 'mobilenet_v2'
+    for gender, photo_id in (('M', 1), ('M', 2), ('F', 3)):
+        os.makedirs(calibration.source_dir(gender), exist_ok=True)
+        Image.new('RGB', (256, 512), (photo_id * 60, 0, 0)).save(
+            os.path.join(calibration.source_dir(gender), f'{photo_id:06d}.jpg')
+        )
+    with open(os.path.join(calibration.source_dir('F'), 'notes.txt'), 'w') as f:
+        f.write('not a photo')
+    return tmp_path
+
+
+def load(*args):
+    out = io.StringIO()
+    call_command('load_calibration_photos', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestLoadCalibrationPhotos:
+    def test_first_load_copies_upserts_and_embeds(self, catalog, embedder):
+        output = load()
+
+        assert '3 photos: 3 new, 0 changed, 3 copied' in output
+        assert 'notes.txt' in output
+        assert dict(Photo.objects.values_list('id', 'gender')) == {1: 'M', 2: 'M', 3: 'F'}
+        assert os.path.exists(os.path.join(calibration.target_dir('F'), '000003.jpg'))
+        assert sorted(calibration.read_manifest()) == [1, 2, 3]
+        assert PhotoEmbedding.objects.count() == 3
+
+    def test_rerun_only_touches_changed_files(self, catalog, embedder):
+        load()
+        photo = Photo.objects.get(id=1)
+        Image.new('RGB', (256, 512), (0, 0, 255)).save(photo.calibration_path)
+
+        output = load()
+
+        assert '3 photos: 0 new, 1 changed, 1 copied' in output
+        assert [os.path.basename(path) for path in embedder.calls[-1]] == ['000001.jpg']
+        assert calibration.read_manifest()[1]['sha256'] == calibration.hash_file(photo.calibration_path)
+        assert '0 new, 0 changed, 0 copied' in load()
+        assert len(embedder.calls) == 2
+
+    def test_csv_manifest(self, catalog, tmp_path):
+        path = str(tmp_path / 'manifest.csv')
+        load('--skip-embeddings', '--manifest', path)
+
+        manifest = calibration.read_manifest(path)
+        assert manifest[3]['gender'] == 'F' and manifest[3]['width'] == 256
+        assert '0 copied' in load('--skip-embeddings', '--manifest', path)
+
+
+@pytest.mark.django_db
+class TestCheckPhotos:
+    def check(self, *args):
+        out = io.StringIO()
+        call_command('check_photos', '--json', *args, stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_clean_catalog_passes(self, catalog):
+        load('--skip-embeddings')
+        report = self.check()
+
+        assert report['ok']
+        assert report['files']['checked'] == 3
+        assert report['api']['M'] == {'status': 200, 'photos': 2, 'not_in_manifest': [], 'not_served': []}
+        # The throwaway API user is rolled back
+        assert not User.objects.exists()
+
+    def test_corrupted_copy_is_reported(self, catalog):
+        load('--skip-embeddings')
+        target = os.path.join(calibration.target_dir('M'), '000002.jpg')
+        with open(target, 'r+b') as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b'XXX')
+
+        assert self.check('--quick')['ok']
+        with pytest.raises(CommandError):
+            self.check()
+
+
+@pytest.mark.django_db
+class TestResponsiveRenditions:
+    def test_renditions_are_built_once(self, catalog):
+        assert '3 rendered' in load('--skip-embeddings')
+        target = calibration.target_dir('F')
+
+        with Image.open(os.path.join(target, '160w', '000003.webp')) as img:
+            assert img.size == (160, 320)
+        assert os.path.exists(os.path.join(target, '160w', '000003.jpg'))
+        assert os.path.exists(os.path.join(target, '256w', '000003.webp'))
+        # The original is the full-width JPEG
+        assert not os.path.exists(os.path.join(target, '256w', '000003.jpg'))
+        assert '0 rendered' in load('--skip-embeddings')
+
+    def test_calibration_view_returns_srcsets(self, catalog):
+        load('--skip-embeddings')
+        user = User.objects.create_user(email='srcset@example.com', password='testpassword123')
+        UserPreference.objects.create(user=user, preferred_gender='F')
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        [photo] = client.get(reverse('calibration-photos'), secure=True).json()['photos']
+
+        assert photo['image_url'] == '/static/calibration_photos/female/000003.jpg'
+        assert photo['srcset'] == {
+            'image/webp': '/static/calibration_photos/female/160w/000003.webp 160w, '
+                          '/static/calibration_photos/female/256w/000003.webp 256w',
+            'image/jpeg': '/static/calibration_photos/female/160w/000003.jpg 160w, '
+                          '/static/calibration_photos/female/000003.jpg 256w',
+        }
+
+    def test_collectstatic_skips_hashing_photos(self, settings, tmp_path):
+        source = tmp_path / 'static'
+        os.makedirs(source / 'calibration_photos' / 'male')
+        Image.new('RGB', (8, 8)).save(source / 'calibration_photos' / 'male' / '000001.jpg')
+        (source / 'app.css').write_text('body { color: red; }' * 50)
+        settings.STATICFILES_DIRS = [source]
+        settings.STATIC_ROOT = tmp_path / 'collected'
+
+        call_command('collectstatic', '--noinput', '-i', 'admin', '-i', 'rest_framework', verbosity=0)
+
+        collected = os.listdir(tmp_path / 'collected')
+        assert any(name.startswith('app.') and name.endswith('.css.gz') for name in collected)
+        assert os.listdir(tmp_path / 'collected' / 'calibration_photos' / 'male') == ['000001.jpg']
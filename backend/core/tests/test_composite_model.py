@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+
+from core.ai.embeddings import get_profile_embeddings
+from core.ai.encoders import get_encoder
+from core.ai.interest_stats import get_population_stats, ratings_matrix
+from core.ai.matching.engine import MatchingEngine
+from core.ai.models.composite_model import CompositeModel
+from core.models import Interest, User, UserInterest, UserPhoto
+
+DIM = 8
+
+
+def fitted_model(interest_ids=None):
+    rng = np.random.default_rng(0)
+    model = CompositeModel()
+    model.fit_features(
+        rng.normal(size=(40, DIM)), rng.uniform(size=(40, 3)), rng.uniform(size=40),
+        encoder_key=get_encoder().key, interest_ids=interest_ids
+    )
+    return model
+
+
+def no_cnn(img_paths):
+    raise AssertionError('the CNN should not run')
+
+
+def test_path_entry_points_wrap_the_feature_api(monkeypatch):
+    model = fitted_model()
+    features = np.random.default_rng(1).normal(size=(3, DIM))
+    interests = np.random.default_rng(2).uniform(size=(3, 3))
+    calls = []
+
+    def extract(img_paths):
+        calls.append(img_paths)
+        return features[:len(img_paths)], img_paths
+
+    monkeypatch.setattr(model.photo_model, 'batch_extract_features', extract)
+    assert np.allclose(
+        model.predict(['a.jpg', 'b.jpg', 'c.jpg'], interests), model.predict_features(features, interests)
+    )
+    assert len(calls) == 1
+
+    score = model.calculate_mutual_compatibility(['a.jpg', 'x.jpg'], interests[0], ['b.jpg'], interests[1])
+    assert score == pytest.approx(
+        model.calculate_mutual_compatibility_features(features[0], interests[0], features[1], interests[1])
+    )
+    assert calls[1] == ['a.jpg', 'b.jpg']
+
+
+def test_pairwise_scores_match_the_batch(monkeypatch):
+    model = fitted_model()
+    monkeypatch.setattr(model.photo_model, 'batch_extract_features', no_cnn)
+    rng = np.random.default_rng(3)
+    features, interests = rng.normal(size=(4, DIM)), rng.uniform(size=(4, 3))
+
+    batch = model.batch_mutual_compatibility(features[0], interests[0], features[1:], interests[1:])
+    pairs = [
+        model.calculate_mutual_compatibility_features(features[0], interests[0], features[i], interests[i])
+        for i in range(1, 4)
+    ]
+    assert np.allclose(batch, pairs)
+
+    predictions = model.predict_features(features, interests)
+    expected = 0.7 * (predictions[1] + predictions[0]) / 2 + 0.3 * model.interest_model.calculate_similarity(
+        interests[0], interests[1]
+    )
+    assert batch[0] == pytest.approx(expected)
+
+
+@pytest.mark.django_db
+def test_engine_scores_from_stored_embeddings(monkeypatch):
+    interests = [Interest.objects.create(name=name, category='test') for name in ('music', 'sport', 'art')]
+    rng = np.random.default_rng(4)
+    users = []
+    for i in range(4):
+        user = User.objects.create_user(email=f'scored{i}@example.com', password='x')
+        for interest in interests:
+            UserInterest.objects.create(user=user, interest=interest, rating=rng.uniform())
+        if i < 3:
+            # The last user's photo hasn't been processed yet
+            user.primary_photo = UserPhoto.objects.create(
+                user=user, status='ready', encoder=get_encoder().key,
+                embedding=rng.normal(size=DIM).astype(np.float32).tobytes(),
+            )
+            user.save(update_fields=['primary_photo'])
+        users.append(user)
+
+    features, valid = get_profile_embeddings([user.pk for user in users])
+    assert valid == [user.pk for user in users[:3]]
+    assert features.shape == (3, DIM)
+
+    # Ratings of interests the model wasn't fitted on don't change its columns
+    extra = Interest.objects.create(name='film', category='test')
+    UserInterest.objects.create(user=users[0], interest=extra, rating=0.5)
+
+    engine = MatchingEngine()
+    engine.model = fitted_model(interest_ids=[interest.pk for interest in reversed(interests)])
+    monkeypatch.setattr(engine.model.photo_model, 'batch_extract_features', no_cnn)
+    scores = dict(engine.score_candidates(users[0], [user.pk for user in users[1:]]))
+    assert set(scores) == {users[1].pk, users[2].pk}
+
+    ratings = ratings_matrix(
+        [user.pk for user in users[:3]], engine.model.interest_ids, engine.model.interest_model.mean_
+    )
+    assert ratings[0, 0] == UserInterest.objects.get(user=users[0], interest=interests[2]).rating
+    expected = engine.model.batch_mutual_compatibility(features[0], ratings[0], features[1:], ratings[1:])
+    assert [scores[users[1].pk], scores[users[2].pk]] == pytest.approx(expected.tolist())
+
+
+@pytest.mark.django_db
+def test_engine_model_standardizes_with_population_stats():
+    interests = [Interest.objects.create(name=name, category='test') for name in ('music', 'sport', 'art')]
+    rng = np.random.default_rng(5)
+    for i in range(5):
+        user = User.objects.create_user(email=f'population{i}@example.com', password='x')
+        for interest in interests:
+            UserInterest.objects.create(user=user, interest=interest, rating=rng.uniform())
+
+    population = get_population_stats()
+    engine = MatchingEngine()
+    assert engine.model.interest_model.population is population
+
+    # Training on a sample keeps the population's standardization and column order
+    engine.model.fit_features(
+        rng.normal(size=(40, DIM)), rng.uniform(size=(40, 3)), rng.uniform(size=40), encoder_key=get_encoder().key
+    )
+    assert engine.model.interest_model.population is population
+    assert engine.model.interest_ids.tolist() == [interest.pk for interest in interests]
+
+
+@pytest.mark.django_db
+def test_engine_refuses_a_model_without_interest_ids():
+    user = User.objects.create_user(email='unscored@example.com', password='x')
+    engine = MatchingEngine()
+    engine.model = fitted_model()
+    with pytest.raises(ValueError):
+        engine.score_candidates(user, [user.pk + 1])
+
+
+def test_interest_ids_must_match_the_columns():
+    with pytest.raises(ValueError):
+        fitted_model(interest_ids=[1, 2])
+
+
+@pytest.mark.django_db
+def test_interest_ids_must_follow_the_population():
+    interests = [Interest.objects.create(name=name, category='test') for name in ('music', 'sport', 'art')]
+    user = User.objects.create_user(email='columns@example.com', password='x')
+    for interest in interests:
+        UserInterest.objects.create(user=user, interest=interest, rating=0.5)
+
+    rng = np.random.default_rng(6)
+    model = CompositeModel(get_population_stats())
+    with pytest.raises(ValueError):
+        model.fit_features(
+            rng.normal(size=(40, DIM)), rng.uniform(size=(40, 3)), rng.uniform(size=40),
+            encoder_key=get_encoder().key, interest_ids=[interest.pk for interest in reversed(interests)]
+        )
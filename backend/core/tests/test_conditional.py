@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Match, User, UserPreference
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email='etag@example.com', password='testpassword123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    token = RefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_details_not_modified_until_profile_changes(self, client):
+        url = reverse('user-details')
+        response = client.get(url, secure=True)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response['ETag']
+        assert 'Last-Modified' in response
+
+        response = client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
+        client.patch(url, {'bio': 'Updated bio'}, format='json', secure=True)
+        response = client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert response.json()['bio'] == 'Updated bio'
+
+    def test_preferences_write_invalidates_etag(self, client, user):
+        url = reverse('user-preferences')
+        etag = client.get(url, secure=True)['ETag']
+
+        UserPreference.objects.create(user=user, preferred_gender='F')
+        response = client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['preferred_gender'] == 'F'
+
+    def test_match_list_tracks_matched_profiles(self, client, user):
+        other = User.objects.create_user(email='other@example.com', password='testpassword123')
+        Match.objects.create(user=user, matched_user=other, compatibility_score=0.9)
+        url = reverse('match-list')
+        etag = client.get(url, secure=True)['ETag']
+        assert client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        other.bio = 'New bio'
+        other.save()
+        response = client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'][0]['matched_user']['bio'] == 'New bio'
+
+    def test_last_login_does_not_invalidate(self, client, user):
+        url = reverse('user-details')
+        etag = client.get(url, secure=True)['ETag']
+        user.save(update_fields=['last_login'])
+        assert client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,116 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from core.ai import ai_models, encoders
+from core.ai.embeddings import get_photo_embeddings
+from core.ai.encoders import ENCODERS, Encoder, find_encoder
+from core.models import Photo, PhotoEmbedding, PhotoRating, User
+
+
+@pytest.fixture
+def photos(settings, tmp_path):
+    """Calibration photos with source files under a throwaway BASE_DIR."""
+    settings.BASE_DIR = tmp_path
+    settings.PHOTO_ENCODER = 'mobilenet_v2'
+    os.makedirs(tmp_path / 'static' / 'calibration_photos' / 'male')
+    created = []
+    for _ in range(3):
+        photo = Photo.objects.create(gender='M')
+        with open(photo.calibration_path, 'wb') as f:
+            f.write(b'jpeg')
+        created.append(photo)
+    return created
+
+
+def bump_encoder(monkeypatch, name, retire=True):
+    current = ENCODERS[name]
+    monkeypatch.setitem(ENCODERS, name, Encoder(
+        name, current.version + 1, current.build, current.preprocess_input, current.input_size, current.dim
+    ))
+    if retire:
+        monkeypatch.setattr(encoders, 'RETIRED_ENCODERS', (*encoders.RETIRED_ENCODERS, current))
+    return ENCODERS[name]
+
+
+@pytest.mark.django_db
+class TestPhotoEmbeddings:
+    def test_stored_embeddings_are_reused(self, photos, embedder):
+        first, _ = get_photo_embeddings(photos)
+        second, valid = get_photo_embeddings(photos)
+
+        assert len(embedder.calls) == 1
+        assert np.array_equal(first, second)
+        assert valid == photos
+        assert PhotoEmbedding.objects.filter(encoder='mobilenet_v2', encoder_version=1).count() == 3
+
+    def test_new_encoder_version_gets_its_own_rows(self, photos, embedder, monkeypatch):
+        get_photo_embeddings(photos)
+        encoder = bump_encoder(monkeypatch, 'mobilenet_v2')
+        get_photo_embeddings(photos[:1])
+
+        assert len(embedder.calls) == 2
+        assert find_encoder('mobilenet_v2@1').version == 1
+        assert PhotoEmbedding.objects.filter(encoder_version=encoder.version).count() == 1
+        # Old rows stay until reembed_photos --prune, so nothing waits on a recompute
+        assert PhotoEmbedding.objects.filter(encoder_version=1).count() == 3
+
+    def test_retired_version_reuses_its_rows(self, photos, embedder, monkeypatch):
+        first, _ = get_photo_embeddings(photos)
+        bump_encoder(monkeypatch, 'mobilenet_v2')
+        second, valid = get_photo_embeddings(photos, find_encoder('mobilenet_v2@1'))
+
+        assert len(embedder.calls) == 1
+        assert np.array_equal(first, second)
+        assert valid == photos
+
+
+@pytest.mark.django_db
+class TestEncoderTaggedUserModels:
+    @pytest.fixture
+    def user(self, photos):
+        user = User.objects.create_user(email='encoder@example.com', password='testpassword123')
+        for index, photo in enumerate(photos):
+            PhotoRating.objects.create(user=user, photo=photo, rating=index + 1)
+        return user
+
+    def load_model(self, settings, user):
+        with open(os.path.join(settings.BASE_DIR, 'user_models', f'model_{user.id}.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def test_model_records_its_encoder(self, user, embedder, settings):
+        ai_models.train_user_model(user.id)
+        assert self.load_model(settings, user)['encoder'] == 'mobilenet_v2@1'
+
+    def test_retired_encoder_still_scores(self, user, embedder, monkeypatch, photos):
+        ai_models.train_user_model(user.id)
+        bump_encoder(monkeypatch, 'mobilenet_v2')
+        monkeypatch.setattr(ai_models, 'generate_pickup_line', lambda image_paths, user: 'hi')
+        names = []
+        monkeypatch.setattr(ai_models, 'embed_images', lambda name, paths: names.append(name) or embedder(name, paths))
+
+        result = ai_models.process_images([photos[0].calibration_path], user)
+        assert result['success']
+        # Embedded with the version the model was trained on
+        assert names == ['mobilenet_v2@1']
+
+    def test_unregistered_encoder_is_rejected_at_request_time(self, user, embedder, monkeypatch, photos):
+        ai_models.train_user_model(user.id)
+        bump_encoder(monkeypatch, 'mobilenet_v2', retire=False)
+
+        result = ai_models.process_images([photos[0].calibration_path], user)
+        assert result == {'success': False, 'message': 'Model is out of date. Please recalibrate.'}
+
+    def test_reembed_command_backfills_and_retrains(self, user, embedder, monkeypatch, settings):
+        ai_models.train_user_model(user.id)
+        encoder = bump_encoder(monkeypatch, 'mobilenet_v2')
+
+        call_command('reembed_photos', '--prune', stdout=open(os.devnull, 'w'))
+
+        assert self.load_model(settings, user)['encoder'] == encoder.key
+        assert set(PhotoEmbedding.objects.values_list('encoder_version', flat=True)) == {encoder.version}
+        # Retraining read the backfilled rows instead of embedding again
+        assert len(embedder.calls) == 2
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from django.conf import settings
+from PIL import Image
+
+from core.ai import backbones, faces
+from core.ai.encoders import ENCODERS, backbone_names
+
+SAMPLE_PHOTO = settings.BASE_DIR / 'static' / 'calibration_photos' / 'female' / '001323.jpg'
+
+
+@pytest.fixture
+def sample(tmp_path):
+    path = tmp_path / 'face.png'
+    Image.new('RGB', (200, 100), (120, 90, 60)).save(path)
+    return path
+
+
+def test_crop_box_is_cached_by_content(sample, monkeypatch):
+    calls = []
+
+    def detect(img):
+        calls.append(img.size)
+        return (50.0, 20.0, 40.0, 40.0, 10.0)
+
+    monkeypatch.setattr(faces, 'detect_face', detect)
+    first = faces.load_face_pixels(sample, (32, 32))
+    second = faces.load_face_pixels(sample, (64, 64))
+
+    assert calls == [(200, 100)]
+    assert first.shape == (32, 32, 3) and second.shape == (64, 64, 3)
+    assert first.dtype == np.uint8
+
+
+def test_no_face_falls_back_to_whole_frame(sample, monkeypatch):
+    monkeypatch.setattr(faces, 'detect_face', lambda img: None)
+    pixels = faces.load_face_pixels(sample, (16, 16))
+    assert pixels.shape == (16, 16, 3)
+    assert tuple(pixels[0, 0]) == (120, 90, 60)
+
+
+def test_detects_calibration_face():
+    pytest.importorskip('cv2')
+    with Image.open(SAMPLE_PHOTO) as img:
+        box = faces.detect_face(img.convert('RGB'))
+        width, height = img.size
+
+    assert box is not None
+    x, y, w, h, angle = box
+    assert 0 <= x < x + w <= width and 0 <= y < y + h <= height
+    assert abs(angle) < 45
+
+
+def test_face_encoder_shares_base_backbone(sample, monkeypatch):
+    seen = []
+    monkeypatch.setattr(faces, 'detect_face', lambda img: None)
+    monkeypatch.setattr(backbones.settings, 'INFERENCE_SOCKET', None, raising=False)
+    monkeypatch.setattr(backbones.settings, 'INFERENCE_BATCHING', False)
+    monkeypatch.setattr(backbones, 'load_backbone', lambda name: seen.append(name) or (lambda x: np.zeros((len(x), 4))))
+
+    vectors, valid = backbones.embed_images('mobilenet_v2_face', [sample])
+
+    assert seen == ['mobilenet_v2']
+    assert vectors.shape == (1, 4) and valid == [sample]
+    assert ENCODERS['mobilenet_v2_face'].key == 'mobilenet_v2_face@1'
+    assert 'mobilenet_v2_face' not in backbone_names()
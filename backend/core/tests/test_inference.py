@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.ai import backbones
+from core.ai.backbones import batching_stats, embed_pixels
+from core.ai.batching import MicroBatcher
+from core.ai.inference import InferenceClient, InferenceError, InferenceServer, get_inference_client
+from core.models import User
+
+
+class FakeBackbone:
+    """Stands in for a CNN: one 'embedding' per image, and every batch size is recorded."""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, pixels):
+        with self.lock:
+            self.batch_sizes.append(len(pixels))
+        return pixels.reshape(len(pixels), -1).mean(axis=1, keepdims=True).astype('float32')
+
+
+@pytest.fixture
+def backbone():
+    return FakeBackbone()
+
+
+@pytest.fixture
+def socket_path(tmp_path, backbone):
+    path = str(tmp_path / 'inference.sock')
+    server = InferenceServer(path, ['fake'], max_batch_size=16, max_wait=0.05, loader=lambda name: backbone)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def pixels(value, count=1):
+    return np.full((count, 224, 224, 3), value, dtype='uint8')
+
+
+class TestInferenceServer:
+    def test_concurrent_requests_share_a_forward_pass(self, socket_path, backbone):
+        client = InferenceClient(socket_path)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda value: client.embed('fake', pixels(value)), range(8)))
+
+        # Every caller gets back its own rows
+        assert [float(result[0, 0]) for result in results] == list(range(8))
+        assert sum(backbone.batch_sizes) == 8
+        assert max(backbone.batch_sizes) > 1
+
+    def test_multi_image_request(self, socket_path):
+        embeddings = InferenceClient(socket_path).embed('fake', np.concatenate([pixels(1), pixels(2, 2)]))
+        assert embeddings.shape == (3, 1)
+        assert embeddings[:, 0].tolist() == [1.0, 2.0, 2.0]
+
+    def test_unknown_backbone(self, socket_path):
+        client = InferenceClient(socket_path)
+        with pytest.raises(InferenceError):
+            client.embed('resnet', pixels(0))
+        # The connection stays usable after an error
+        assert client.embed('fake', pixels(3))[0, 0] == 3.0
+
+    def test_embed_pixels_uses_configured_socket(self, socket_path, backbone, settings):
+        settings.INFERENCE_SOCKET = socket_path
+        try:
+            assert embed_pixels('fake', pixels(5))[0, 0] == 5.0
+        finally:
+            get_inference_client.cache_clear()
+        assert backbone.batch_sizes == [1]
+
+
+class TestMicroBatcher:
+    def test_stats_report_latency_and_occupancy(self, backbone):
+        batcher = MicroBatcher(backbone, max_batch_size=4, max_wait=0.05)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda value: batcher(pixels(value)), range(4)))
+
+        stats = batcher.stats.snapshot()
+        assert stats['requests'] == 4
+        assert stats['batches'] == len(backbone.batch_sizes)
+        assert 0 < stats['occupancy'] <= 1
+        assert stats['p50_ms'] <= stats['p99_ms']
+
+    def test_errors_reach_every_caller(self):
+        def broken(batch):
+            raise RuntimeError('out of memory')
+
+        batcher = MicroBatcher(broken, max_wait=0)
+        with pytest.raises(RuntimeError):
+            batcher(pixels(0))
+
+    def test_in_process_embedding_is_batched(self, backbone, settings, monkeypatch):
+        settings.INFERENCE_SOCKET = None
+        settings.INFERENCE_MAX_WAIT_MS = 50
+        monkeypatch.setattr(backbones, 'load_backbone', lambda name: backbone)
+        monkeypatch.setattr(backbones, '_batchers', {})
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda value: embed_pixels('fake', pixels(value)), range(6)))
+        assert max(backbone.batch_sizes) > 1
+        assert batching_stats()['fake']['requests'] == 6
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_is_staff_only(socket_path, settings):
+    settings.INFERENCE_SOCKET = socket_path
+    staff = User.objects.create_user(email='staff@example.com', password='testpassword123', is_staff=True)
+    member = User.objects.create_user(email='member@example.com', password='testpassword123')
+    url = reverse('inference-stats')
+    try:
+        client = APIClient()
+        client.force_authenticate(member)
+        assert client.get(url, secure=True).status_code == 403
+        client.force_authenticate(staff)
+        response = client.get(url, secure=True)
+    finally:
+        get_inference_client.cache_clear()
+    assert response.status_code == 200
+    assert response.json() == {'fake': {'requests': 0, 'batches': 0}}
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from scipy.spatial.distance import cosine
+
+from core.ai import interest_matrix
+from core.ai.interest_matrix import InterestMatrix
+from core.ai.interest_stats import get_population_stats
+from core.ai.matching.engine import MatchingEngine
+from core.ai.models.interest_model import InterestModel, top_k
+from core.models import Interest, User, UserInterest
+
+
+def test_vectorized_similarity_matches_scipy_cosine():
+    rng = np.random.default_rng(0)
+    ratings = rng.random((50, 12))
+    model = InterestModel()
+    model.fit(ratings)
+
+    expected = [max(0, 1 - cosine(*model.transform(np.vstack([ratings[0], other])))) for other in ratings[1:]]
+    assert np.allclose(model.batch_calculate_similarity(ratings[0], ratings[1:]), expected)
+    assert model.calculate_similarity(ratings[0], ratings[1]) == pytest.approx(expected[0])
+
+    best, scores = model.top_matches(ratings[0], ratings[1:], k=5)
+    assert best.tolist() == np.argsort(expected)[::-1][:5].tolist()
+    assert np.allclose(scores, np.sort(expected)[::-1][:5])
+
+
+def test_top_k():
+    scores = np.array([0.2, 0.9, 0.1, 0.5, 0.9])
+    assert top_k(scores, 3).tolist() == [1, 4, 3]
+    assert top_k(scores, 10).tolist() == [1, 4, 3, 0, 2]
+    assert top_k(scores, 0).size == 0
+
+
+@pytest.fixture
+def ratings(db):
+    interests = [Interest.objects.create(name=name, category='test') for name in ('a', 'b', 'c')]
+    users = [User.objects.create_user(email=f'rater{i}@example.com', password='x') for i in range(4)]
+    table = [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0], [0.5, 0.0, 0.5]]
+    for user, row in zip(users, table):
+        for interest, rating in zip(interests, row):
+            if rating:
+                UserInterest.objects.create(user=user, interest=interest, rating=rating)
+    return users, interests
+
+
+def assert_matches_interest_model(ids, scores, population, user):
+    """The matrix's scores are InterestModel's similarities under the same population statistics."""
+    ratings = population.ratings_matrix([user.pk] + ids.tolist())
+    expected = InterestModel(population).batch_calculate_similarity(ratings[0], ratings[1:])
+    assert np.allclose(scores, expected, atol=1e-6)
+
+
+@pytest.mark.django_db
+def test_similar_users_and_incremental_updates(ratings, monkeypatch, django_capture_on_commit_callbacks):
+    users, interests = ratings
+    monkeypatch.setattr(interest_matrix, '_matrix', None)
+    population = get_population_stats()
+    engine = MatchingEngine(population)
+    ids, scores = engine.similar_by_interests(users[0], k=3)
+    matrix = interest_matrix._matrix
+    assert matrix.population is population
+    assert sorted(ids.tolist()) == sorted(user.pk for user in users[1:])
+    assert_matches_interest_model(ids, scores, population, users[0])
+
+    # A changed rating is picked up without a rebuild
+    d = Interest.objects.create(name='d', category='test')
+    with django_capture_on_commit_callbacks(execute=True):
+        UserInterest.objects.filter(user=users[2], interest=interests[1]).delete()
+        UserInterest.objects.create(user=users[2], interest=interests[0], rating=1.0)
+        UserInterest.objects.create(user=users[1], interest=d, rating=1.0)
+        # Nothing is marked stale before the writes commit
+        assert not matrix._stale
+
+    ids, scores = engine.similar_by_interests(users[0], k=3)
+    assert interest_matrix._matrix is matrix
+    rebuilt_ids, rebuilt_scores = InterestMatrix.build(population).similar_users(users[0].pk, k=3)
+    assert ids[0] == users[2].pk and scores[0] == pytest.approx(1.0)
+    assert ids.tolist() == rebuilt_ids.tolist()
+    assert np.allclose(scores, rebuilt_scores)
+    assert_matches_interest_model(ids, scores, population, users[0])
+    # Interest d has no statistics in this population, so it waits for a rebuild
+    assert matrix.shape == (4, 3)
+
+    ids, _ = matrix.similar_users(users[0].pk, k=5, candidate_ids=[users[3].pk, users[0].pk, 999])
+    assert ids.tolist() == [users[3].pk]
+    assert matrix.similar_users(999)[0].size == 0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from core.ai.interest_stats import get_population_stats, rebuild_interest_stats
+from core.ai.models.interest_model import InterestModel
+from core.models import Interest, InterestStats, User, UserInterest
+
+
+@pytest.fixture
+def interests(db):
+    return [Interest.objects.create(name=name, category='test') for name in ('music', 'sport', 'art')]
+
+
+@pytest.fixture
+def users(db):
+    return [User.objects.create_user(email=f'stats{i}@example.com', password='x') for i in range(5)]
+
+
+def table_stats(interest):
+    ratings = np.array(UserInterest.objects.filter(interest=interest).values_list('rating', flat=True))
+    return len(ratings), ratings.mean(), ratings.var()
+
+
+@pytest.mark.django_db
+def test_welford_updates_follow_every_write(interests, users):
+    music, sport, _ = interests
+    rows = [
+        UserInterest.objects.create(user=user, interest=music, rating=rating)
+        for user, rating in zip(users, [0.1, 0.5, 0.9, 0.4, 1.0])
+    ]
+    rows[0].rating = 0.7
+    rows[0].save()
+    rows[1].interest = sport
+    rows[1].save()
+    rows[2].delete()
+
+    for interest in (music, sport):
+        stats = InterestStats.objects.get(interest=interest)
+        count, mean, variance = table_stats(interest)
+        assert stats.count == count
+        assert stats.mean == pytest.approx(mean)
+        assert stats.variance == pytest.approx(variance)
+
+    before = {stats.pk: (stats.count, stats.mean, stats.m2) for stats in InterestStats.objects.all()}
+    assert rebuild_interest_stats() == 3
+    after = {stats.pk: (stats.count, stats.mean, stats.m2) for stats in InterestStats.objects.all()}
+    assert after[music.pk] == pytest.approx(before[music.pk])
+    assert after[sport.pk] == pytest.approx(before[sport.pk])
+
+
+@pytest.mark.django_db
+def test_population_transform_matches_a_fitted_scaler(
+    interests, users, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    rng = np.random.default_rng(1)
+    ratings = rng.random((len(users), len(interests)))
+    for user, row in zip(users, ratings):
+        for interest, rating in zip(interests, row):
+            UserInterest.objects.create(user=user, interest=interest, rating=rating)
+
+    population = get_population_stats()
+    assert population.interest_ids.tolist() == [interest.pk for interest in interests]
+    matrix = population.ratings_matrix([user.pk for user in users])
+    assert np.allclose(matrix, ratings)
+    model = InterestModel(population)
+    assert np.allclose(model.transform(matrix), StandardScaler().fit_transform(ratings))
+
+    # Current arrays are reused without touching the database...
+    with django_assert_num_queries(0):
+        assert get_population_stats() is population
+    # ...until a write moves the version on
+    with django_capture_on_commit_callbacks(execute=True):
+        UserInterest.objects.get(user=users[0], interest=interests[0]).delete()
+    assert get_population_stats().version > population.version
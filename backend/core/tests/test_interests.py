@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.interests import InterestIndex, set_profile_interests, users_sharing_interests
+from core.models import Interest, ProfileInterest, User
+
+
+def make_user(name, likes=(), dislikes=()):
+    user = User.objects.create_user(email=f'{name}@example.com', password='x')
+    set_profile_interests(user, list(likes), list(dislikes))
+    user.save()
+    return user
+
+
+def profile_kinds(user):
+    return dict(ProfileInterest.objects.filter(user=user).values_list('interest__name', 'kind'))
+
+
+@pytest.mark.django_db
+class TestProfileInterests:
+    def test_patch_normalizes_and_stores_rows(self):
+        user = User.objects.create_user(email='hiker@example.com', password='x')
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('user-details')
+
+        response = client.patch(url, {'likes': ['Hiking', '  Hiking ', 'board  games'], 'dislikes': ['Noise']},
+                                format='json', secure=True)
+        assert response.status_code == 200
+        assert response.json()['user']['likes'] == ['Hiking', 'board games']
+        assert profile_kinds(user) == {'Hiking': 'L', 'board games': 'L', 'Noise': 'D'}
+
+        # Disliking a liked interest moves it, and an untouched list keeps its other names
+        response = client.patch(url, {'dislikes': ['Hiking']}, format='json', secure=True)
+        assert response.json()['user']['likes'] == ['board games']
+        assert profile_kinds(user) == {'Hiking': 'D', 'board games': 'L'}
+        assert Interest.objects.filter(name='Noise').exists()
+
+        response = client.patch(url, {'likes': ['Jazz'], 'dislikes': ['Jazz']}, format='json', secure=True)
+        assert response.status_code == 400
+
+    def test_users_sharing_interests(self):
+        me = make_user('me', likes=['a', 'b', 'c'])
+        two = make_user('two', likes=['a', 'b', 'z'])
+        three = make_user('three', likes=['c', 'b', 'a'])
+        make_user('one', likes=['a'], dislikes=['b', 'c'])
+
+        shared = list(users_sharing_interests(me, min_shared=2))
+        assert shared == [{'user': three.pk, 'shared': 3}, {'user': two.pk, 'shared': 2}]
+
+        index = InterestIndex.build()
+        ids = list(me.interests.values_list('id', flat=True))
+        users, counts = index.shared_counts(ids, min_shared=2)
+        assert dict(zip(users.tolist(), counts.tolist())) == {me.pk: 3, two.pk: 2, three.pk: 3}
+        a, z = Interest.objects.get(name='a').pk, Interest.objects.get(name='z').pk
+        assert index.overlap(index.users(a), index.users(z)).tolist() == [two.pk]
+        assert np.array_equal(index.users(-1), np.empty(0))
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Match, User
+
+
+def make_matches(user, count):
+    start = user.matches_as_user.count()
+    for i in range(start, start + count):
+        other = User.objects.create_user(
+            email=f'match{user.pk}-{i}@example.com', password='testpassword123', first_name=f'Match {i}'
+        )
+        Match.objects.create(user=user, matched_user=other, compatibility_score=0.5 + i / 100)
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email='matcher@example.com', password='testpassword123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestMatchList:
+    def test_query_count_does_not_grow_with_matches(self, client, user, django_assert_max_num_queries):
+        url = reverse('match-list')
+        make_matches(user, 2)
+        with django_assert_max_num_queries(4):
+            response = client.get(url, secure=True)
+        assert len(response.json()['results']) == 2
+
+        make_matches(user, 10)
+        with django_assert_max_num_queries(4):
+            response = client.get(url, secure=True)
+        assert len(response.json()['results']) == 12
+
+    def test_cursor_pagination(self, client, user):
+        make_matches(user, 5)
+        response = client.get(reverse('match-list'), {'page_size': 3}, secure=True).json()
+        assert len(response['results']) == 3
+        assert response['next']
+
+        second = client.get(response['next'], secure=True).json()
+        assert len(second['results']) == 2
+        assert second['next'] is None
+        ids = [m['id'] for m in response['results'] + second['results']]
+        assert len(set(ids)) == 5
+
+    def test_card_view_is_flat(self, client, user):
+        make_matches(user, 1)
+        card = client.get(reverse('match-list'), {'view': 'card'}, secure=True).json()['results'][0]
+        assert card['first_name'] == 'Match 0'
+        assert 'matched_user' not in card
+        assert set(card) >= {'id', 'matched_user_id', 'status', 'compatibility_score'}
+        assert client.get(reverse('match-list'), secure=True).status_code == status.HTTP_200_OK
+
+    def test_stream_export_for_staff(self, client, user):
+        make_matches(user, 3)
+        user.is_staff = True
+        user.save(update_fields=['is_staff'])
+
+        response = client.get(reverse('match-list'), {'stream': '1'}, secure=True)
+        assert response.streaming
+        assert len(json.loads(b''.join(response.streaming_content))) == 3
+
+    def test_stream_ignored_for_regular_users(self, client, user):
+        make_matches(user, 1)
+        response = client.get(reverse('match-list'), {'stream': '1'}, secure=True)
+        assert not response.streaming
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Photo, User
+
+
+def authenticated_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+@pytest.fixture
+def photos(db):
+    return [Photo.objects.create(id=i, gender='M' if i % 2 else 'F') for i in range(1, 8)]
+
+
+@pytest.mark.django_db
+class TestPhotoList:
+    def test_cursor_pagination_with_gender_filter(self, photos):
+        client = authenticated_client(User.objects.create_user(email='photos@example.com', password='x'))
+        url = reverse('photo-list')
+        page = client.get(url, {'gender': 'M', 'page_size': 2}, secure=True).json()
+        seen = [p['id'] for p in page['results']]
+        while page['next']:
+            page = client.get(page['next'], secure=True).json()
+            seen += [p['id'] for p in page['results']]
+        assert sorted(seen) == [1, 3, 5, 7]
+        assert page['results'][0]['image_url'].startswith('/static/calibration_photos/male/')
+
+    def test_stream_export_for_staff(self, photos):
+        staff = User.objects.create_user(email='staff@example.com', password='x', is_staff=True)
+        response = authenticated_client(staff).get(reverse('photo-list'), {'stream': '1'}, secure=True)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        rows = json.loads(b''.join(response.streaming_content))
+        assert [row['id'] for row in rows] == [7, 6, 5, 4, 3, 2, 1]
+
+    def test_stream_export_is_async_under_asgi(self, photos):
+        staff = User.objects.create_user(email='asgi-staff@example.com', password='x', is_staff=True)
+        token = RefreshToken.for_user(staff).access_token
+
+        async def export():
+            response = await AsyncClient().get(
+                reverse('photo-list'), {'stream': '1'}, secure=True, headers={'Authorization': f'Bearer {token}'},
+            )
+            assert response.is_async
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        rows = json.loads(async_to_sync(export)())
+        assert [row['id'] for row in rows] == [7, 6, 5, 4, 3, 2, 1]
+
+    def test_catalogue_is_read_only(self, photos):
+        client = authenticated_client(User.objects.create_user(email='writer@example.com', password='x'))
+        response = client.post(reverse('photo-list'), {'gender': 'M'}, secure=True)
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+        response = client.delete(reverse('photo-detail', args=[1]), secure=True)
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_stream_ignored_for_regular_users(self, photos):
+        client = authenticated_client(User.objects.create_user(email='regular@example.com', password='x'))
+        response = client.get(reverse('photo-list'), {'stream': '1'}, secure=True)
+        assert not response.streaming
+        assert 'results' in response.json()
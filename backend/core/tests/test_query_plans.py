@@ -0,0 +1,28 @@
+import pytest
+from django.db import connection
+
+from core.interests import users_sharing_interests
+from core.models import Match, Photo, PhotoRating, UserPhoto
+
+
+def plan(queryset):
+    if connection.vendor == 'postgresql':
+        # Tables this small are always seq-scanned otherwise; ask whether an index *can* serve the query
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+HOT_QUERIES = {
+    'photos_gender_created_idx': lambda: Photo.objects.filter(gender='F').order_by('-created_at', '-id')[:20],
+    'matches_user_created_idx': lambda: Match.objects.filter(user_id=1).order_by('-created_at', '-id')[:20],
+    'photo_ratings_user_created_idx': lambda: PhotoRating.objects.filter(user_id=1).order_by('created_at'),
+    'user_photos_position_idx': lambda: UserPhoto.objects.filter(user_id=1),
+    'profile_interests_inverted_idx': lambda: users_sharing_interests(1, min_shared=2),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('index', HOT_QUERIES)
+def test_hot_query_uses_index(index):
+    assert index in plan(HOT_QUERIES[index]())
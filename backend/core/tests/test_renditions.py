@@ -0,0 +1,65 @@
+import io
+import os
+
+import pytest
+from django.core.management import call_command
+from PIL import Image
+
+from core.renditions import downscale
+
+
+@pytest.fixture
+def raw(settings, tmp_path):
+    settings.BASE_DIR = tmp_path / 'backend'
+    for gender_dir in ('male', 'female'):
+        os.makedirs(tmp_path / 'raw' / gender_dir)
+    Image.new('RGB', (1600, 1200), (200, 30, 30)).save(tmp_path / 'raw' / 'male' / '000001.jpg', quality=95)
+    Image.new('RGB', (300, 600), (30, 30, 200)).save(tmp_path / 'raw' / 'female' / '000002.png')
+    with open(tmp_path / 'raw' / 'female' / '000003.jpg', 'wb') as f:
+        f.write(b'not a jpeg')
+    return tmp_path
+
+
+def preprocess(raw, *args):
+    out = io.StringIO()
+    call_command(
+        'preprocess_photos', '--input', str(raw / 'raw'), '--state', str(raw / 'state.json'), '--workers', '1', *args,
+        stdout=out,
+    )
+    return out.getvalue()
+
+
+def size_of(path):
+    with Image.open(path) as img:
+        return img.size
+
+
+def test_downscale_reduces_then_resizes_exactly():
+    assert downscale(Image.new('RGB', (1000, 700)), (224, 224)).size == (224, 224)
+    assert downscale(Image.new('RGB', (300, 200)), (150, 100)).size == (150, 100)
+
+
+def test_renders_every_rendition_once(raw):
+    output = preprocess(raw)
+    backend = raw / 'backend'
+
+    assert 'Rendered 2, skipped 0 unchanged, failed 1' in output
+    assert '000003.jpg' in output
+    assert size_of(backend / 'static' / 'calibration_photos' / 'male' / '000001.jpg') == (800, 600)
+    assert size_of(backend / 'static' / 'calibration_photos' / 'thumbnails' / 'male' / '000001.jpg') == (160, 120)
+    assert size_of(backend / 'model_inputs' / 'male' / '000001.jpg') == (224, 224)
+    # Small inputs are never upscaled
+    assert size_of(backend / 'static' / 'calibration_photos' / 'female' / '000002.jpg') == (300, 600)
+
+    assert 'Rendered 0, skipped 2 unchanged, failed 1' in preprocess(raw)
+
+
+def test_changed_and_touched_inputs(raw):
+    preprocess(raw)
+    source = raw / 'raw' / 'male' / '000001.jpg'
+    os.utime(source, (0, 0))
+    assert 'Rendered 0, skipped 2' in preprocess(raw)
+
+    Image.new('RGB', (1600, 1200), (30, 200, 30)).save(source, quality=95)
+    assert 'Rendered 1, skipped 1' in preprocess(raw)
+    assert 'Rendered 2, skipped 0' in preprocess(raw, '--force')
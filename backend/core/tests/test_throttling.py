@@ -0,0 +1,52 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ThrottleCounter
+from core.throttling import CacheThrottleStore, DatabaseThrottleStore
+
+
+@pytest.mark.django_db
+class TestAuthRateThrottle:
+    def test_login_limited_per_window(self):
+        client = APIClient()
+        url = reverse('login')
+        payload = {'email': 'nobody@example.com', 'password': 'wrong-password'}
+        with mock.patch('core.throttling.SharedRateThrottleMixin.timer', return_value=120.0):
+            for _ in range(5):
+                assert client.post(url, payload, secure=True).status_code == status.HTTP_401_UNAUTHORIZED
+            response = client.post(url, payload, secure=True)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response['Retry-After'] == '60'
+
+        # A new window starts from zero
+        with mock.patch('core.throttling.SharedRateThrottleMixin.timer', return_value=180.0):
+            assert client.post(url, payload, secure=True).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestThrottleStores:
+    def test_database_store_counts_and_prunes_windows(self):
+        store = DatabaseThrottleStore()
+        assert [store.incr('throttle_anon_1.2.3.4:10', 60) for _ in range(3)] == [1, 2, 3]
+        assert store.incr('throttle_anon_1.2.3.4:11', 60) == 1
+        assert list(ThrottleCounter.objects.values_list('window', 'count')) == [(11, 1)]
+
+    def test_database_store_prunes_expired_windows_of_every_key(self):
+        store = DatabaseThrottleStore()
+        with mock.patch('core.throttling.time.time', return_value=600.0):
+            store.incr('throttle_anon_1.2.3.4:9', 60)
+            store.incr('throttle_anon_5.6.7.8:9', 60)
+        with mock.patch('core.throttling.time.time', return_value=700.0):
+            store.incr('throttle_anon_9.9.9.9:11', 60)
+        assert list(ThrottleCounter.objects.values_list('key', flat=True)) == ['throttle_anon_9.9.9.9']
+
+    def test_cache_store(self):
+        cache.clear()
+        store = CacheThrottleStore()
+        assert [store.incr('throttle_user_1:5', 60) for _ in range(3)] == [1, 2, 3]
+        assert store.incr('throttle_user_2:5', 60) == 1
@@ -0,0 +1,146 @@
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import uploads
+from core.models import User, UserPhoto
+
+
+@pytest.fixture
+def user(db, settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PHOTO_PROCESSING = 'inline'
+    monkeypatch.setattr(uploads, '_embed', lambda path: (b'\x00' * 16, 'fake@1'))
+    return User.objects.create_user(email='uploader@example.com', password='testpassword123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def jpeg(size=(1200, 900), exif=None):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (180, 40, 40)).save(buffer, 'JPEG', exif=exif or Image.Exif())
+    return SimpleUploadedFile('upload.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+def upload(client, file, capture):
+    with capture(execute=True):
+        return client.post(reverse('user-photos'), {'photo': file}, format='multipart', secure=True)
+
+
+def test_upload_is_processed_in_the_background(client, user, django_capture_on_commit_callbacks):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90° clockwise to display
+    exif[0x010F] = 'PhoneMaker'
+    response = upload(client, jpeg(exif=exif), django_capture_on_commit_callbacks)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()['status'] == 'pending'
+    detail = client.get(response.json()['status_url'], secure=True).json()
+    assert detail['status'] == 'ready'
+
+    photo = UserPhoto.objects.get(pk=detail['id'])
+    assert not photo.original
+    assert photo.embedding == b'\x00' * 16
+    with Image.open(photo.image.path) as img:
+        # Orientation is applied to the pixels and the metadata dropped
+        assert img.size == (600, 800)
+        assert not img.getexif()
+    with Image.open(photo.thumbnail.path) as img:
+        assert max(img.size) == 160
+    assert not default_storage.listdir(f'user_photos/originals/{user.pk}')[1]
+
+    user.refresh_from_db()
+    assert user.profile_photo == detail['image_url']
+
+
+def test_rejects_non_images(client, django_capture_on_commit_callbacks):
+    file = SimpleUploadedFile('photo.jpg', b'<?php echo 1; ?>' * 10, content_type='image/jpeg')
+    response = upload(client, file, django_capture_on_commit_callbacks)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not UserPhoto.objects.exists()
+
+
+def test_rejects_oversized_uploads(client, settings, django_capture_on_commit_callbacks):
+    settings.USER_PHOTO_MAX_BYTES = 1024
+    response = upload(client, jpeg(), django_capture_on_commit_callbacks)
+    assert response.status_code in (status.HTTP_400_BAD_REQUEST, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    assert not UserPhoto.objects.exists()
+
+
+def test_photo_limit_and_profile_handover(client, user, django_capture_on_commit_callbacks):
+    for _ in range(6):
+        assert upload(client, jpeg((400, 300)), django_capture_on_commit_callbacks).status_code == 202
+    assert upload(client, jpeg((400, 300)), django_capture_on_commit_callbacks).status_code == 400
+
+    first, second = UserPhoto.objects.filter(user=user)[:2]
+    assert (first.position, second.position) == (0, 1)
+    user.refresh_from_db()
+    assert user.primary_photo == first
+    assert user.profile_photo == first.image.url
+
+    response = client.delete(reverse('user-photo-detail', args=[first.pk]), secure=True)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not default_storage.exists(first.image.name)
+    user.refresh_from_db()
+    assert user.primary_photo == second
+    assert user.profile_photo == second.image.url
+
+
+def test_reordering_moves_the_profile_photo(client, user, django_capture_on_commit_callbacks):
+    ids = [upload(client, jpeg((400, 300)), django_capture_on_commit_callbacks).json()['id'] for _ in range(3)]
+    url = reverse('user-photos')
+
+    assert client.patch(url, {'order': ids[:2]}, format='json', secure=True).status_code == 400
+    response = client.patch(url, {'order': ids[::-1]}, format='json', secure=True)
+    assert response.status_code == status.HTTP_200_OK
+    assert [photo['id'] for photo in response.json()] == ids[::-1]
+    assert [photo['position'] for photo in response.json()] == [0, 1, 2]
+
+    user.refresh_from_db()
+    assert user.primary_photo_id == ids[2]
+    assert user.profile_photo == response.json()[0]['image_url']
+
+
+def test_reordering_is_only_on_the_list_url(client, user, django_capture_on_commit_callbacks):
+    photo_id = upload(client, jpeg((400, 300)), django_capture_on_commit_callbacks).json()['id']
+    url = reverse('user-photo-detail', args=[photo_id])
+    response = client.patch(url, {'order': [photo_id]}, format='json', secure=True)
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+def test_photo_changes_invalidate_the_profile_etag(client, user, django_capture_on_commit_callbacks):
+    # A token client, so each request reads the user's current version
+    reader = APIClient()
+    reader.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    url = reverse('user-details')
+
+    def etag_changed(etag):
+        response = reader.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        return response.status_code == status.HTTP_200_OK, response['ETag']
+
+    etag = reader.get(url, secure=True)['ETag']
+    photo_ids = []
+    for _ in range(2):
+        photo_ids.append(upload(client, jpeg((400, 300)), django_capture_on_commit_callbacks).json()['id'])
+        changed, etag = etag_changed(etag)
+        assert changed
+
+    client.patch(reverse('user-photos'), {'order': photo_ids[::-1]}, format='json', secure=True)
+    changed, etag = etag_changed(etag)
+    assert changed
+
+    UserPhoto.objects.get(pk=photo_ids[1]).delete()
+    changed, etag = etag_changed(etag)
+    assert changed
@@ -1,5 +1,150 @@
-from rest_framework.throttling import AnonRateThrottle
+# backend/core/throttling.py
+
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+from rest_framework import throttling
+
+from .models import ThrottleCounter
+
+
+class CacheThrottleStore:
+    """Fixed-window counters in a Django cache.
+
+    ``incr`` is a single atomic command on Redis and memcached, so limits hold
+    across every worker sharing that cache. On the per-process LocMem cache
+    they only hold per process.
+    """
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+    def incr(self, key, ttl):
+        """Increment the counter for ``key`` and return its new value."""
+        self.cache.add(key, 0, timeout=ttl)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # The window expired between add() and incr()
+            self.cache.add(key, 1, timeout=ttl)
+            return 1
+
+
+class DatabaseThrottleStore:
+    """Fixed-window counters in the ThrottleCounter table, shared by every worker.
+
+    Each hit is one ``UPDATE ... SET count = count + 1`` plus a primary-key
+    style read of the new value. Only the first hit of a window inserts a row
+    and clears that key's older windows. At most once per ``prune_interval``
+    seconds per process, that first hit also deletes every key's expired
+    windows, so one-off clients such as anonymous IPs don't pile up.
+    """
+
+    prune_interval = 60
+
+    def __init__(self):
+        self._next_prune = 0
+
+    def incr(self, key, ttl):
+        key, window = key.rsplit(':', 1)
+        counters = ThrottleCounter.objects.filter(key=key, window=window)
+        if counters.update(count=F('count') + 1):
+            return counters.values_list('count', flat=True).first()
+        self.prune()
+        try:
+            with transaction.atomic():
+                ThrottleCounter.objects.create(key=key, window=window, count=1, expires=(int(window) + 1) * ttl)
+        except IntegrityError:
+            # Another worker opened the window first
+            counters.update(count=F('count') + 1)
+            return counters.values_list('count', flat=True).first()
+        ThrottleCounter.objects.filter(key=key, window__lt=window).delete()
+        return 1
+
+    def prune(self):
+        """Delete every expired window, unless this process did so within prune_interval."""
+        now = time.time()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.prune_interval
+        ThrottleCounter.objects.filter(expires__lt=now).delete()
+
+
+class LocalThrottleStore:
+    """In-memory counters for tests and single-process development servers."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def incr(self, key, ttl):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            return self._counts[key]
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+@lru_cache(maxsize=None)
+def load_throttle_store(path):
+    return import_string(path)()
+
+
+def get_throttle_store():
+    """Return the store configured by settings.THROTTLE_STORE."""
+    return load_throttle_store(getattr(settings, 'THROTTLE_STORE', 'core.throttling.CacheThrottleStore'))
+
+
+class SharedRateThrottleMixin:
+    """Fixed-window rate limiting over a shared counter store.
+
+    It replaces DRF's per-client timestamp history with one atomic increment
+    per request. Each window key encodes its start, so nothing has to be
+    rewritten or trimmed.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.window_end = (window + 1) * self.duration
+        count = get_throttle_store().incr(f'{self.key}:{window}', self.duration)
+        return count <= self.num_requests
+
+    def wait(self):
+        return max(self.window_end - self.now, 0)
+
+    def timer(self):
+        return time.time()
+
+
+class AnonRateThrottle(SharedRateThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SharedRateThrottleMixin, throttling.UserRateThrottle):
+    pass
+
+
+class PickupLineRateThrottle(UserRateThrottle):
+    """Caps pickup lines, each of which costs paid Azure and OpenAI calls."""
+    scope = 'pickup_line'
+
 
 class AuthRateThrottle(AnonRateThrottle):
     rate = '5/minute'
-    scope = 'auth' 
\ No newline at end of file
+    scope = 'auth'
@@ -0,0 +1,248 @@
+# backend/core/uploads.py
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.db import connections, transaction
+from django.db.models import Case, F, Max, PositiveSmallIntegerField, When
+from django.utils import timezone
+from PIL import Image
+
+from .authentication import user_cache
+from .models import User, UserPhoto
+from .renditions import render
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of the formats we accept, checked before anything is decoded
+IMAGE_SIGNATURES = {
+    'jpeg': lambda header: header.startswith(b'\xff\xd8\xff'),
+    'png': lambda header: header.startswith(b'\x89PNG\r\n\x1a\n'),
+    'webp': lambda header: header[:4] == b'RIFF' and header[8:12] == b'WEBP',
+}
+EXTENSIONS = {'jpeg': 'jpg', 'png': 'png', 'webp': 'webp'}
+# Renditions kept for every user photo; the embedding is taken from 'display'
+USER_PHOTO_RENDITIONS = ('display', 'thumbnail')
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Stream every upload to a temporary file, dropping files over USER_PHOTO_MAX_BYTES mid-stream.
+
+    Unlike the default handlers nothing is buffered in memory, and an
+    oversized body is not written to disk in full before being rejected.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.USER_PHOTO_MAX_BYTES:
+            self.file.close()
+            raise SkipFile()
+        return super().receive_data_chunk(raw_data, start)
+
+
+def sniff_image(uploaded):
+    """Check an upload's magic bytes and header without decoding any pixels.
+
+    Returns:
+        tuple: (format name, (width, height))
+
+    Raises:
+        InvalidImage: If it is not a JPEG, PNG or WebP of acceptable dimensions
+    """
+    uploaded.seek(0)
+    header = uploaded.read(16)
+    image_format = next((name for name, matches in IMAGE_SIGNATURES.items() if matches(header)), None)
+    if image_format is None:
+        raise InvalidImage('Unsupported file type. Upload a JPEG, PNG or WebP image.')
+
+    uploaded.seek(0)
+    try:
+        with Image.open(uploaded) as img:
+            # Image.open only parses the header
+            size = img.size
+    except (OSError, Image.DecompressionBombError):
+        raise InvalidImage('The image could not be read.')
+    if size[0] * size[1] > settings.USER_PHOTO_MAX_PIXELS:
+        raise InvalidImage('The image has too many pixels.')
+    return image_format, size
+
+
+def photos_changed(user_id):
+    """Bump the owner's data version, since profiles and match lists embed their photos."""
+    User.bump_data_version(user_id)
+    user_cache.evict(user_id)
+
+
+def store_upload(user, uploaded, image_format):
+    """Save a validated upload as a pending UserPhoto and queue its processing.
+
+    Temporary uploads are moved into storage rather than copied.
+    """
+    name = default_storage.save(
+        f'user_photos/originals/{user.pk}/{uuid.uuid4().hex}.{EXTENSIONS[image_format]}', uploaded
+    )
+    last = UserPhoto.objects.filter(user=user).aggregate(last=Max('position'))['last']
+    photo = UserPhoto.objects.create(user=user, original=name, position=0 if last is None else last + 1)
+    photos_changed(user.pk)
+    enqueue(photo.pk)
+    return photo
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PHOTO_PROCESSING_WORKERS, thread_name_prefix='photo-processing'
+            )
+        return _executor
+
+
+def _run_in_thread(photo_id):
+    try:
+        process_user_photo(photo_id)
+    except Exception:
+        logger.exception('Processing user photo %s failed', photo_id)
+    finally:
+        # Pool threads outlive the job; don't leave their connections open
+        connections.close_all()
+
+
+def enqueue(photo_id):
+    """Process a photo once the surrounding transaction commits, as settings.PHOTO_PROCESSING says."""
+    mode = settings.PHOTO_PROCESSING
+    if mode == 'thread':
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, photo_id))
+    elif mode == 'inline':
+        transaction.on_commit(lambda: process_user_photo(photo_id))
+    # 'off': manage.py process_user_photos picks it up
+
+
+def _embed(path):
+    from .ai.backbones import embed_images
+    from .ai.encoders import get_encoder
+
+    encoder = get_encoder()
+    vectors, _ = embed_images(encoder.name, [path])
+    if vectors is None:
+        return None, ''
+    return vectors[0].astype(np.float32).tobytes(), encoder.key
+
+
+def process_user_photo(photo_id):
+    """Re-encode, strip metadata from, render and embed one uploaded photo.
+
+    Claims the photo first, so concurrent workers never process it twice.
+
+    Returns:
+        bool: Whether this call processed the photo
+    """
+    claimed = UserPhoto.objects.filter(pk=photo_id, status='pending').update(
+        status='processing', started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+    photo = UserPhoto.objects.select_related('user').get(pk=photo_id)
+
+    base = f'user_photos/{photo.user_id}/{photo.pk}-{uuid.uuid4().hex[:8]}'
+    names = {rendition: f'{base}-{rendition}.jpg' for rendition in USER_PHOTO_RENDITIONS}
+    result = {'processed_at': timezone.now()}
+    try:
+        with photo.original.open('rb') as f:
+            data = f.read()
+        render(data, {rendition: default_storage.path(name) for rendition, name in names.items()})
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning('Could not process user photo %s: %s', photo_id, e)
+        result.update(status='failed', error='The image could not be processed.')
+    else:
+        result.update(status='ready', image=names['display'], thumbnail=names['thumbnail'])
+        try:
+            result['embedding'], result['encoder'] = _embed(default_storage.path(names['display']))
+        except Exception:
+            # The photo is still usable without one
+            logger.exception('Could not embed user photo %s', photo_id)
+
+    # The original still carries the uploader's EXIF metadata
+    photo.original.delete(save=False)
+    # update() rather than save(), which would re-insert a photo deleted meanwhile
+    if not UserPhoto.objects.filter(pk=photo.pk).update(original='', **result):
+        for name in names.values():
+            default_storage.delete(name)
+        return True
+
+    photos_changed(photo.user_id)
+    if result['status'] == 'ready':
+        sync_profile_photo(photo.user)
+    return True
+
+
+def sync_profile_photo(user):
+    """Point the user's denormalized profile photo at their first ready photo.
+
+    A profile_photo URL set some other way is only replaced once the user has
+    an uploaded photo to show instead.
+    """
+    photo = UserPhoto.objects.filter(user=user, status='ready').only('image').first()
+    if photo is None and user.primary_photo_id is None:
+        return
+    url = photo.image.url if photo else None
+    if (user.primary_photo_id, user.profile_photo) != (photo and photo.pk, url):
+        user.primary_photo = photo
+        user.profile_photo = url
+        user.save(update_fields=['primary_photo', 'profile_photo'])
+
+
+def reorder_user_photos(user, photo_ids):
+    """Renumber the user's photos in the given order, which must list each of them once.
+
+    Raises:
+        ValueError: If photo_ids isn't exactly the user's photos
+    """
+    with transaction.atomic():
+        # Locked, so the check and the renumbering see the same photos
+        current = set(UserPhoto.objects.select_for_update().filter(user=user).values_list('id', flat=True))
+        if len(photo_ids) != len(current) or set(photo_ids) != current:
+            raise ValueError('The order must list each of your photos exactly once.')
+        UserPhoto.objects.filter(user=user).update(
+            position=Case(
+                *(When(pk=pk, then=position) for position, pk in enumerate(photo_ids)),
+                # A photo uploaded since the lock was taken keeps its place
+                default=F('position'),
+                output_field=PositiveSmallIntegerField(),
+            )
+        )
+        photos_changed(user.pk)
+        sync_profile_photo(user)
+
+
+def requeue_stalled(older_than=timedelta(minutes=10)):
+    """Return photos stuck in 'processing', e.g. after a worker crashed, to the queue."""
+    return UserPhoto.objects.filter(
+        status='processing', started_at__lt=timezone.now() - older_than
+    ).update(status='pending')
+
+
+def delete_user_photo(photo):
+    """Delete a photo and its files, handing the profile photo to the next ready one if needed."""
+    # SET_NULL clears primary_photo in the database only, so the user still holds the old pointer
+    was_primary = photo.user.primary_photo_id == photo.pk
+    for field in (photo.original, photo.image, photo.thumbnail):
+        if field:
+            field.delete(save=False)
+    photo.delete()
+    if was_primary:
+        sync_profile_photo(photo.user)
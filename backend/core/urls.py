@@ -18,8 +18,10 @@ from .views import (
     CalibrationPhotosView,
     PhotoRatingView,
     UserPhotoView,
+    InferenceStatsView,
     health_check,
 )
+from .async_views import location_search, pickup_line
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -43,11 +45,16 @@ urlpatterns = [
     path('user/calibrate/', CalibrationView.as_view(), name='calibrate'),
     path('user/photos/', UserPhotoView.as_view(), name='user-photos'),
     path('user/photos/<int:photo_id>/', UserPhotoView.as_view(), name='user-photo-detail'),
+    path('user/pickup-line/', pickup_line, name='pickup-line'),
     
-    # Location endpoints
-    path('locations/search/', LocationSearchView.as_view(), name='location-search'),
+    # Location endpoints (async; the sync view is the WSGI fallback and load-test baseline)
+    path('locations/search/', location_search, name='location-search'),
+    path('locations/search/sync/', LocationSearchView.as_view(), name='location-search-sync'),
     
     # Calibration endpoints
     path('photos/calibration/', CalibrationPhotosView.as_view(), name='calibration-photos'),
     path('photos/rate/', PhotoRatingView.as_view(), name='photo-rating'),
+
+    # Operations
+    path('inference/stats/', InferenceStatsView.as_view(), name='inference-stats'),
 ] + router.urls
\ No newline at end of file
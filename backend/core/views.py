@@ -2,26 +2,41 @@
 
 from rest_framework import viewsets, status, views
 from rest_framework.views import APIView
+from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django.contrib.auth import get_user_model, authenticate
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings
+from django.urls import reverse
 import requests
 from datetime import date
 import os
 
-from .models import User, Photo, Match, UserPreference, PhotoRating
+from .models import User, Photo, Match, UserPhoto, UserPreference, PhotoRating
 from .serializers import (
     UserProfileSerializer, 
     PhotoSerializer, 
     MatchSerializer,
+    MatchCardSerializer,
     RegisterSerializer,
     LoginSerializer,
+    UserPhotoSerializer,
     UserPreferenceSerializer
 )
 from .ai.ai_models import train_user_model
+from .ai.backbones import batching_stats
 from .throttling import AuthRateThrottle
+from .authentication import TokenUserAuthentication
+from .conditional import conditional_get, user_state, match_state
+from .caching import onboarding_cache
+from .geocoding import search_locations
+from .calibration import srcsets
+from .uploads import (
+    InvalidImage, LimitedUploadHandler, delete_user_photo, reorder_user_photos, sniff_image, store_upload,
+)
+from .pagination import MatchCursorPagination, PhotoCursorPagination, StreamingListMixin
 
 # Use settings.DEBUG instead of DEBUG directly
 DEBUG = settings.DEBUG
@@ -35,10 +50,12 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return User.objects.filter(id=self.request.user.id)
 
-class PhotoViewSet(viewsets.ModelViewSet):
+class PhotoViewSet(StreamingListMixin, viewsets.ReadOnlyModelViewSet):
+    # The calibration catalogue is loaded by load_calibration_photos, never through the API
     permission_classes = [IsAuthenticated]
     queryset = Photo.objects.all()
     serializer_class = PhotoSerializer
+    pagination_class = PhotoCursorPagination
 
     def get_queryset(self):
         gender = self.request.query_params.get('gender', 'all')
@@ -46,12 +63,32 @@ class PhotoViewSet(viewsets.ModelViewSet):
             return Photo.objects.filter(gender=gender)
         return Photo.objects.all()
 
-class MatchViewSet(viewsets.ModelViewSet):
+class MatchViewSet(StreamingListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = MatchSerializer
+    pagination_class = MatchCursorPagination
+
+    def get_authenticators(self):
+        # Paged listing only needs the user id from the token, so skip loading the user row.
+        # Other actions, and the staff-only ?stream=1 export, need the full user.
+        request = self.request
+        if self.action_map.get('get') == 'list' and request.method == 'GET' and request.GET.get('stream') != '1':
+            return [TokenUserAuthentication()]
+        return super().get_authenticators()
+
+    def get_serializer_class(self):
+        # ?view=card returns the compact flat payload used by list screens
+        if self.action == 'list' and self.request.query_params.get('view') == 'card':
+            return MatchCardSerializer
+        return MatchSerializer
 
     def get_queryset(self):
-        return Match.objects.filter(user=self.request.user)
+        queryset = Match.objects.filter(user_id=self.request.user.id)
+        return self.get_serializer_class().setup_eager_loading(queryset)
+
+    @conditional_get(match_state)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 # Auth Views
 class RegisterView(APIView):
@@ -84,12 +121,10 @@ class LoginView(APIView):
     throttle_classes = [AuthRateThrottle]  # Add rate limiting
 
     def post(self, request):
-        print("DEBUG - Login attempt with data:", request.data)
         serializer = LoginSerializer(data=request.data, context={'request': request})
         
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            print(f"DEBUG - User authenticated successfully: {user.email}")
             
             # Generate tokens
             refresh = RefreshToken.for_user(user)
@@ -103,7 +138,6 @@ class LoginView(APIView):
                 'calibration_completed': user.calibration_completed
             })
             
-        print("DEBUG - Login validation failed:", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_401_UNAUTHORIZED)
 
 class LogoutView(APIView):
@@ -136,8 +170,11 @@ class LogoutView(APIView):
 
 # User Profile Views
 class UserDetailsView(APIView):
+    # ETags come from the user row's version, so always load it fresh
+    authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(user_state)
     def get(self, request):
         try:
             serializer = UserProfileSerializer(request.user)
@@ -173,8 +210,10 @@ class UserDetailsView(APIView):
             )
 
 class UserPreferencesView(APIView):
+    authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @conditional_get(user_state)
     def get(self, request):
         try:
             print(f"DEBUG - Getting preferences for user: {request.user.email}")
@@ -223,11 +262,22 @@ class UserPreferencesView(APIView):
             )
 
 class OnboardingStatusView(APIView):
+    # The cached status is keyed by the user row's data version, so load it fresh
+    authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        print("DEBUG - Checking onboarding status for user:", request.user.email)
         user = request.user
+        # Profile and preference writes bump the version, which retires the cached status.
+        # The timestamp guards against a stale instance saving an old counter back.
+        response_data = onboarding_cache.get_or_set(
+            f'{user.pk}:{user.data_version}:{user.data_updated_at.timestamp()}',
+            lambda: self.build_status(user)
+        )
+        return Response(response_data)
+
+    def build_status(self, user):
+        print("DEBUG - Checking onboarding status for user:", user.email)
         
         # For new users, ensure they have a preferences record
         try:
@@ -293,10 +343,11 @@ class OnboardingStatusView(APIView):
         }
         
         print("DEBUG - Onboarding response:", response_data)
-        return Response(response_data)
+        return response_data
 
 # Location Views
 class LocationSearchView(APIView):
+    authentication_classes = [TokenUserAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -309,58 +360,8 @@ class LocationSearchView(APIView):
             print("DEBUG - Empty query, returning empty results")
             return Response([])
             
-        # Use Nominatim API for geocoding
-        base_url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            'q': query,
-            'format': 'json',
-            'addressdetails': 1,
-            'limit': 5,
-            'featuretype': 'city'  # Prioritize city results
-        }
-        
-        headers = {
-            'User-Agent': 'NoSwipe Dating App/1.0'
-        }
-        
         try:
-            print(f"DEBUG - Sending request to Nominatim API with params: {params}")
-            response = requests.get(base_url, params=params, headers=headers)
-            response.raise_for_status()
-            results = response.json()
-            print(f"DEBUG - Nominatim API response: {results}")
-            
-            formatted_results = []
-            for result in results:
-                address = result.get('address', {})
-                
-                # Extract city name with fallbacks
-                city = (
-                    address.get('city') or 
-                    address.get('town') or 
-                    address.get('village') or 
-                    address.get('municipality')
-                )
-                
-                # Only include results that have a city
-                if not city:
-                    continue
-                    
-                formatted_result = {
-                    'id': result['place_id'],
-                    'type': 'city',
-                    'city': city,
-                    'region': address.get('state') or address.get('region'),
-                    'country': address.get('country'),
-                    'latitude': float(result['lat']),
-                    'longitude': float(result['lon']),
-                    'display_name': f"{city}, {address.get('country', '')}"
-                }
-                formatted_results.append(formatted_result)
-                
-            print(f"DEBUG - Returning formatted results: {formatted_results}")
-            return Response(formatted_results)
-            
+            return Response(search_locations(query))
         except requests.RequestException as e:
             print(f"ERROR - Failed to fetch locations: {str(e)}")
             return Response(
@@ -382,9 +383,9 @@ class CalibrationView(APIView):
         try:
             # Train the user model based on their ratings
             train_user_model(request.user.id)
-            # Mark calibration as completed
+            # Mark calibration as completed; request.user may be a cached copy, so write only this field
             request.user.calibration_completed = True
-            request.user.save()
+            request.user.save(update_fields=['calibration_completed'])
             return Response({
                 'status': 'success',
                 'message': 'Calibration completed and model trained successfully'
@@ -417,7 +418,9 @@ class CalibrationPhotosView(APIView):
                 photos.append({
                     'id': photo_id,
                     'image_url': photo_url,
-                    'gender': preferred_gender
+                    'gender': preferred_gender,
+                    # Responsive sizes by content type, e.g. {'image/webp': '/static/... 160w, ... 256w'}
+                    'srcset': srcsets(photo_url, photo_id),
                 })
             
             return Response({'photos': photos})
@@ -433,6 +436,7 @@ class CalibrationPhotosView(APIView):
             )
 
 class PhotoRatingView(APIView):
+    authentication_classes = [TokenUserAuthentication]
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
@@ -462,7 +466,7 @@ class PhotoRatingView(APIView):
             
             # Create or update the rating
             photo_rating, created = PhotoRating.objects.get_or_create(
-                user=request.user,
+                user_id=request.user.id,
                 photo=photo,
                 defaults={'rating': rating}
             )
@@ -482,61 +486,95 @@ class PhotoRatingView(APIView):
             )
 
 class UserPhotoView(APIView):
+    """Upload, list, poll and delete the current user's profile photos.
+
+    Uploads are streamed to disk and only their header is checked here; the
+    response is a 202 with the photo in 'pending' status, and the photo's
+    detail URL reports when background processing has finished.
+    """
     permission_classes = [IsAuthenticated]
+    MAX_PHOTOS = 6
+    # Room for multipart boundaries and headers around the file itself
+    MULTIPART_OVERHEAD = 64 * 1024
 
     def post(self, request):
-        if 'photo' not in request.FILES:
+        if int(request.META.get('CONTENT_LENGTH') or 0) > settings.USER_PHOTO_MAX_BYTES + self.MULTIPART_OVERHEAD:
             return Response(
-                {'detail': 'No photo file provided'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'detail': 'Photo is too large'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
             )
+        # Set before request.FILES is first read, so nothing is buffered in memory
+        request.upload_handlers = [LimitedUploadHandler(request)]
 
-        # Get the user's current photos count
-        current_photos = Photo.objects.filter(user=request.user).count()
-        if current_photos >= 6:
+        if 'photo' not in request.FILES:
             return Response(
-                {'detail': 'Maximum number of photos (6) reached'},
+                {'detail': 'No photo file provided, or it is too large'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         photo_file = request.FILES['photo']
-        
-        # Create the photo object
-        photo = Photo.objects.create(
-            user=request.user,
-            image=photo_file,  # Using the new image field
-            is_profile_photo=current_photos == 0  # First photo becomes profile photo
-        )
-
-        # If this is the first photo, set it as the user's profile photo
-        if current_photos == 0:
-            request.user.profile_photo = photo.image_url
-            request.user.save()
+        try:
+            image_format, _ = sniff_image(photo_file)
+        except InvalidImage as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = PhotoSerializer(photo)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        current_photos = UserPhoto.objects.filter(user=request.user).exclude(status='failed').count()
+        if current_photos >= self.MAX_PHOTOS:
+            return Response(
+                {'detail': f'Maximum number of photos ({self.MAX_PHOTOS}) reached'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-    def get(self, request):
-        photos = Photo.objects.filter(user=request.user)
-        serializer = PhotoSerializer(photos, many=True)
-        return Response(serializer.data)
+        photo = store_upload(request.user, photo_file, image_format)
+        data = UserPhotoSerializer(photo).data
+        data['status_url'] = reverse('user-photo-detail', args=[photo.pk])
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+    def get(self, request, photo_id=None):
+        photos = UserPhoto.objects.filter(user=request.user)
+        if photo_id is not None:
+            photo = photos.filter(pk=photo_id).first()
+            if photo is None:
+                return Response({'detail': 'Photo not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(UserPhotoSerializer(photo).data)
+        return Response(UserPhotoSerializer(photos, many=True).data)
+
+    def patch(self, request, photo_id=None):
+        """Reorder photos: {"order": [photo ids]}; the first ready one becomes the profile photo."""
+        if photo_id is not None:
+            # Photos are reordered as a whole, on the list URL
+            raise MethodNotAllowed(request.method)
+        order = request.data.get('order')
+        if not isinstance(order, list) or not all(isinstance(pk, int) for pk in order):
+            return Response({'detail': 'order must be a list of photo ids'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            reorder_user_photos(request.user, order)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UserPhotoSerializer(UserPhoto.objects.filter(user=request.user), many=True).data)
 
     def delete(self, request, photo_id):
-        try:
-            photo = Photo.objects.get(id=photo_id, user=request.user)
-            
-            # If this was the profile photo, clear the user's profile_photo field
-            if photo.is_profile_photo:
-                request.user.profile_photo = None
-                request.user.save()
-            
-            photo.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Photo.DoesNotExist:
+        photo = UserPhoto.objects.filter(pk=photo_id, user=request.user).select_related('user').first()
+        if photo is None:
             return Response(
                 {'detail': 'Photo not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        delete_user_photo(photo)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class InferenceStatsView(APIView):
+    """Micro-batching p50/p99 latency and batch occupancy per backbone, for staff."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            return Response(batching_stats())
+        except OSError as e:
+            return Response(
+                {'detail': f'Inference server unavailable: {e}'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
 
 class health_check(APIView):
     permission_classes = [AllowAny]
@@ -3,7 +3,7 @@
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { apiService } from '@/lib/api';
-import { getImageUrl } from '@/lib/utils/urls';
+import { getImageUrl, getSrcSet } from '@/lib/utils/urls';
 import type { CalibrationPhoto } from '@/types';
 import { Star, Loader, Home } from 'lucide-react';
 import Navigation from '@/components/layout/Navigation';
@@ -167,16 +167,21 @@ export default function CalibrationPage() {
             {!isCompleted && currentIndex < photos.length && (
               <>
                 {photos[currentIndex]?.image_url ? (
-                  <img 
-                    src={getImageUrl(photos[currentIndex].image_url)}
-                    alt={`Calibration photo ${currentIndex + 1}`}
-                    className="w-full h-auto rounded-lg shadow-lg mb-6"
-                    onError={(e) => {
-                      const target = e.target as HTMLImageElement;
-                      console.error('Failed to load image:', target.src);
-                      setError('Failed to load image');
-                    }}
-                  />
+                  <picture>
+                    {Object.entries(photos[currentIndex].srcset ?? {}).map(([type, srcset]) => (
+                      <source key={type} type={type} srcSet={getSrcSet(srcset)} sizes="(max-width: 448px) 100vw, 448px" />
+                    ))}
+                    <img 
+                      src={getImageUrl(photos[currentIndex].image_url)}
+                      alt={`Calibration photo ${currentIndex + 1}`}
+                      className="w-full h-auto rounded-lg shadow-lg mb-6"
+                      onError={(e) => {
+                        const target = e.target as HTMLImageElement;
+                        console.error('Failed to load image:', target.currentSrc || target.src);
+                        setError('Failed to load image');
+                      }}
+                    />
+                  </picture>
                 ) : (
                   <div className="w-full h-64 bg-slate-700 rounded-lg flex items-center justify-center mb-6">
                     <p className="text-slate-400">Image not available</p>
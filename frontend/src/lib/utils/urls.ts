@@ -23,4 +23,13 @@ export const getImageUrl = (path: string | null) => {
     
     // For other paths, assume they're media files
     return `${API_URL}/media/${path}`;
-}; 
\ No newline at end of file
+}; 
+// Resolves every candidate URL in a srcset like "/static/a.webp 160w, /static/b.webp 256w"
+export const getSrcSet = (srcset: string) =>
+    srcset
+        .split(',')
+        .map((candidate) => {
+            const [path, descriptor] = candidate.trim().split(/\s+/);
+            return `${getImageUrl(path)} ${descriptor}`;
+        })
+        .join(', ');
@@ -46,6 +46,8 @@ export interface Location {
 export interface CalibrationPhoto {
   id: number;
   image_url: string;
+  // Responsive renditions by content type, e.g. {'image/webp': '/static/... 160w, ...'}
+  srcset?: Record<string, string>;
   gender: 'M' | 'F' | 'B';
   age?: number;
   ethnicity?: string;